@@ -0,0 +1,300 @@
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import logging
+import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from framework.core.clients import get_client_registry
+from framework.core.config import ConfigLoader
+from framework.core.engine import PipelineEngine
+from .pipelines import InputFactory, get_benchmark_pipelines
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Return the q-th percentile (0-100) of values by linear interpolation."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Return the peak resident set size of this process in MiB, if available."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """Mean and tail percentiles of a list of millisecond timings."""
+    def rounded(value):
+        return round(value, 3) if value is not None else None
+
+    return {
+        "mean_ms": rounded(sum(values) / len(values)) if values else None,
+        "p50_ms": rounded(percentile(values, 50)),
+        "p95_ms": rounded(percentile(values, 95)),
+        "p99_ms": rounded(percentile(values, 99)),
+    }
+
+
+class _Run:
+    """Timings collected for one batch of benchmark requests."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.node_durations: Dict[str, List[float]] = {}
+        self.errors = 0
+        self.wall = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, started: float, state: Dict[str, Any]) -> None:
+        """Record a completed request and the duration of each of its nodes."""
+        latency = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.latencies.append(latency)
+            for node_id, meta in (state.get("node_meta") or {}).items():
+                self.node_durations.setdefault(node_id, []).append(meta["duration_ms"])
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+
+def _run_requests(
+    engine: PipelineEngine,
+    make_inputs: InputFactory,
+    requests: int,
+    concurrency: int,
+    mode: str
+) -> _Run:
+    """Send requests through the engine's compiled graph and collect timings."""
+    run = _Run()
+    prefix = f"bench-{uuid.uuid4().hex[:8]}"
+
+    def call(index: int) -> None:
+        initial_state, config = engine._prepare_run(
+            make_inputs(index), f"{prefix}-{index}")
+        started = time.perf_counter()
+        try:
+            run.record(started, engine.graph.invoke(initial_state, config))
+        except Exception as e:
+            logger.debug(f"Benchmark request {index} failed: {e}")
+            run.record_error()
+
+    async def acall(index: int, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            initial_state, config = engine._prepare_run(
+                make_inputs(index), f"{prefix}-{index}")
+            started = time.perf_counter()
+            try:
+                run.record(started, await engine.graph.ainvoke(initial_state, config))
+            except Exception as e:
+                logger.debug(f"Benchmark request {index} failed: {e}")
+                run.record_error()
+
+    async def arun_all() -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*(acall(index, semaphore) for index in range(requests)))
+
+    started = time.perf_counter()
+    if mode == "async":
+        asyncio.run(arun_all())
+    elif concurrency <= 1:
+        for index in range(requests):
+            call(index)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(call, range(requests)))
+    run.wall = time.perf_counter() - started
+    return run
+
+
+def benchmark_pipeline(
+    config: Dict[str, Any],
+    make_inputs: InputFactory,
+    requests: int = 50,
+    concurrency: int = 8,
+    mode: str = "sync",
+    warmup: int = 5,
+    fake_options: Optional[Dict[str, Any]] = None,
+    overhead_requests: int = 20
+) -> Dict[str, Any]:
+    """
+    Benchmark one pipeline against the fake model.
+
+    Args:
+        config: Pipeline configuration dictionary (see benchmark_config())
+        make_inputs: Builds the inputs for the i-th request
+        requests: Number of measured requests
+        concurrency: Maximum number of requests in flight
+        mode: "sync" (thread pool over run) or "async" (tasks over arun)
+        warmup: Unmeasured requests sent first
+        fake_options: FakeChatModel options (latency, token_delay, ...)
+        overhead_requests: Sequential requests with zero model latency used
+            to measure the framework's own per-node overhead (0 to skip)
+
+    Returns:
+        Throughput, latency percentiles, per-node timings and overhead
+    """
+    registry = get_client_registry()
+    fake_options = dict(fake_options or {})
+
+    started = time.perf_counter()
+    engine = PipelineEngine(ConfigLoader.load_config_dict(config))
+    engine.build_graph()
+    setup_ms = (time.perf_counter() - started) * 1000
+
+    registry.configure(fake_options=fake_options)
+    if warmup:
+        _run_requests(engine, make_inputs, warmup, concurrency, mode)
+    run = _run_requests(engine, make_inputs, requests, concurrency, mode)
+
+    report = {
+        "name": config.get("name"),
+        "nodes": len(engine.nodes),
+        "requests": requests,
+        "concurrency": concurrency,
+        "mode": mode,
+        "errors": run.errors,
+        "setup_ms": round(setup_ms, 3),
+        "wall_s": round(run.wall, 3),
+        "throughput_rps": round(len(run.latencies) / run.wall, 3) if run.wall else None,
+        "latency": _summarize(run.latencies),
+        "per_node": {
+            node_id: _summarize(durations)
+            for node_id, durations in run.node_durations.items()
+        },
+    }
+
+    if overhead_requests:
+        # With an instantaneous model, node time is pure framework overhead
+        registry.configure(fake_options={
+            **fake_options, "latency": 0.0, "token_delay": 0.0, "error_rate": 0.0})
+        try:
+            overhead = _run_requests(engine, make_inputs, overhead_requests, 1, mode)
+        finally:
+            registry.configure(fake_options=fake_options)
+        report["overhead"] = {
+            "requests": overhead_requests,
+            "end_to_end": _summarize(overhead.latencies),
+            "per_node_mean_ms": {
+                node_id: _summarize(durations)["mean_ms"]
+                for node_id, durations in overhead.node_durations.items()
+            },
+        }
+
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def run_benchmarks(
+    pipelines: Optional[List[str]] = None,
+    requests: int = 50,
+    concurrency: int = 8,
+    mode: str = "sync",
+    fake_options: Optional[Dict[str, Any]] = None,
+    warmup: int = 5,
+    overhead_requests: int = 20,
+    width: int = 8,
+    depth: int = 8
+) -> Dict[str, Any]:
+    """
+    Run the benchmark suite and return a JSON-serializable report.
+
+    Args:
+        pipelines: Names of the pipelines to run (default: all of them)
+        requests: Measured requests per pipeline
+        concurrency: Maximum number of requests in flight
+        mode: "sync" or "async"
+        fake_options: FakeChatModel options (latency, latency_jitter,
+            distribution, token_delay, error_rate, seed, ...)
+        warmup: Unmeasured requests per pipeline
+        overhead_requests: Zero-latency requests per pipeline for overhead
+        width: Number of parallel branches in the synthetic wide DAG
+        depth: Number of chained nodes in the synthetic deep DAG
+
+    Returns:
+        Report with the run parameters, environment and per-pipeline results
+    """
+    available = get_benchmark_pipelines(width=width, depth=depth)
+    names = pipelines or list(available)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(
+            f"Unknown benchmark pipeline(s): {', '.join(unknown)} "
+            f"(expected one of {', '.join(available)})")
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "mode": mode,
+            "warmup": warmup,
+            "overhead_requests": overhead_requests,
+            "width": width,
+            "depth": depth,
+            "fake_options": dict(fake_options or {}),
+        },
+        "pipelines": {},
+    }
+
+    try:
+        for name in names:
+            config, make_inputs = available[name]
+            logger.info(f"Benchmarking pipeline '{name}'")
+            report["pipelines"][name] = benchmark_pipeline(
+                config, make_inputs, requests=requests, concurrency=concurrency,
+                mode=mode, warmup=warmup, fake_options=fake_options,
+                overhead_requests=overhead_requests)
+    finally:
+        get_client_registry().configure(fake_options={})
+
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a benchmark report as a plain-text table."""
+    lines = [
+        f"{'pipeline':<10} {'nodes':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'ovh ms':>8} {'errors':>6} {'rss MiB':>8}"
+    ]
+    for name, result in report["pipelines"].items():
+        latency = result["latency"]
+        overhead = result.get("overhead", {}).get("end_to_end", {}).get("mean_ms")
+        lines.append(
+            f"{name:<10} {result['nodes']:>5} {_cell(result['throughput_rps'], 9)} "
+            f"{_cell(latency['p50_ms'], 9)} {_cell(latency['p95_ms'], 9)} "
+            f"{_cell(latency['p99_ms'], 9)} {_cell(overhead, 8)} "
+            f"{result['errors']:>6} {_cell(result['peak_rss_mb'], 8)}")
+    return "\n".join(lines)
+
+
+def _cell(value: Optional[float], width: int) -> str:
+    return f"{value:>{width}.2f}" if value is not None else f"{'-':>{width}}"
+
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    """Write a benchmark report to a JSON file so runs can be diffed across versions."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
@@ -0,0 +1,110 @@
+import copy
+from typing import Any, Callable, Dict, Tuple
+
+# Builds the inputs for the i-th benchmark request
+InputFactory = Callable[[int], Dict[str, Any]]
+
+
+def benchmark_config(config: Dict[str, Any], model: str = "fake") -> Dict[str, Any]:
+    """
+    Prepare a pipeline configuration for benchmarking.
+
+    Every LLM node is pointed at the offline fake model, and response caching
+    and checkpointing are turned off so each request exercises the full path.
+    Tool nodes are removed: they have side effects (the joke example's logger
+    appends to ./logs) that a benchmark must not leave behind.
+
+    Args:
+        config: Pipeline configuration dictionary
+        model: Model name to use for every LLM node
+
+    Returns:
+        A modified copy of the configuration
+    """
+    config = copy.deepcopy(config)
+    config["name"] = f"{config.get('name', 'pipeline')} (benchmark)"
+    settings = config.setdefault("settings", {})
+    settings["cache_enabled"] = False
+    settings["checkpointer"] = "none"
+
+    removed = {node["id"] for node in config.get("nodes", []) if node.get("type") == "tool"}
+    config["nodes"] = [node for node in config.get("nodes", []) if node["id"] not in removed]
+    for node in config["nodes"]:
+        if node.get("type") == "llm":
+            node["model"] = model
+        if node.get("depends_on"):
+            node["depends_on"] = [dep for dep in node["depends_on"] if dep not in removed]
+    if config.get("output"):
+        config["output"] = {
+            key: value for key, value in config["output"].items()
+            if not any(node_id in value for node_id in removed)}
+    return config
+
+
+def wide_pipeline(width: int = 8) -> Dict[str, Any]:
+    """A fan-out/fan-in DAG: one source node, ``width`` parallel branches and a join."""
+    nodes = [{
+        "id": "source",
+        "role": "Describe the topic",
+        "type": "llm",
+        "model": "fake",
+        "prompt_template": "Describe {{ topic }} in one paragraph.",
+        "output": {"type": "raw"}
+    }]
+    for index in range(width):
+        nodes.append({
+            "id": f"branch_{index}",
+            "role": f"Expand on aspect {index}",
+            "type": "llm",
+            "model": "fake",
+            "prompt_template": f"Expand on aspect {index} of this description: {{{{ source }}}}",
+            "output": {"type": "raw"}
+        })
+    nodes.append({
+        "id": "join",
+        "role": "Summarize every branch",
+        "type": "llm",
+        "model": "fake",
+        "prompt_template": "Summarize: " + " ".join(
+            f"{{{{ branch_{index} }}}}" for index in range(width)),
+        "output": {"type": "raw"}
+    })
+    return {"name": f"Wide DAG ({width})", "nodes": nodes}
+
+
+def deep_pipeline(depth: int = 8) -> Dict[str, Any]:
+    """A linear chain of ``depth`` LLM nodes, each reading the previous one's output."""
+    nodes = []
+    for index in range(depth):
+        source = "{{ topic }}" if index == 0 else f"{{{{ step_{index - 1} }}}}"
+        nodes.append({
+            "id": f"step_{index}",
+            "role": f"Refine step {index}",
+            "type": "llm",
+            "model": "fake",
+            "prompt_template": f"Refine the following text: {source}",
+            "output": {"type": "raw"}
+        })
+    return {"name": f"Deep DAG ({depth})", "nodes": nodes}
+
+
+def _topic_inputs(index: int) -> Dict[str, Any]:
+    return {"topic": f"benchmark topic {index}"}
+
+
+def _joke_inputs(index: int) -> Dict[str, Any]:
+    topic = f"benchmark topic {index}"
+    return {"user_input": f"Tell me a joke about {topic}", "topic": topic}
+
+
+def get_benchmark_pipelines(width: int = 8, depth: int = 8) -> Dict[str, Tuple[Dict[str, Any], InputFactory]]:
+    """Return the built-in benchmark pipelines as name -> (config, input factory)."""
+    from framework.examples.joke_pipeline import joke_pipeline_config
+    from framework.examples.novel_pipeline import novel_pipeline_config
+
+    return {
+        "joke": (benchmark_config(joke_pipeline_config), _joke_inputs),
+        "novel": (benchmark_config(novel_pipeline_config), lambda index: {}),
+        "wide": (benchmark_config(wide_pipeline(width)), _topic_inputs),
+        "deep": (benchmark_config(deep_pipeline(depth)), _topic_inputs),
+    }
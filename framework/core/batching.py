@@ -0,0 +1,153 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Default upper bound on the number of calls grouped into one batch
+DEFAULT_MAX_BATCH_SIZE = 16
+
+# Default time (seconds) the first call in a batch waits for others to join
+DEFAULT_BATCH_WINDOW = 0.01
+
+
+class _Slot:
+    """Holds the outcome of one call submitted to a batch."""
+
+    __slots__ = ("item", "event", "result", "error", "leader", "done")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.leader = False
+        self.done = False
+
+
+class MicroBatcher:
+    """Groups concurrent calls into batched calls.
+
+    The first caller to arrive waits up to ``window`` seconds (or until
+    ``max_batch_size`` calls have queued) and then runs the batch function
+    once for every queued item; each caller gets back its own result or
+    exception. Sync callers from many threads and async callers on an event
+    loop are batched separately.
+    """
+
+    def __init__(
+        self,
+        batch_func: Callable[[List[Any]], List[Any]],
+        abatch_func: Optional[Callable[[List[Any]], Awaitable[List[Any]]]] = None,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        window: float = DEFAULT_BATCH_WINDOW
+    ):
+        self.batch_func = batch_func
+        self.abatch_func = abatch_func
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self._pending: List[_Slot] = []
+        self._cond = threading.Condition()
+        self._apending: Dict[int, List] = {}
+        self.batches = 0
+        self.batched_calls = 0
+
+    def submit(self, item: Any) -> Any:
+        """Add an item to the current batch and block until its result is ready."""
+        slot = _Slot(item)
+        with self._cond:
+            self._pending.append(slot)
+            if len(self._pending) == 1:
+                slot.leader = True
+            elif len(self._pending) >= self.max_batch_size:
+                self._cond.notify_all()
+
+        while not slot.done:
+            if slot.leader:
+                self._lead()
+            else:
+                # Woken either with a result or to lead the next batch
+                slot.event.wait()
+                slot.event.clear()
+
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def _lead(self) -> None:
+        """Collect a batch as its leader, then execute it."""
+        with self._cond:
+            # Wait for more calls to join, unless the batch fills up first
+            self._cond.wait_for(
+                lambda: len(self._pending) >= self.max_batch_size, timeout=self.window)
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+
+            # Calls that did not fit get a leader of their own
+            if self._pending:
+                self._pending[0].leader = True
+                self._pending[0].event.set()
+
+        self._run(batch)
+
+    def _run(self, batch: List[_Slot]) -> None:
+        """Execute one batch and hand each result back to its caller."""
+        try:
+            results = self.batch_func([slot.item for slot in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        self.batches += 1
+        self.batched_calls += len(batch)
+        for slot, result in zip(batch, results):
+            if isinstance(result, Exception):
+                slot.error = result
+            else:
+                slot.result = result
+            slot.leader = False
+            slot.done = True
+            slot.event.set()
+
+    async def asubmit(self, item: Any) -> Any:
+        """Async variant of submit() for calls made on an event loop."""
+        if self.abatch_func is None:
+            return await asyncio.to_thread(self.submit, item)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._apending.setdefault(id(loop), [])
+        pending.append((item, future))
+
+        if len(pending) == 1:
+            # First caller schedules the flush for this loop
+            loop.create_task(self._aflush(loop))
+        elif len(pending) >= self.max_batch_size:
+            self._take_async_batch(loop)
+
+        return await future
+
+    def _take_async_batch(self, loop) -> None:
+        """Start a batch with whatever is queued on the given loop."""
+        batch = self._apending.pop(id(loop), [])
+        if batch:
+            loop.create_task(self._arun(batch))
+
+    async def _aflush(self, loop) -> None:
+        """Flush the loop's queued calls once the batching window has passed."""
+        await asyncio.sleep(self.window)
+        self._take_async_batch(loop)
+
+    async def _arun(self, batch: List) -> None:
+        """Execute one async batch and resolve each caller's future."""
+        try:
+            results = await self.abatch_func([item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        self.batches += 1
+        self.batched_calls += len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .errors import ConfigError
+
+logger = logging.getLogger(__name__)
+
+# Default number of responses kept in the in-memory tier
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class ResponseCache:
+    """Two-tier cache of LLM responses.
+
+    Lookups hit a bounded in-memory LRU first and fall back to a SQLite
+    file, so cached responses survive restarts. The SQLite tier is opt-in:
+    it is only used when a ``path`` is given. Entries can carry a TTL, and
+    hit/miss counters are kept for both tiers. The async methods do their
+    SQLite I/O in a worker thread, off the event loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        path: Optional[str] = None,
+        default_ttl: Optional[float] = None
+    ):
+        self.max_entries = max_entries
+        self.path = path
+        self.default_ttl = default_ttl
+        self._memory: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Guards the SQLite connection, so disk I/O never blocks memory lookups
+        self._disk_lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+
+        if path:
+            self._open(path)
+
+    def _open(self, path: str) -> None:
+        """Open (and create if needed) the SQLite tier."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        temperature: float,
+        prompt: str,
+        output_type: str = "raw",
+        output_schema: Optional[str] = None,
+        output_mode: str = "text"
+    ) -> str:
+        """Build a stable cache key for a model call."""
+        payload = json.dumps(
+            [model, temperature, prompt, output_type, output_schema, output_mode],
+            sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None if missing or expired."""
+        found, value = self._get_memory(key)
+        if not found:
+            value = self._get_disk(key)
+        return value
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Async variant of get() that reads the SQLite tier in a worker thread."""
+        found, value = self._get_memory(key)
+        if not found:
+            value = await asyncio.to_thread(self._get_disk, key)
+        return value
+
+    def _get_memory(self, key: str) -> Tuple[bool, Optional[str]]:
+        """Look a key up in the memory tier. Returns (settled, value)."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return True, value
+                del self._memory[key]
+
+            if self._conn is None:
+                self.misses += 1
+                return True, None
+        return False, None
+
+    def _get_disk(self, key: str) -> Optional[str]:
+        """Look a key up in the SQLite tier, promoting hits to memory."""
+        now = time.time()
+        row = None
+        with self._disk_lock:
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] is not None and row[1] <= now:
+                    self._conn.execute(
+                        "DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                    row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            value, expires_at = row
+            self._remember(key, value, expires_at)
+            self.hits += 1
+            self.disk_hits += 1
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Store a response, optionally expiring after ttl seconds."""
+        expires_at = self._set_memory(key, value, ttl)
+        self._set_disk(key, value, expires_at)
+
+    async def aset(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Async variant of set() that writes the SQLite tier in a worker thread."""
+        expires_at = self._set_memory(key, value, ttl)
+        if self._conn is not None:
+            await asyncio.to_thread(self._set_disk, key, value, expires_at)
+
+    def _set_memory(self, key: str, value: str, ttl: Optional[float]) -> Optional[float]:
+        """Store a response in the memory tier and return its expiry time."""
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._remember(key, value, expires_at)
+        return expires_at
+
+    def _set_disk(self, key: str, value: str, expires_at: Optional[float]) -> None:
+        with self._disk_lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not persist cached response: {e}")
+
+    def _remember(self, key: str, value: str, expires_at: Optional[float]) -> None:
+        """Insert into the in-memory LRU tier, evicting the oldest entries."""
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "memory_entries": len(self._memory),
+                "path": self.path,
+            }
+
+    def clear(self) -> None:
+        """Remove every cached response from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        with self._disk_lock:
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+
+    def close(self) -> None:
+        """Close the SQLite tier."""
+        with self._disk_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_caches: Dict[Optional[str], ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(
+    path: Optional[str] = None,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    default_ttl: Optional[float] = None
+) -> ResponseCache:
+    """
+    Return the process-wide response cache for a storage path (None = memory only).
+
+    The cache is shared by every pipeline using the path, so options that
+    differ from those it was opened with raise ConfigError.
+    """
+    key = os.path.abspath(path) if path else None
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = ResponseCache(
+                max_entries=max_entries, path=key, default_ttl=default_ttl)
+            _caches[key] = cache
+        elif (cache.max_entries, cache.default_ttl) != (max_entries, default_ttl):
+            raise ConfigError(
+                f"Response cache {key or '(memory)'} is already open with max_entries="
+                f"{cache.max_entries}, ttl={cache.default_ttl}; got max_entries="
+                f"{max_entries}, ttl={default_ttl}")
+        return cache
@@ -0,0 +1,98 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+from langgraph.checkpoint.memory import MemorySaver
+from .errors import ConfigError
+
+# Default number of threads kept by the bounded in-memory checkpointer
+DEFAULT_MAX_THREADS = 1000
+
+
+class BoundedMemorySaver(MemorySaver):
+    """In-memory checkpointer that evicts whole threads.
+
+    The least recently used thread is dropped once more than ``max_threads``
+    threads are stored, and threads idle for longer than ``ttl`` seconds are
+    dropped on the next write.
+    """
+
+    def __init__(self, max_threads: int = DEFAULT_MAX_THREADS, ttl: Optional[float] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.ttl = ttl
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+        self._evict_lock = threading.Lock()
+
+    def _touch(self, config) -> None:
+        """Mark the config's thread as recently used."""
+        thread_id = config.get("configurable", {}).get("thread_id")
+        if thread_id is None:
+            return
+        with self._evict_lock:
+            self._last_used[thread_id] = time.monotonic()
+            self._last_used.move_to_end(thread_id)
+
+    def _evict(self) -> None:
+        """Drop expired threads and the oldest threads beyond max_threads."""
+        expired = []
+        with self._evict_lock:
+            cutoff = time.monotonic() - self.ttl if self.ttl else None
+            while self._last_used:
+                thread_id, last_used = next(iter(self._last_used.items()))
+                if len(self._last_used) > self.max_threads or (cutoff and last_used < cutoff):
+                    self._last_used.popitem(last=False)
+                    expired.append(thread_id)
+                else:
+                    break
+
+        for thread_id in expired:
+            self.delete_thread(thread_id)
+
+    def get_tuple(self, config):
+        self._touch(config)
+        return super().get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self._touch(config)
+        result = super().put(config, checkpoint, metadata, new_versions)
+        self._evict()
+        return result
+
+    def put_writes(self, config, writes, task_id, task_path: str = ""):
+        self._touch(config)
+        return super().put_writes(config, writes, task_id, task_path)
+
+
+def create_checkpointer(settings: Optional[Dict[str, Any]] = None):
+    """
+    Create the checkpointer selected by ``settings.checkpointer``.
+
+    The setting is either a type name or a dictionary with a ``type`` key and
+    backend options:
+
+    - ``memory`` (default): BoundedMemorySaver (``max_threads``, ``ttl``)
+    - ``sqlite``: SQLite file with WAL and batched commits (``path``,
+      ``batch_size``, ``flush_interval``)
+    - ``none``: no checkpointing, for stateless runs
+
+    Returns:
+        A checkpointer instance, or None for ``none``
+    """
+    spec: Union[str, Dict[str, Any], None] = (settings or {}).get("checkpointer")
+    options = dict(spec) if isinstance(spec, dict) else {"type": spec or "memory"}
+    backend = str(options.pop("type", "memory")).lower()
+
+    try:
+        if backend == "memory":
+            return BoundedMemorySaver(**options)
+        if backend == "sqlite":
+            from .checkpoint_sqlite import BatchedSqliteSaver
+
+            return BatchedSqliteSaver.from_path(**options)
+        if backend == "none":
+            return None
+    except TypeError as e:
+        raise ConfigError(f"Invalid options for '{backend}' checkpointer: {e}")
+
+    raise ConfigError(f"Unknown checkpointer type: {backend}")
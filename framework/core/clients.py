@@ -0,0 +1,246 @@
+import asyncio
+import atexit
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from .errors import ConfigError
+
+logger = logging.getLogger(__name__)
+
+# Default number of pooled HTTP connections per provider
+DEFAULT_POOL_SIZE = 20
+
+# Seconds an idle keep-alive connection stays in the pool
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+def resolve_provider(model: str) -> str:
+    """Return the provider name ('openai', 'anthropic' or 'fake') for a model."""
+    name = model.lower()
+    if name == "fake" or name.startswith("fake:"):
+        return "fake"
+    if "gpt" in name or "openai" in name:
+        return "openai"
+    if "claude" in name or "anthropic" in name:
+        return "anthropic"
+    return "fake"
+
+
+def is_fake_model(model: str) -> bool:
+    """Return True for explicitly requested offline models ("fake" / "fake:<name>")."""
+    name = model.lower()
+    return name == "fake" or name.startswith("fake:")
+
+
+def _freeze(value: Any) -> Any:
+    """Turn a kwargs value into something hashable for use in a registry key."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class ModelClientRegistry:
+    """Process-wide registry of reusable chat-model clients.
+
+    Clients are keyed by (provider, model, temperature, extra kwargs) and are
+    created once, so repeated node executions reuse warm clients. Clients of
+    the same provider share one keep-alive HTTP connection pool where the
+    provider integration accepts an external HTTP client.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY
+    ):
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self._clients: Dict[Tuple, Any] = {}
+        self._http_clients: Dict[str, Tuple[Any, Any]] = {}
+        # Options for explicitly requested fake models ("fake" / "fake:<name>")
+        self.fake_options: Dict[str, Any] = {}
+        # Pool settings set explicitly through configure()
+        self._configured = set()
+        self._lock = threading.RLock()
+        self._closed = False
+
+    def configure(
+        self,
+        pool_size: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        fake_options: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Update registry settings.
+
+        The connection pools are shared by every pipeline in the process, so
+        pool settings that differ from ones already configured, or from the
+        ones existing pools were created with, raise ConfigError. New fake
+        model options replace any fake clients already created.
+        """
+        with self._lock:
+            pool = {}
+            if pool_size is not None:
+                pool["pool_size"] = int(pool_size)
+            if keepalive_expiry is not None:
+                pool["keepalive_expiry"] = float(keepalive_expiry)
+            for name, value in pool.items():
+                current = getattr(self, name)
+                if value != current and (name in self._configured or self._http_clients):
+                    raise ConfigError(
+                        f"Conflicting {name} for the shared connection pools: "
+                        f"{value} (already {current})")
+            for name, value in pool.items():
+                setattr(self, name, value)
+                self._configured.add(name)
+            if fake_options is not None:
+                self.fake_options = dict(fake_options)
+                for key in [key for key in self._clients if key[0] == "fake"]:
+                    del self._clients[key]
+
+    def get(self, model: str, temperature: float = 0.7, **kwargs) -> Any:
+        """Return a warm client for the given model, creating it on first use."""
+        provider = resolve_provider(model)
+        key = (provider, model, temperature, _freeze(kwargs))
+
+        # Fast path without taking the lock
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Model client registry has been closed")
+            client = self._clients.get(key)
+            if client is None:
+                client = self._create_client(
+                    provider, model, temperature, kwargs)
+                self._clients[key] = client
+                logger.debug(
+                    f"Created {provider} client for model '{model}'")
+            return client
+
+    def _create_client(self, provider: str, model: str, temperature: float, kwargs: Dict[str, Any]) -> Any:
+        """Construct a new chat-model client for the given provider."""
+        if provider == "openai":
+            try:
+                from langchain_openai import ChatOpenAI
+            except ImportError:
+                raise ImportError(
+                    "langchain_openai is not installed. Please install it with: "
+                    "pip install langchain-openai"
+                )
+            http_client, http_async_client = self._get_http_clients(provider)
+            return ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                http_client=http_client,
+                http_async_client=http_async_client,
+                **kwargs
+            )
+        elif provider == "anthropic":
+            try:
+                from langchain_anthropic import ChatAnthropic
+            except ImportError:
+                raise ImportError(
+                    "langchain_anthropic is not installed. Please install it with: "
+                    "pip install langchain-anthropic"
+                )
+            # ChatAnthropic keeps its own SDK client (and connection pool) per
+            # instance, so reusing the instance is what keeps connections warm
+            return ChatAnthropic(model=model, temperature=temperature, **kwargs)
+        else:
+            from .fake_llm import FakeChatModel
+
+            if is_fake_model(model):
+                # Explicitly requested offline model (tests and benchmarks)
+                return FakeChatModel(model=model, **{**self.fake_options, **kwargs})
+
+            # Fallback to a mock LLM for testing or when specific models aren't available
+            logger.warning(
+                f"Using mock LLM for model '{model}'. Install appropriate packages for real LLM usage.")
+            return FakeChatModel(
+                model=model, responses=["This is a mock response from the LLM."])
+
+    def _get_http_clients(self, provider: str) -> Tuple[Any, Any]:
+        """Return the shared (sync, async) httpx clients for a provider."""
+        if provider not in self._http_clients:
+            import httpx
+
+            limits = httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=self.keepalive_expiry
+            )
+            self._http_clients[provider] = (
+                httpx.Client(limits=limits),
+                httpx.AsyncClient(limits=limits)
+            )
+        return self._http_clients[provider]
+
+    def close(self) -> None:
+        """Drop all cached clients and close their connection pools."""
+        with self._lock:
+            http_clients = list(self._http_clients.values())
+            self._http_clients.clear()
+            self._clients.clear()
+            self._closed = True
+
+        for sync_client, async_client in http_clients:
+            try:
+                sync_client.close()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP client: {e}")
+            try:
+                asyncio.run(async_client.aclose())
+            except RuntimeError:
+                # Called from inside a running event loop; use aclose() instead
+                logger.warning(
+                    "Async HTTP client not closed: call ModelClientRegistry.aclose() "
+                    "from within the event loop")
+            except Exception as e:
+                logger.warning(f"Error closing async HTTP client: {e}")
+
+    async def aclose(self) -> None:
+        """Async variant of close() for use inside a running event loop."""
+        with self._lock:
+            http_clients = list(self._http_clients.values())
+            self._http_clients.clear()
+            self._clients.clear()
+            self._closed = True
+
+        for sync_client, async_client in http_clients:
+            sync_client.close()
+            await async_client.aclose()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+_registry: Optional[ModelClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ModelClientRegistry:
+    """Return the process-wide model client registry."""
+    global _registry
+    if _registry is None or _registry._closed:
+        with _registry_lock:
+            if _registry is None or _registry._closed:
+                _registry = ModelClientRegistry()
+    return _registry
+
+
+def shutdown_clients() -> None:
+    """Close the process-wide registry and all of its connection pools."""
+    global _registry
+    with _registry_lock:
+        registry, _registry = _registry, None
+    if registry is not None:
+        registry.close()
+
+
+atexit.register(shutdown_clients)
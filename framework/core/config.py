@@ -4,7 +4,9 @@ import json
 from typing import Dict, Any, List, Optional, Union
 from pydantic import BaseModel, Field
 from ..utils.import_helper import import_from_string
+from .dag import topological_order
 from .errors import ConfigError
+from .executors import EXECUTOR_MODES
 
 
 class NodeConfig(BaseModel):
@@ -17,6 +19,11 @@ class NodeConfig(BaseModel):
     prompt_template: Optional[str] = None
     tool: Optional[str] = None
     output: Optional[Dict[str, str]] = None
+    depends_on: Optional[List[str]] = None
+    input_mapping: Optional[Dict[str, str]] = None
+    cache: Optional[Dict[str, Any]] = None
+    retry: Optional[Dict[str, Any]] = None
+    executor: Optional[str] = None
 
     def validate_node_config(self):
         """Validate that the node configuration is consistent."""
@@ -27,13 +34,29 @@ class NodeConfig(BaseModel):
             if not self.prompt_template:
                 raise ConfigError(
                     f"Node {self.id} is of type 'llm' but has no prompt_template specified")
+            output = self.output or {}
+            mode = output.get("mode", "text")
+            if mode not in ("text", "structured"):
+                raise ConfigError(
+                    f"Node {self.id} has unknown output mode: {mode}")
+            if mode == "structured" and output.get("type") not in ("json", "pydantic"):
+                raise ConfigError(
+                    f"Node {self.id} uses structured output mode but its output type is not 'json' or 'pydantic'")
         elif self.type == "tool":
             if not self.tool:
                 raise ConfigError(
                     f"Node {self.id} is of type 'tool' but has no tool specified")
+            if self.executor and self.executor not in EXECUTOR_MODES:
+                raise ConfigError(
+                    f"Node {self.id} has unknown executor: {self.executor} "
+                    f"(expected one of {', '.join(EXECUTOR_MODES)})")
         else:
             raise ConfigError(f"Node {self.id} has unknown type: {self.type}")
 
+        if self.executor and self.type != "tool":
+            raise ConfigError(
+                f"Node {self.id} sets an executor, which only tool nodes support")
+
         return True
 
 
@@ -47,27 +70,26 @@ class PipelineConfig(BaseModel):
     nodes: List[NodeConfig]
     output: Optional[Dict[str, str]] = None
 
+    def validate_dependencies(self):
+        """Validate explicitly declared node dependencies (unknown IDs and cycles)."""
+        ids = [node.id for node in self.nodes]
+        if len(set(ids)) != len(ids):
+            raise ConfigError("Node IDs must be unique")
+
+        topological_order(
+            {node.id: list(node.depends_on or []) for node in self.nodes})
+
+        return True
+
 
 class ConfigLoader:
     """Loads and validates configuration files."""
 
     @staticmethod
-    def load_config(config_path: str) -> PipelineConfig:
-        """Load a configuration file from the given path."""
-        if not os.path.exists(config_path):
-            raise ConfigError(f"Config file not found: {config_path}")
-
-        _, ext = os.path.splitext(config_path)
-
+    def load_config_dict(config_data: Dict[str, Any]) -> PipelineConfig:
+        """Validate a configuration dictionary and build a PipelineConfig."""
         try:
-            if ext.lower() == '.yaml' or ext.lower() == '.yml':
-                with open(config_path, 'r') as f:
-                    config_data = yaml.safe_load(f)
-            elif ext.lower() == '.json':
-                with open(config_path, 'r') as f:
-                    config_data = json.load(f)
-            else:
-                raise ConfigError(f"Unsupported config file format: {ext}")
+            config_data = dict(config_data)
 
             # Convert nodes to NodeConfig objects if they're not already
             if 'nodes' in config_data and isinstance(config_data['nodes'], list):
@@ -84,7 +106,35 @@ class ConfigLoader:
                 else:
                     node.validate_node_config()
 
-            return PipelineConfig(**config_data)
+            config = PipelineConfig(**config_data)
+            config.validate_dependencies()
+
+            return config
+
+        except ConfigError:
+            raise
+        except Exception as e:
+            raise ConfigError(f"Invalid config: {e}")
+
+    @staticmethod
+    def load_config(config_path: str) -> PipelineConfig:
+        """Load a configuration file from the given path."""
+        if not os.path.exists(config_path):
+            raise ConfigError(f"Config file not found: {config_path}")
+
+        _, ext = os.path.splitext(config_path)
+
+        try:
+            if ext.lower() == '.yaml' or ext.lower() == '.yml':
+                with open(config_path, 'r') as f:
+                    config_data = yaml.safe_load(f)
+            elif ext.lower() == '.json':
+                with open(config_path, 'r') as f:
+                    config_data = json.load(f)
+            else:
+                raise ConfigError(f"Unsupported config file format: {ext}")
+
+            return ConfigLoader.load_config_dict(config_data)
 
         except (yaml.YAMLError, json.JSONDecodeError) as e:
             raise ConfigError(f"Error parsing config file: {e}")
@@ -0,0 +1,81 @@
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+class InputPlan:
+    """Precomputed mapping from graph state to the context a node receives.
+
+    The plan lists exactly which inputs and node outputs a node reads and
+    under which names, so building a context is a handful of dictionary
+    lookups instead of a scan over the whole state.
+    """
+
+    __slots__ = ("input_keys", "state_keys", "all_inputs", "read_only")
+
+    def __init__(
+        self,
+        input_keys: List[Tuple[str, str]],
+        state_keys: List[Tuple[str, str]],
+        all_inputs: bool = False,
+        read_only: bool = True
+    ):
+        self.input_keys = input_keys
+        self.state_keys = state_keys
+        self.all_inputs = all_inputs
+        self.read_only = read_only
+
+    def build(self, state: Mapping[str, Any]) -> Mapping[str, Any]:
+        """Build the node's context from the current graph state."""
+        inputs = state.get("inputs") or {}
+        context = dict(inputs) if self.all_inputs else {}
+
+        for name, source in self.input_keys:
+            if source in inputs:
+                context[name] = inputs[source]
+
+        for name, key in self.state_keys:
+            if key in state:
+                context[name] = state[key]
+
+        return MappingProxyType(context) if self.read_only else context
+
+
+def plan_inputs(
+    node_id: str,
+    node_ids: Iterable[str],
+    variables: Optional[Iterable[str]] = None,
+    input_mapping: Optional[Dict[str, str]] = None
+) -> InputPlan:
+    """
+    Build the input plan for a node.
+
+    Args:
+        node_id: ID of the node the plan is for
+        node_ids: IDs of all nodes in the pipeline
+        variables: Names the node reads (e.g. its prompt's variables), or
+            None if the node needs the full context
+        input_mapping: Context names mapped to a source node ID or input name
+
+    Returns:
+        An InputPlan; full-context plans return a mutable dict, variable
+        plans a read-only view
+    """
+    node_ids = [other for other in node_ids if other != node_id]
+    mapping = dict(input_mapping or {})
+    full_context = variables is None
+
+    if full_context:
+        # Every input and node output under its own name, plus the aliases
+        names = [other for other in node_ids if other not in mapping] + list(mapping)
+    else:
+        names = list(variables)
+
+    input_keys, state_keys = [], []
+    for name in names:
+        source = mapping.get(name, name)
+        if source in node_ids:
+            state_keys.append((name, f"node_output_{source}"))
+        elif not full_context or name in mapping:
+            input_keys.append((name, source))
+
+    return InputPlan(input_keys, state_keys, all_inputs=full_context, read_only=not full_context)
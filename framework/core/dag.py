@@ -0,0 +1,78 @@
+from typing import Dict, Iterable, List
+from .errors import ConfigError
+
+
+def topological_order(dependencies: Dict[str, List[str]]) -> List[str]:
+    """
+    Order node IDs so that every node comes after the nodes it depends on.
+
+    Args:
+        dependencies: Mapping of node ID to the IDs it depends on, in config order
+
+    Returns:
+        Node IDs in a valid execution order (config order is kept where possible)
+
+    Raises:
+        ConfigError: If a dependency is unknown or the dependencies form a cycle
+    """
+    for node_id, deps in dependencies.items():
+        for dep in deps:
+            if dep not in dependencies:
+                raise ConfigError(
+                    f"Node {node_id} depends on unknown node: {dep}")
+            if dep == node_id:
+                raise ConfigError(f"Node {node_id} depends on itself")
+
+    order = []
+    visited = set()
+    visiting = []
+
+    def visit(node_id: str):
+        if node_id in visited:
+            return
+        if node_id in visiting:
+            cycle = visiting[visiting.index(node_id):] + [node_id]
+            raise ConfigError(
+                f"Dependency cycle detected: {' -> '.join(cycle)}")
+
+        visiting.append(node_id)
+        for dep in dependencies[node_id]:
+            visit(dep)
+        visiting.pop()
+
+        visited.add(node_id)
+        order.append(node_id)
+
+    for node_id in dependencies:
+        visit(node_id)
+
+    return order
+
+
+def find_sinks(dependencies: Dict[str, List[str]]) -> List[str]:
+    """Return the node IDs no other node depends on, in config order."""
+    depended_on = {dep for deps in dependencies.values() for dep in deps}
+    return [node_id for node_id in dependencies if node_id not in depended_on]
+
+
+def infer_dependencies(
+    node_id: str,
+    variables: Iterable[str],
+    node_ids: Iterable[str],
+    aliases: Dict[str, str] = None
+) -> List[str]:
+    """
+    Infer the nodes a node depends on from the variables its prompt references.
+
+    Args:
+        node_id: ID of the node being resolved
+        variables: Variable names referenced by the node's prompt template
+        node_ids: IDs of all nodes in the pipeline, in config order
+        aliases: Context names that map to another node's output
+
+    Returns:
+        IDs of the referenced nodes, in config order
+    """
+    aliases = aliases or {}
+    referenced = {aliases.get(name, name) for name in variables}
+    return [other for other in node_ids if other != node_id and other in referenced]
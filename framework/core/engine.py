@@ -1,23 +1,48 @@
 from typing import Dict, Any, List, Optional, Union
 import importlib
 import logging
+import time
+import uuid
+from contextlib import contextmanager
 from pydantic import BaseModel
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.checkpoint.memory import MemorySaver
 from typing_extensions import TypedDict, Annotated
 
+from .batching import DEFAULT_BATCH_WINDOW, DEFAULT_MAX_BATCH_SIZE
+from .cache import DEFAULT_MAX_ENTRIES, get_response_cache
+from .checkpoint import create_checkpointer
+from .clients import get_client_registry, is_fake_model
 from .config import PipelineConfig, NodeConfig
+from .context import InputPlan, plan_inputs
+from .dag import find_sinks, infer_dependencies, topological_order
 from .node import LLMNode, ToolNode
-from .errors import ConfigError, NodeError
+from .metrics import NodeMetrics, PipelineMetrics, get_metrics
+from .errors import ConfigError, NodeError, PromptError, SchemaError
+from .executors import ToolPool, get_tool_pools
+from .ratelimit import get_rate_limiters
+from .retry import RetryPolicy
+from .singleflight import get_single_flight
 from ..utils.import_helper import import_from_string
+from ..utils.schema import CompiledSchema, compile_schema
+from ..utils.template import get_template_cache
 
-# Configure logging
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Framework stream modes and the LangGraph stream modes backing them
+STREAM_MODES = {
+    "values": "values",
+    "updates": "updates",
+    "tokens": ["custom", "updates"],
+}
+
+
+def _merge_dicts(left: Optional[dict], right: Optional[dict]) -> dict:
+    """State reducer that merges per-node dictionaries written in parallel."""
+    return {**(left or {}), **(right or {})}
+
 
 class PipelineEngine:
     """Main engine for executing the pipeline defined in the configuration."""
@@ -26,11 +51,85 @@ class PipelineEngine:
         self.config = config
         self.nodes = {}
         self.graph = None
-        self.checkpointer = MemorySaver()
+        settings = self.config.settings or {}
+
+        # Checkpointer selected by settings.checkpointer (memory, sqlite or none)
+        self.checkpointer = create_checkpointer(settings)
+
+        # Apply connection pool settings to the shared model clients
+        if settings.get("client_pool_size"):
+            get_client_registry().configure(
+                pool_size=settings["client_pool_size"])
+
+        # Shared LLM response cache (settings.cache_enabled)
+        self.response_cache = None
+        if settings.get("cache_enabled"):
+            self.response_cache = get_response_cache(
+                path=settings.get("cache_path"),
+                max_entries=settings.get(
+                    "cache_max_entries", DEFAULT_MAX_ENTRIES),
+                default_ttl=settings.get("cache_ttl")
+            )
+
+        # Near-duplicate prompt cache (settings.semantic_cache: true or options)
+        self.semantic_cache = None
+        if settings.get("semantic_cache"):
+            self.semantic_cache = self._create_semantic_cache(settings["semantic_cache"])
+
+        # Identical concurrent model calls share one request (settings.coalesce_requests).
+        # Off by default: callers at temperature > 0 would all get the same sample
+        self.single_flight = None
+        if settings.get("coalesce_requests", False):
+            self.single_flight = get_single_flight()
+
+        # Per-model/provider request, token and concurrency limits (settings.rate_limits)
+        if settings.get("rate_limits"):
+            get_rate_limiters().configure(settings["rate_limits"])
+
+        # Sizes and back-pressure limits of the shared tool pools (settings.tool_executors)
+        if settings.get("tool_executors"):
+            get_tool_pools().configure(settings["tool_executors"])
 
         # Initialize nodes
         self._initialize_nodes()
 
+        # Start pool workers (and import tools in process workers) before the first run
+        if settings.get("prewarm_tool_executors", True):
+            self.prewarm_tool_pools()
+
+        # Per-node timings, cache/retry/token counters (settings.metrics, opt-in)
+        self.metrics = None
+        if settings.get("metrics", False):
+            registry = get_metrics()
+            self.metrics = PipelineMetrics(registry, self.config.name)
+            for node in self.nodes.values():
+                node.metrics = NodeMetrics(
+                    registry, self.config.name, node.id, getattr(node, "model", None))
+
+        # Group concurrent calls of each LLM node into llm.batch (settings.llm_batching)
+        batching = settings.get("llm_batching")
+        if batching:
+            options = batching if isinstance(batching, dict) else {}
+            for node in self.nodes.values():
+                if isinstance(node, LLMNode):
+                    node.enable_batching(
+                        max_batch_size=options.get(
+                            "max_batch_size", DEFAULT_MAX_BATCH_SIZE),
+                        window=options.get("window", DEFAULT_BATCH_WINDOW)
+                    )
+
+        # Compile every prompt template up front so runs never pay for it
+        if settings.get("template_cache_size"):
+            get_template_cache().configure(int(settings["template_cache_size"]))
+        self.precompile_templates()
+
+        # Work out which nodes depend on which, rejecting cycles early
+        self.dependencies = self._resolve_dependencies()
+        self.execution_order = topological_order(self.dependencies)
+
+        # Precompute the context each node reads from the graph state
+        self.input_plans = self._create_input_plans()
+
     def _initialize_nodes(self):
         """Initialize all nodes defined in the configuration."""
         for node_config in self.config.nodes:
@@ -44,7 +143,19 @@ class PipelineEngine:
                     output_type=node_config.output.get(
                         "type", "raw") if node_config.output else "raw",
                     output_schema=node_config.output.get(
-                        "schema") if node_config.output else None
+                        "schema") if node_config.output else None,
+                    cache=self._node_cache(node_config),
+                    cache_ttl=(node_config.cache or {}).get("ttl"),
+                    retry_policy=RetryPolicy.from_settings(
+                        self.config.settings, node_config.retry),
+                    compiled_schema=self._node_schema(node_config),
+                    output_mode=node_config.output.get(
+                        "mode", "text") if node_config.output else "text",
+                    semantic_cache=self._node_semantic_cache(node_config),
+                    semantic_threshold=(node_config.cache or {}).get("similarity_threshold"),
+                    single_flight=self.single_flight,
+                    rate_limiter=get_rate_limiters().get(node_config.model),
+                    client_options=self._client_options(node_config)
                 )
             elif node_config.type == "tool":
                 self.nodes[node_config.id] = ToolNode(
@@ -54,9 +165,137 @@ class PipelineEngine:
                     output_type=node_config.output.get(
                         "type", "raw") if node_config.output else "raw",
                     output_schema=node_config.output.get(
-                        "schema") if node_config.output else None
+                        "schema") if node_config.output else None,
+                    compiled_schema=self._node_schema(node_config),
+                    executor=node_config.executor or "inline"
                 )
 
+    def prewarm_tool_pools(self):
+        """Start the workers of every tool pool this pipeline uses."""
+        tool_paths: Dict[ToolPool, List[str]] = {}
+        for node in self.nodes.values():
+            if isinstance(node, ToolNode) and node.pool is not None:
+                tool_paths.setdefault(node.pool, []).append(node.tool_path)
+        for pool, paths in tool_paths.items():
+            pool.prewarm(paths)
+
+    def _client_options(self, node_config: NodeConfig) -> Dict[str, Any]:
+        """Simulated latency/payload options of this pipeline's "fake" models (settings.fake_llm)."""
+        fake_llm = (self.config.settings or {}).get("fake_llm")
+        if fake_llm and is_fake_model(node_config.model):
+            return dict(fake_llm)
+        return {}
+
+    def _node_schema(self, node_config: NodeConfig) -> Optional[CompiledSchema]:
+        """Resolve a node's pydantic output schema once, at build time."""
+        output = node_config.output or {}
+        if output.get("type") != "pydantic" or not output.get("schema"):
+            return None
+        try:
+            return compile_schema(output["schema"])
+        except SchemaError as e:
+            raise ConfigError(f"Invalid output schema for node {node_config.id}: {e}")
+
+    def _node_cache(self, node_config: NodeConfig):
+        """Return the response cache for a node, honoring its per-node opt-out."""
+        if self.response_cache is None:
+            return None
+        if not (node_config.cache or {}).get("enabled", True):
+            return None
+        return self.response_cache
+
+    @staticmethod
+    def _create_semantic_cache(options: Any):
+        """Build (or reuse) the shared semantic cache described by settings.semantic_cache."""
+        # NumPy is only needed when the semantic cache is enabled
+        from .semantic_cache import (
+            DEFAULT_DIM, DEFAULT_MAX_ENTRIES as DEFAULT_SEMANTIC_ENTRIES, DEFAULT_THRESHOLD,
+            HashingEmbedder, get_semantic_cache)
+
+        options = options if isinstance(options, dict) else {}
+        if options.get("embedder"):
+            try:
+                embedder = import_from_string(options["embedder"])()
+            except ImportError:
+                raise ConfigError(f"Could not import embedder: {options['embedder']}")
+        else:
+            embedder = HashingEmbedder(dim=int(options.get("dim", DEFAULT_DIM)))
+
+        return get_semantic_cache(
+            path=options.get("path"),
+            max_entries=int(options.get("max_entries", DEFAULT_SEMANTIC_ENTRIES)),
+            threshold=float(options.get("threshold", DEFAULT_THRESHOLD)),
+            embedder=embedder
+        )
+
+    def _node_semantic_cache(self, node_config: NodeConfig):
+        """Return the semantic cache for a node, honoring its per-node opt-out."""
+        if self.semantic_cache is None:
+            return None
+        if not (node_config.cache or {}).get("semantic", True):
+            return None
+        return self.semantic_cache
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return response cache hit/miss counters (empty if caching is disabled)."""
+        return self.response_cache.stats() if self.response_cache else {}
+
+    def coalescing_stats(self) -> Dict[str, Any]:
+        """Return model calls made and calls coalesced into them (empty if coalescing is off)."""
+        return self.single_flight.stats() if self.single_flight else {}
+
+    def rate_limit_stats(self) -> Dict[str, Any]:
+        """Return the state of the shared rate limiters, keyed by model, provider or "default"."""
+        return get_rate_limiters().stats()
+
+    def tool_pool_stats(self) -> Dict[str, Any]:
+        """Return counters of the shared tool pools, keyed by executor kind."""
+        return get_tool_pools().stats()
+
+    def precompile_templates(self):
+        """Compile the prompt template of every LLM node into the shared template cache."""
+        for node in self.nodes.values():
+            if isinstance(node, LLMNode):
+                try:
+                    node.template_renderer.compile(node.prompt_template)
+                except PromptError as e:
+                    raise ConfigError(
+                        f"Invalid prompt template for node {node.id}: {e}")
+
+    def _resolve_dependencies(self) -> Dict[str, List[str]]:
+        """
+        Determine the upstream nodes of every node.
+
+        Explicit ``depends_on`` lists win. LLM nodes otherwise depend on the
+        nodes their prompt template references (directly or via
+        ``input_mapping``),
+        and tool nodes, which receive the whole context, depend on every node
+        declared before them.
+        """
+        node_ids = [node_config.id for node_config in self.config.nodes]
+        dependencies = {}
+
+        for index, node_config in enumerate(self.config.nodes):
+            node = self.nodes[node_config.id]
+            variables = None
+            if isinstance(node, LLMNode):
+                variables = node.template_renderer.variables(node.prompt_template)
+
+            if node_config.depends_on is not None:
+                dependencies[node.id] = list(node_config.depends_on)
+            elif variables is not None:
+                dependencies[node.id] = infer_dependencies(
+                    node.id,
+                    variables,
+                    node_ids,
+                    node_config.input_mapping
+                )
+            else:
+                # Tools (and prompts whose variables can't be determined) may read anything
+                dependencies[node.id] = node_ids[:index]
+
+        return dependencies
+
     def _create_state_class(self):
         """Create a TypedDict class for the state based on node outputs."""
         # Define the state class dynamically
@@ -67,6 +306,8 @@ class PipelineEngine:
         state_dict = {
             "messages": Annotated[list, add_messages],
             "inputs": dict,  # Store input values
+            # Per-node execution metadata (step, timings), merged across nodes
+            "node_meta": Annotated[dict, _merge_dicts],
         }
 
         # Add fields for each node's output with a prefix to avoid conflicts
@@ -80,46 +321,118 @@ class PipelineEngine:
 
         return State
 
+    def _create_input_plans(self) -> Dict[str, InputPlan]:
+        """Precompute which inputs and node outputs each node reads from the state."""
+        node_ids = [node_config.id for node_config in self.config.nodes]
+        plans = {}
+
+        for node_config in self.config.nodes:
+            node = self.nodes[node_config.id]
+            # LLM nodes only see what their prompt uses; tools (and prompts
+            # including templates that can't be resolved) get the full context
+            variables = None
+            if isinstance(node, LLMNode):
+                variables = node.template_renderer.variables(
+                    node.prompt_template)
+
+            plans[node.id] = plan_inputs(
+                node.id, node_ids, variables, node_config.input_mapping)
+
+        return plans
+
+    @staticmethod
+    def _node_meta(node, config, started: float) -> Dict[str, Any]:
+        """Build the execution metadata recorded for a node in the state."""
+        metadata = (config or {}).get("metadata", {})
+        duration = time.perf_counter() - started
+        if node.metrics is not None:
+            node.metrics.duration(duration)
+        return {
+            node.id: {
+                "step": metadata.get("langgraph_step"),
+                "duration_ms": round(duration * 1000, 3),
+                "finished_at": time.time()
+            }
+        }
+
+    def _record_queue_time(self, node, state, config) -> None:
+        """Record how long a node waited between becoming ready and starting."""
+        if node.metrics is None:
+            return
+        # A node is ready once its last dependency finished (or the run started)
+        node_meta = state.get("node_meta") or {}
+        finished = [node_meta[dep]["finished_at"]
+                    for dep in self.dependencies[node.id] if dep in node_meta]
+        ready_at = max(finished) if finished else (
+            (config or {}).get("configurable", {}).get("run_started_at"))
+        if ready_at is not None:
+            node.metrics.stage("queue", max(time.time() - ready_at, 0.0))
+
+    @staticmethod
+    def _stream_options(node, config) -> Dict[str, Any]:
+        """Return the token streaming arguments for a node, if the run streams tokens."""
+        configurable = (config or {}).get("configurable", {})
+        if not isinstance(node, LLMNode) or not configurable.get("stream_tokens"):
+            return {}
+
+        from langgraph.config import get_stream_writer
+
+        return {
+            "stream_writer": get_stream_writer(),
+            "partial_json": configurable.get("partial_json", False)
+        }
+
     def _create_node_functions(self):
-        """Create functions for each node to be used in the graph."""
+        """Create sync/async runnables for each node to be used in the graph."""
         node_functions = {}
 
         for node_id, node in self.nodes.items():
-            def create_node_func(node):
-                def node_func(state):
-                    # Extract relevant context from state
-                    context = {
-                        # Include original inputs
-                        **state.get("inputs", {}),
-                    }
+            # Use a unique name for the node in the graph
+            graph_node_id = f"graph_node_{node_id}"
+
+            def create_node_func(node, graph_node_id, plan):
+                def node_func(state, config):
+                    started = time.perf_counter()
+                    self._record_queue_time(node, state, config)
 
-                    # Add node outputs to context with their original IDs
-                    for k, v in state.items():
-                        if k.startswith("node_output_"):
-                            # Remove "node_output_" prefix
-                            original_id = k[12:]
-                            context[original_id] = v
+                    # Process the node
+                    try:
+                        result = node.process(
+                            plan.build(state), **self._stream_options(node, config))
+                    except Exception as e:
+                        if node.metrics is not None:
+                            node.metrics.error(e)
+                        raise
 
-                    # Special handling for specific node types
-                    if node.id == "novel_creator" and "topic_generator" in context:
-                        # Make topic_generator output available as novel_topics
-                        context["novel_topics"] = context["topic_generator"]
+                    # Return the node's output with a prefixed key to avoid conflict
+                    return {
+                        f"node_output_{node.id}": result.get(node.id),
+                        "node_meta": self._node_meta(node, config, started)
+                    }
 
-                    if node.id == "novel_combiner" and "novel_creator" in context:
-                        # Make novel_creator output available as novel_outlines
-                        context["novel_outlines"] = context["novel_creator"]
+                async def anode_func(state, config):
+                    started = time.perf_counter()
+                    self._record_queue_time(node, state, config)
 
-                    # Process the node
-                    result = node.process(context)
+                    # Process the node without blocking the event loop
+                    try:
+                        result = await node.aprocess(
+                            plan.build(state), **self._stream_options(node, config))
+                    except Exception as e:
+                        if node.metrics is not None:
+                            node.metrics.error(e)
+                        raise
 
                     # Return the node's output with a prefixed key to avoid conflict
-                    return {f"node_output_{node.id}": result.get(node.id)}
+                    return {
+                        f"node_output_{node.id}": result.get(node.id),
+                        "node_meta": self._node_meta(node, config, started)
+                    }
 
-                return node_func
+                return RunnableLambda(node_func, afunc=anode_func, name=graph_node_id)
 
-            # Use a unique name for the node in the graph
-            graph_node_id = f"graph_node_{node_id}"
-            node_functions[graph_node_id] = create_node_func(node)
+            node_functions[graph_node_id] = create_node_func(
+                node, graph_node_id, self.input_plans[node_id])
 
         return node_functions
 
@@ -138,33 +451,37 @@ class PipelineEngine:
         for graph_node_id, node_func in node_functions.items():
             graph_builder.add_node(graph_node_id, node_func)
 
-        # Add edges based on node order in config
-        prev_graph_node = None
-        for node_config in self.config.nodes:
-            graph_node_id = f"graph_node_{node_config.id}"
+        # Add edges from the dependency DAG; independent nodes run in parallel
+        for node_id in self.execution_order:
+            graph_node_id = f"graph_node_{node_id}"
+            upstream = [f"graph_node_{dep}" for dep in self.dependencies[node_id]]
 
-            if prev_graph_node is None:
-                # First node, connect from START
+            if not upstream:
+                # Root node, connect from START
                 graph_builder.add_edge(START, graph_node_id)
+            elif len(upstream) == 1:
+                graph_builder.add_edge(upstream[0], graph_node_id)
             else:
-                # Connect from previous node
-                graph_builder.add_edge(prev_graph_node, graph_node_id)
+                # Wait for every upstream node before running this one
+                graph_builder.add_edge(upstream, graph_node_id)
 
-            prev_graph_node = graph_node_id
-
-        # Connect last node to END
-        if prev_graph_node:
-            graph_builder.add_edge(prev_graph_node, END)
+        # Connect nodes nothing depends on to END
+        for node_id in find_sinks(self.dependencies):
+            graph_builder.add_edge(f"graph_node_{node_id}", END)
 
         # Compile the graph
         self.graph = graph_builder.compile(checkpointer=self.checkpointer)
         return self.graph
 
-    def run(self, inputs: Dict[str, Any], thread_id: str = "default", callbacks=None):
-        """Run the pipeline with the given inputs."""
+    def _prepare_run(self, inputs: Dict[str, Any], thread_id: Optional[str], callbacks=None):
+        """Build the initial state and run configuration for a pipeline execution."""
         if not self.graph:
             self.build_graph()
 
+        # Without an explicit thread, every call starts from a clean state;
+        # a shared default thread would pile up messages across unrelated runs
+        thread_id = thread_id or f"run-{uuid.uuid4().hex}"
+
         # Prepare the initial state
         initial_state = {
             "messages": [{"role": "user", "content": inputs.get("user_input", "")}],
@@ -172,51 +489,228 @@ class PipelineEngine:
         }
 
         # Set up configuration with callbacks
-        config = {"configurable": {"thread_id": thread_id}}
+        config = {"configurable": {"thread_id": thread_id, "run_started_at": time.time()}}
         if callbacks:
             config["callbacks"] = callbacks
 
-        # Run the graph
-        result = self.graph.invoke(initial_state, config)
-
-        # Process the result to extract node outputs
-        processed_result = {}
-        for key, value in result.items():
+        return initial_state, config
+
+    @contextmanager
+    def _track_run(self, method: str):
+        """Record the duration and outcome of a pipeline execution."""
+        if self.metrics is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.metrics.run(method, time.perf_counter() - started, ok=False)
+            raise
+        self.metrics.run(method, time.perf_counter() - started)
+
+    @staticmethod
+    def _process_state(state: Dict[str, Any]) -> Dict[str, Any]:
+        """Strip internal keys from a state snapshot and restore node IDs."""
+        processed = {}
+        for key, value in state.items():
             if key.startswith("node_output_"):
                 # Extract the original node ID from the output key
                 node_id = key[12:]  # Remove "node_output_" prefix
-                processed_result[node_id] = value
-            elif key != "inputs":  # Skip the inputs field
-                processed_result[key] = value
+                processed[node_id] = value
+            elif key not in ("inputs", "node_meta"):  # Skip internal fields
+                processed[key] = value
 
-        return processed_result
+        return processed
 
-    def stream(self, inputs: Dict[str, Any], thread_id: str = "default", callbacks=None):
-        """Stream the pipeline execution with the given inputs."""
-        if not self.graph:
-            self.build_graph()
+    def run(self, inputs: Dict[str, Any], thread_id: Optional[str] = None, callbacks=None):
+        """Run the pipeline with the given inputs."""
+        initial_state, config = self._prepare_run(inputs, thread_id, callbacks)
 
-        # Prepare the initial state
-        initial_state = {
-            "messages": [{"role": "user", "content": inputs.get("user_input", "")}],
-            "inputs": inputs  # Store all inputs in a dedicated field
-        }
+        # Run the graph
+        with self._track_run("run"):
+            result = self.graph.invoke(initial_state, config)
 
-        # Set up configuration with callbacks
-        config = {"configurable": {"thread_id": thread_id}}
-        if callbacks:
-            config["callbacks"] = callbacks
+        # Process the result to extract node outputs
+        return self._process_state(result)
+
+    def stream(
+        self,
+        inputs: Dict[str, Any],
+        thread_id: Optional[str] = None,
+        callbacks=None,
+        mode: str = "values",
+        partial_json: bool = False
+    ):
+        """
+        Stream the pipeline execution with the given inputs.
+
+        Args:
+            inputs: Input values for the pipeline
+            thread_id: Thread ID for conversation state (a fresh thread if omitted)
+            callbacks: Optional LangChain callbacks
+            mode: "values" for a full state snapshot after every step,
+                "updates" for only the output each node produced, or
+                "tokens" for model tokens as they are generated
+            partial_json: In "tokens" mode, also emit partially parsed
+                json/pydantic outputs
+
+        Yields:
+            State snapshots ("values") or event dictionaries ("updates", "tokens")
+        """
+        initial_state, config, stream_mode = self._prepare_stream(
+            inputs, thread_id, callbacks, mode, partial_json)
 
         # Stream the graph execution
-        for event in self.graph.stream(initial_state, config, stream_mode="values"):
+        with self._track_run("stream"):
+            for event in self.graph.stream(initial_state, config, stream_mode=stream_mode):
+                yield from self._process_stream_event(mode, event)
+
+    async def arun(self, inputs: Dict[str, Any], thread_id: Optional[str] = None, callbacks=None):
+        """Run the pipeline asynchronously with the given inputs."""
+        initial_state, config = self._prepare_run(inputs, thread_id, callbacks)
+
+        # Run the graph on the current event loop
+        with self._track_run("arun"):
+            result = await self.graph.ainvoke(initial_state, config)
+
+        # Process the result to extract node outputs
+        return self._process_state(result)
+
+    async def astream(
+        self,
+        inputs: Dict[str, Any],
+        thread_id: Optional[str] = None,
+        callbacks=None,
+        mode: str = "values",
+        partial_json: bool = False
+    ):
+        """Stream the pipeline execution asynchronously (see stream() for the modes)."""
+        initial_state, config, stream_mode = self._prepare_stream(
+            inputs, thread_id, callbacks, mode, partial_json)
+
+        # Stream the graph execution on the current event loop
+        with self._track_run("astream"):
+            async for event in self.graph.astream(initial_state, config, stream_mode=stream_mode):
+                for processed_event in self._process_stream_event(mode, event):
+                    yield processed_event
+
+    def _prepare_stream(self, inputs, thread_id, callbacks, mode, partial_json):
+        """Build the state, config and LangGraph stream mode for a stream() call."""
+        if mode not in STREAM_MODES:
+            raise ValueError(
+                f"Unsupported stream mode: {mode} (expected one of {', '.join(STREAM_MODES)})")
+
+        initial_state, config = self._prepare_run(inputs, thread_id, callbacks)
+        if mode == "tokens":
+            config["configurable"]["stream_tokens"] = True
+            config["configurable"]["partial_json"] = partial_json
+
+        return initial_state, config, STREAM_MODES[mode]
+
+    def _process_stream_event(self, mode: str, event):
+        """Translate a raw LangGraph stream event into framework events."""
+        if mode == "values":
             # Process the event to extract node outputs
-            processed_event = {}
-            for key, value in event.items():
-                if key.startswith("node_output_"):
-                    # Extract the original node ID from the output key
-                    node_id = key[12:]  # Remove "node_output_" prefix
-                    processed_event[node_id] = value
-                elif key != "inputs":  # Skip the inputs field
-                    processed_event[key] = value
-
-            yield processed_event
+            yield self._process_state(event)
+            return
+
+        if mode == "tokens":
+            stream_mode, event = event
+            if stream_mode == "custom":
+                # Token and partial output events written by LLM nodes
+                yield event
+                return
+
+        # Only the keys each node changed, plus its execution metadata
+        for graph_node_id, update in (event or {}).items():
+            node_id = graph_node_id[len("graph_node_"):]
+            update = update or {}
+            meta = update.get("node_meta", {}).get(node_id, {})
+            yield {
+                "type": "node",
+                "node": node_id,
+                "step": meta.get("step"),
+                "duration_ms": meta.get("duration_ms"),
+                "output": {node_id: update.get(f"node_output_{node_id}")}
+            }
+
+    def _prepare_batch(
+        self,
+        inputs_list: List[Dict[str, Any]],
+        max_concurrency: int,
+        thread_id_prefix: Optional[str],
+        callbacks=None
+    ):
+        """Build initial states and configs for a batch, one thread ID per item."""
+        # Every item needs its own thread so checkpoints don't collide
+        thread_id_prefix = thread_id_prefix or f"batch-{uuid.uuid4().hex}"
+
+        states, configs = [], []
+        for index, inputs in enumerate(inputs_list):
+            initial_state, config = self._prepare_run(
+                inputs, f"{thread_id_prefix}-{index}", callbacks)
+            config["max_concurrency"] = max_concurrency
+            states.append(initial_state)
+            configs.append(config)
+
+        return states, configs
+
+    def _process_batch(self, results: List[Any]) -> List[Any]:
+        """Process batch results, leaving per-item exceptions in place."""
+        return [
+            result if isinstance(result, Exception) else self._process_state(result)
+            for result in results
+        ]
+
+    def run_batch(
+        self,
+        inputs_list: List[Dict[str, Any]],
+        max_concurrency: int = 8,
+        thread_id_prefix: Optional[str] = None,
+        callbacks=None,
+        return_exceptions: bool = True
+    ) -> List[Any]:
+        """
+        Run the pipeline over many inputs concurrently on one compiled graph.
+
+        Args:
+            inputs_list: One inputs dictionary per pipeline run
+            max_concurrency: Maximum number of runs executing at once
+            thread_id_prefix: Prefix for the per-item thread IDs (random if omitted)
+            callbacks: Optional callbacks passed to every run
+            return_exceptions: Collect per-item errors instead of raising the first
+
+        Returns:
+            One result per input, in input order; failed items hold the exception
+        """
+        if not inputs_list:
+            return []
+
+        states, configs = self._prepare_batch(
+            inputs_list, max_concurrency, thread_id_prefix, callbacks)
+        with self._track_run("run_batch"):
+            results = self.graph.batch(
+                states, configs, return_exceptions=return_exceptions)
+
+        return self._process_batch(results)
+
+    async def arun_batch(
+        self,
+        inputs_list: List[Dict[str, Any]],
+        max_concurrency: int = 8,
+        thread_id_prefix: Optional[str] = None,
+        callbacks=None,
+        return_exceptions: bool = True
+    ) -> List[Any]:
+        """Async variant of run_batch() backed by the graph's abatch."""
+        if not inputs_list:
+            return []
+
+        states, configs = self._prepare_batch(
+            inputs_list, max_concurrency, thread_id_prefix, callbacks)
+        with self._track_run("arun_batch"):
+            results = await self.graph.abatch(
+                states, configs, return_exceptions=return_exceptions)
+
+        return self._process_batch(results)
@@ -0,0 +1,252 @@
+import os
+import atexit
+import pickle
+import asyncio
+import logging
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from .errors import ConfigError, ToolError
+from ..utils.import_helper import import_from_string
+
+logger = logging.getLogger(__name__)
+
+# Where a tool node runs its tool function
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+# Default number of workers per pool
+DEFAULT_THREAD_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+DEFAULT_PROCESS_WORKERS = os.cpu_count() or 1
+
+# Default calls a pool accepts (running plus queued) per worker before callers wait
+DEFAULT_PENDING_PER_WORKER = 4
+
+
+def _call(func: Callable, context: Dict[str, Any]) -> Any:
+    """Call a tool, driving it to completion if it is a coroutine function."""
+    result = func(context)
+    if asyncio.iscoroutine(result):
+        result = asyncio.run(result)
+    return result
+
+
+def _preload(tool_paths: Iterable[str]) -> None:
+    """Import tools in a worker process ahead of the first call."""
+    for tool_path in tool_paths:
+        import_from_string(tool_path)
+
+
+def _call_in_worker(tool_path: str, payload: bytes) -> bytes:
+    """Process pool entry point: run a tool on a pickled context, return the pickled result."""
+    # import_from_string is memoized, so each worker imports a tool once
+    func = import_from_string(tool_path)
+    result = _call(func, pickle.loads(payload))
+    return pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class ToolPool:
+    """Shared, bounded worker pool for tool nodes.
+
+    Wraps a thread or process pool with a limit on the calls it holds
+    (running plus queued). Callers beyond ``max_pending`` wait for a free
+    slot, up to ``queue_timeout`` seconds, instead of piling unbounded work
+    onto the pool. Process pools receive the context pickled once by the
+    caller with the highest protocol and resolve the tool by its import
+    path, so tools are imported once per worker.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        start_method: Optional[str] = None
+    ):
+        if kind not in ("thread", "process"):
+            raise ConfigError(f"Unknown tool pool kind: {kind}")
+
+        self.kind = kind
+        self.max_workers = int(max_workers or (
+            DEFAULT_THREAD_WORKERS if kind == "thread" else DEFAULT_PROCESS_WORKERS))
+        self.max_pending = int(max_pending or self.max_workers * DEFAULT_PENDING_PER_WORKER)
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._warmed: set = set()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+        self.in_flight = 0
+
+        if kind == "thread":
+            self._executor: Executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="framework-tool")
+        else:
+            import multiprocessing
+
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(start_method) if start_method else None)
+
+    def prewarm(self, tool_paths: Iterable[str] = ()) -> None:
+        """Start every worker now (importing the given tools in process workers)."""
+        with self._lock:
+            tool_paths = tuple(sorted(set(tool_paths) - self._warmed))
+            if self._warmed and not tool_paths:
+                return
+            self._warmed.update(tool_paths)
+
+        if self.kind == "thread":
+            futures = [self._executor.submit(int) for _ in range(self.max_workers)]
+        else:
+            futures = [self._executor.submit(_preload, tool_paths) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+    def _acquire(self) -> None:
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self.rejected += 1
+            raise ToolError(
+                f"Timed out waiting for the {self.kind} tool pool "
+                f"({self.max_pending} calls pending)")
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _release_abandoned(self, waiter: "asyncio.Future") -> None:
+        """Give back a slot acquired for a caller that was cancelled meanwhile."""
+        if not waiter.cancelled() and waiter.exception() is None:
+            self._slots.release()
+
+    def _submit(self, tool_path: str, func: Callable, context: Dict[str, Any]) -> Future:
+        """Submit a call once a slot has been acquired."""
+        try:
+            if self.kind == "thread":
+                future = self._executor.submit(_call, func, context)
+            else:
+                try:
+                    payload = pickle.dumps(context, protocol=pickle.HIGHEST_PROTOCOL)
+                except Exception as e:
+                    raise ToolError(f"Context for {tool_path} cannot be sent to a worker process: {e}")
+                future = self._executor.submit(_call_in_worker, tool_path, payload)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+        future.add_done_callback(self._release)
+        return future
+
+    def _result(self, value: Any) -> Any:
+        return pickle.loads(value) if self.kind == "process" else value
+
+    def run(self, tool_path: str, func: Callable, context: Dict[str, Any]) -> Any:
+        """Run a tool on the pool and block until it returns."""
+        self._acquire()
+        return self._result(self._submit(tool_path, func, context).result())
+
+    async def arun(self, tool_path: str, func: Callable, context: Dict[str, Any]) -> Any:
+        """Run a tool on the pool without blocking the event loop."""
+        if not self._slots.acquire(blocking=False):
+            # Wait for a slot off the loop
+            waiter = asyncio.get_running_loop().run_in_executor(None, self._acquire)
+            try:
+                await asyncio.shield(waiter)
+            except asyncio.CancelledError:
+                # The worker thread may still get a slot after we stop waiting
+                waiter.add_done_callback(self._release_abandoned)
+                raise
+        future = self._submit(tool_path, func, context)
+        return self._result(await asyncio.wrap_future(future))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool sizes and call counters."""
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.in_flight,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+class ToolPoolRegistry:
+    """Process-wide thread and process pools shared by every tool node."""
+
+    def __init__(self):
+        self.options: Dict[str, Dict[str, Any]] = {"thread": {}, "process": {}}
+        self._pools: Dict[str, ToolPool] = {}
+        # Kinds whose options were set explicitly
+        self._configured: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def configure(self, options: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Set pool options by kind, e.g. ``{"process": {"max_workers": 4}}``.
+
+        Pools are shared by every pipeline in the process, so options that
+        differ from those a pool was already configured or created with raise
+        ConfigError rather than silently replacing them.
+        """
+        with self._lock:
+            updates = {}
+            for kind, kind_options in options.items():
+                if kind not in self.options:
+                    raise ConfigError(f"Unknown tool pool kind: {kind}")
+                kind_options = dict(kind_options or {})
+                if kind_options == self.options[kind]:
+                    continue
+                if kind in self._configured or kind in self._pools:
+                    raise ConfigError(
+                        f"Conflicting options for the shared {kind} tool pool: "
+                        f"{kind_options} (already {self.options[kind]})")
+                updates[kind] = kind_options
+            self.options.update(updates)
+            self._configured.update(updates)
+
+    def get(self, kind: str) -> ToolPool:
+        """Return the shared pool of a kind, creating it on first use."""
+        pool = self._pools.get(kind)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(kind)
+                if pool is None:
+                    pool = self._pools[kind] = ToolPool(kind, **self.options.get(kind, {}))
+        return pool
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {kind: pool.stats() for kind, pool in list(self._pools.items())}
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
+
+_pools = ToolPoolRegistry()
+
+
+def get_tool_pools() -> ToolPoolRegistry:
+    """Return the process-wide tool pool registry."""
+    return _pools
+
+
+def shutdown_tool_pools() -> None:
+    """Stop every shared tool pool, waiting for running calls to finish."""
+    _pools.shutdown()
+
+
+atexit.register(shutdown_tool_pools)
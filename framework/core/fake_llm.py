@@ -0,0 +1,203 @@
+import re
+import time
+import random
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import PrivateAttr
+
+from ..utils.json_utils import JSONDecodeError, dumps, extract_json
+
+# Supported latency distributions for simulated calls
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal")
+
+# Words used for generated text responses
+_WORDS = (
+    "the quick brown fox jumps over a lazy dog while seven curious owls "
+    "watch from an old oak tree and the river hums a quiet tune"
+).split()
+
+# Streaming splits responses into word-sized tokens, keeping the whitespace
+_TOKEN = re.compile(r"\s*\S+|\s+")
+
+
+class FakeChatModel(BaseChatModel):
+    """Offline, deterministic chat model for tests and benchmarks.
+
+    Simulates provider latency (drawn from a configurable distribution),
+    token-by-token streaming and text, JSON or structured payloads without
+    any network access. With ``payload="auto"`` the model answers with the
+    JSON example found in the prompt, if any, so pipelines whose prompts
+    describe their expected output shape parse successfully.
+    """
+
+    model: str = "fake"
+    responses: Optional[List[str]] = None
+    payload: str = "auto"
+    words: int = 40
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    distribution: str = "constant"
+    token_delay: float = 0.0
+    error_rate: float = 0.0
+    seed: Optional[int] = 0
+    # Report repeated system prompts as cached input tokens, like provider prompt caching
+    prompt_cache: bool = True
+
+    _rng: random.Random = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _index: int = PrivateAttr(default=0)
+    _prefixes: set = PrivateAttr(default_factory=set)
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        if self.distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency distribution: {self.distribution} "
+                f"(expected one of {', '.join(LATENCY_DISTRIBUTIONS)})")
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": self.model, "payload": self.payload, "latency": self.latency}
+
+    def sample_latency(self) -> float:
+        """Draw the simulated time to first token, in seconds."""
+        if not self.latency:
+            return 0.0
+        with self._lock:
+            if self.distribution == "uniform":
+                value = self._rng.uniform(
+                    self.latency - self.latency_jitter, self.latency + self.latency_jitter)
+            elif self.distribution == "normal":
+                value = self._rng.gauss(self.latency, self.latency_jitter)
+            elif self.distribution == "lognormal":
+                # latency is the median, latency_jitter the sigma of the log
+                value = self.latency * self._rng.lognormvariate(0, self.latency_jitter)
+            else:
+                value = self.latency
+        return max(value, 0.0)
+
+    def _maybe_fail(self) -> None:
+        """Raise a simulated transient provider error at the configured rate."""
+        if self.error_rate:
+            with self._lock:
+                failed = self._rng.random() < self.error_rate
+            if failed:
+                raise ConnectionError("Simulated provider error")
+
+    def respond(self, prompt: str) -> str:
+        """Return the response text for a prompt."""
+        if self.responses:
+            with self._lock:
+                response = self.responses[self._index % len(self.responses)]
+                self._index += 1
+            return response
+
+        if self.payload in ("auto", "json"):
+            try:
+                return dumps(extract_json(prompt))
+            except JSONDecodeError:
+                if self.payload == "json":
+                    return dumps({"response": self._text(prompt)})
+        return self._text(prompt)
+
+    def _text(self, prompt: str) -> str:
+        """Generate deterministic filler text for a prompt."""
+        offset = len(prompt) % len(_WORDS)
+        return " ".join(_WORDS[(offset + i) % len(_WORDS)] for i in range(self.words))
+
+    @staticmethod
+    def _prompt(messages: List[BaseMessage]) -> str:
+        """Flatten the messages of a call into one prompt string."""
+        return "\n".join(
+            message.content if isinstance(message.content, str) else str(message.content)
+            for message in messages)
+
+    def _usage(self, messages: List[BaseMessage], prompt: str, text: str) -> Dict[str, Any]:
+        """Approximate token usage, counting words as tokens."""
+        input_tokens = len(_TOKEN.findall(prompt))
+        output_tokens = len(_TOKEN.findall(text))
+        usage: Dict[str, Any] = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        if self.prompt_cache and len(messages) > 1 and messages[0].type == "system":
+            prefix = self._prompt(messages[:1])
+            with self._lock:
+                cached = prefix in self._prefixes
+                self._prefixes.add(prefix)
+            usage["input_token_details"] = {
+                "cache_read" if cached else "cache_creation": len(_TOKEN.findall(prefix))}
+        return usage
+
+    def _result(self, messages: List[BaseMessage], prompt: str, text: str) -> ChatResult:
+        message = AIMessage(content=text, usage_metadata=self._usage(messages, prompt, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        prompt = self._prompt(messages)
+        text = self.respond(prompt)
+        time.sleep(self.sample_latency() + self.token_delay * len(_TOKEN.findall(text)))
+        self._maybe_fail()
+        return self._result(messages, prompt, text)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        prompt = self._prompt(messages)
+        text = self.respond(prompt)
+        await asyncio.sleep(self.sample_latency() + self.token_delay * len(_TOKEN.findall(text)))
+        self._maybe_fail()
+        return self._result(messages, prompt, text)
+
+    def _stream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        prompt = self._prompt(messages)
+        text = self.respond(prompt)
+        time.sleep(self.sample_latency())
+        self._maybe_fail()
+        for token in _TOKEN.findall(text):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        # Usage arrives on a final empty chunk, as with OpenAI's stream_usage
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=self._usage(messages, prompt, text)))
+
+    async def _astream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        prompt = self._prompt(messages)
+        text = self.respond(prompt)
+        await asyncio.sleep(self.sample_latency())
+        self._maybe_fail()
+        for token in _TOKEN.findall(text):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=self._usage(messages, prompt, text)))
+
+    def with_structured_output(self, schema: Any = None, **kwargs: Any):
+        """Return a runnable producing parsed objects, like a provider's native structured output."""
+        def parse(message: AIMessage):
+            data = extract_json(message.content)
+            if schema is None:
+                return data
+            if hasattr(schema, "model_validate"):
+                return schema.model_validate(data)
+            return schema.parse_obj(data)
+
+        return self | RunnableLambda(parse)
@@ -0,0 +1,417 @@
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default histogram buckets (seconds), from sub-millisecond overhead to slow model calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+class MetricSample(NamedTuple):
+    """A single observation, as handed to metric sinks."""
+    kind: str  # "counter" or "histogram"
+    name: str
+    labels: Dict[str, str]
+    value: float
+    timestamp: float
+
+
+class MetricsSink(ABC):
+    """Receives every metric observation, e.g. to forward it to another system.
+
+    Sinks are called synchronously on the recording thread, so they should
+    be cheap or hand samples off to a queue.
+    """
+
+    @abstractmethod
+    def record(self, sample: MetricSample) -> None:
+        """Handle one observation."""
+        pass
+
+    def close(self) -> None:
+        """Flush and release resources. Called when the sink is removed."""
+        pass
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Common state of a labelled metric family."""
+
+    kind = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, documentation: str, labelnames: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    """A monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """Increase the counter for the given labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        if self.registry.sinks:
+            self.registry._emit(self, labels, amount)
+
+    def value(self, **labels: Any) -> float:
+        """Return the current count for the given labels."""
+        return self._values.get(self._key(labels), 0)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            {"labels": dict(zip(self.labelnames, key)), "value": value}
+            for key, value in items
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one observation for the given labels."""
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+        if self.registry.sinks:
+            self.registry._emit(self, labels, value)
+
+    def time(self, **labels: Any) -> "_Timer":
+        """Context manager observing the duration of its block."""
+        return _Timer(self, labels)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(state[0]), state[1], state[2]))
+                           for key, state in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = sorted((key, state[1], state[2]) for key, state in self._values.items())
+        return [
+            {"labels": dict(zip(self.labelnames, key)), "sum": total, "count": count}
+            for key, total, count in items
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class _Timer:
+    """Observes the wall time of a with-block into a histogram."""
+
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, Any]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+class MetricsRegistry:
+    """In-process collection of counters and histograms.
+
+    Metrics are created once by name and shared; ``render_prometheus()``
+    produces the Prometheus text exposition format and every observation
+    is also forwarded to the registered sinks.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self.sinks: List[MetricsSink] = []
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> Any:
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(
+                        self, name, documentation, labelnames, **kwargs)
+        if not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Return the counter with the given name, creating it on first use."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Return the histogram with the given name, creating it on first use."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def add_sink(self, sink: MetricsSink) -> None:
+        """Forward every subsequent observation to a sink."""
+        with self._lock:
+            self.sinks = self.sinks + [sink]
+
+    def remove_sink(self, sink: MetricsSink) -> None:
+        """Stop forwarding observations to a sink and close it."""
+        with self._lock:
+            self.sinks = [existing for existing in self.sinks if existing is not sink]
+        sink.close()
+
+    def _emit(self, metric: _Metric, labels: Dict[str, Any], value: float) -> None:
+        sample = MetricSample(
+            metric.kind, metric.name, {k: str(v) for k, v in labels.items()}, value, time.time())
+        for sink in self.sinks:
+            try:
+                sink.record(sample)
+            except Exception as e:
+                logger.warning(f"Metrics sink {type(sink).__name__} failed: {e}")
+
+    def render_prometheus(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current values of every metric as plain data."""
+        return {name: metric.snapshot() for name, metric in sorted(self._metrics.items())}
+
+    def reset(self) -> None:
+        """Zero every metric, keeping the registered metric families."""
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+
+class NodeMetrics:
+    """The framework's standard metrics, bound to one node of one pipeline."""
+
+    def __init__(self, registry: "MetricsRegistry", pipeline: str, node: str, model: Optional[str] = None):
+        self.registry = registry
+        self.labels = {"pipeline": pipeline, "node": node}
+        self.model = model or ""
+        self._stages = registry.histogram(
+            "framework_node_stage_seconds",
+            "Time spent per node execution stage (queue, render, throttle, model, parse)",
+            ["pipeline", "node", "stage"])
+        self._duration = registry.histogram(
+            "framework_node_duration_seconds",
+            "Total node execution time",
+            ["pipeline", "node"])
+        self._errors = registry.counter(
+            "framework_node_errors_total",
+            "Node executions that raised an error",
+            ["pipeline", "node", "error"])
+        self._cache = registry.counter(
+            "framework_llm_cache_requests_total",
+            "LLM response cache lookups",
+            ["pipeline", "node", "result"])
+        self._retries = registry.counter(
+            "framework_llm_retries_total",
+            "Retried LLM calls",
+            ["pipeline", "node", "model"])
+        self._coalesced = registry.counter(
+            "framework_llm_coalesced_calls_total",
+            "LLM calls that shared an identical call already in flight",
+            ["pipeline", "node", "model"])
+        self._tokens = registry.counter(
+            "framework_llm_tokens_total",
+            "Tokens reported by the model provider",
+            ["pipeline", "node", "model", "kind"])
+
+    def stage(self, stage: str, seconds: float) -> None:
+        """Record the time spent in one stage of the node's execution."""
+        self._stages.observe(seconds, stage=stage, **self.labels)
+
+    def duration(self, seconds: float) -> None:
+        self._duration.observe(seconds, **self.labels)
+
+    def error(self, error: BaseException) -> None:
+        """Count a failed execution, labelled with the underlying error type."""
+        # Nodes wrap failures in NodeError; the original exception is more telling
+        cause = error.__cause__ or error.__context__ or error
+        self._errors.inc(error=type(cause).__name__, **self.labels)
+
+    def cache(self, hit: bool, layer: str = "exact") -> None:
+        """Count a cache lookup; semantic lookups are labelled semantic_hit/semantic_miss."""
+        result = "hit" if hit else "miss"
+        if layer != "exact":
+            result = f"{layer}_{result}"
+        self._cache.inc(result=result, **self.labels)
+
+    def retry(self, attempt: int, error: BaseException) -> None:
+        """on_retry hook for RetryPolicy.call/acall."""
+        self._retries.inc(model=self.model, **self.labels)
+
+    def coalesced(self) -> None:
+        """Count a model call served by an identical in-flight call."""
+        self._coalesced.inc(model=self.model, **self.labels)
+
+    def tokens(self, usage: Optional[Dict[str, Any]]) -> None:
+        """Record token counts from a LangChain usage_metadata dictionary."""
+        if not usage:
+            return
+        for kind, key in (("input", "input_tokens"), ("output", "output_tokens")):
+            if usage.get(key):
+                self._tokens.inc(usage[key], model=self.model, kind=kind, **self.labels)
+        # Input tokens served from (or written to) the provider's prompt cache
+        details = usage.get("input_token_details") or {}
+        for kind in ("cache_read", "cache_creation"):
+            if details.get(kind):
+                self._tokens.inc(details[kind], model=self.model, kind=kind, **self.labels)
+
+
+class PipelineMetrics:
+    """Run-level metrics for one pipeline."""
+
+    def __init__(self, registry: "MetricsRegistry", pipeline: str):
+        self.pipeline = pipeline
+        self._runs = registry.counter(
+            "framework_pipeline_runs_total",
+            "Pipeline executions by entry point and outcome",
+            ["pipeline", "method", "status"])
+        self._duration = registry.histogram(
+            "framework_pipeline_duration_seconds",
+            "End-to-end pipeline execution time",
+            ["pipeline", "method"])
+
+    def run(self, method: str, seconds: float, ok: bool = True) -> None:
+        """Record one finished pipeline execution."""
+        self._runs.inc(pipeline=self.pipeline, method=method, status="ok" if ok else "error")
+        self._duration.observe(seconds, pipeline=self.pipeline, method=method)
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide metrics registry."""
+    return _metrics
+
+
+def start_metrics_server(port: int = 9464, host: str = "127.0.0.1", registry: Optional[MetricsRegistry] = None):
+    """
+    Serve the registry at /metrics in the Prometheus text format.
+
+    Runs a small stdlib HTTP server on a daemon thread.
+
+    Args:
+        port: Port to listen on
+        host: Interface to bind; "0.0.0.0" exposes the metrics to other hosts
+        registry: Registry to expose (defaults to the process-wide one)
+
+    Returns:
+        The running ThreadingHTTPServer; call shutdown() to stop it
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registry = registry or get_metrics()
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    thread = threading.Thread(
+        target=server.serve_forever, name="framework-metrics", daemon=True)
+    thread.start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
@@ -1,14 +1,38 @@
+import time
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, Type, Union
-from pydantic import BaseModel
-from ..utils.template import TemplateRenderer
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Any, Callable, List, Optional, Type, Union
+from ..utils.template import PromptSections, TemplateRenderer
 from ..utils.import_helper import import_from_string
+from ..utils.json_utils import JSONDecodeError, dumps, extract_json
+from ..utils.schema import CompiledSchema, compile_schema
+from .batching import DEFAULT_BATCH_WINDOW, DEFAULT_MAX_BATCH_SIZE, MicroBatcher
+from .cache import ResponseCache
+from .clients import get_client_registry, resolve_provider
 from .errors import NodeError, SchemaError
+from .executors import ToolPool, get_tool_pools
+from .metrics import NodeMetrics
+from .ratelimit import RateLimiter
+from .retry import LatencyTracker, RetryPolicy
+from .singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from .semantic_cache import SemanticCache
+
+# What LLM nodes send to the model: a prompt string or a list of chat messages
+Prompt = Union[str, List[Any]]
 
 
 class Node(ABC):
     """Base class for all nodes in the pipeline."""
 
+    output_schema: Optional[str] = None
+    compiled_schema: Optional[CompiledSchema] = None
+    # Set by the engine when metrics are enabled
+    metrics: Optional[NodeMetrics] = None
+
     def __init__(self, id: str, role: str):
         self.id = id
         self.role = role
@@ -18,29 +42,29 @@ class Node(ABC):
         """Process the input context and return an updated context."""
         pass
 
+    async def aprocess(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of process(). Runs process() in a worker thread by default."""
+        return await asyncio.to_thread(self.process, context)
+
     def validate_output(self, output: Any, schema_path: Optional[str] = None) -> Any:
         """Validate the output against a schema if provided."""
         if not schema_path:
             return output
 
+        # Resolved once per schema path, not on every call
+        schema = compile_schema(schema_path)
         try:
-            schema_class = import_from_string(schema_path)
-            if not issubclass(schema_class, BaseModel):
-                raise SchemaError(
-                    f"Schema {schema_path} is not a Pydantic model")
-
-            # If output is already an instance of the schema class, return it
-            if isinstance(output, schema_class):
-                return output
-
-            # Otherwise, validate and convert
-            return schema_class.parse_obj(output)
-        except ImportError:
-            raise SchemaError(f"Could not import schema: {schema_path}")
+            return schema.validate(output)
         except Exception as e:
             raise SchemaError(
                 f"Error validating output with schema {schema_path}: {e}")
 
+    def _compiled_schema(self) -> Optional[CompiledSchema]:
+        """Return the node's compiled output schema, resolving it on first use."""
+        if self.compiled_schema is None and self.output_schema:
+            self.compiled_schema = compile_schema(self.output_schema)
+        return self.compiled_schema
+
 
 class LLMNode(Node):
     """Node that processes input using a language model."""
@@ -53,98 +77,569 @@ class LLMNode(Node):
         prompt_template: str,
         temperature: float = 0.7,
         output_type: str = "raw",
-        output_schema: Optional[str] = None
+        output_schema: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+        cache_ttl: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        compiled_schema: Optional[CompiledSchema] = None,
+        output_mode: str = "text",
+        semantic_cache: Optional["SemanticCache"] = None,
+        semantic_threshold: Optional[float] = None,
+        single_flight: Optional[SingleFlight] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        client_options: Optional[Dict[str, Any]] = None
     ):
         super().__init__(id, role)
         self.model = model
+        self.provider = resolve_provider(model)
         self.prompt_template = prompt_template
         self.temperature = temperature
         self.output_type = output_type
         self.output_schema = output_schema
+        self.compiled_schema = compiled_schema
+        # "structured" enforces the output format on the provider side
+        self.output_mode = output_mode
+        self._structured = None
         self.template_renderer = TemplateRenderer()
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        # Near-duplicate prompt cache; threshold None uses the cache's default
+        self.semantic_cache = semantic_cache
+        self.semantic_threshold = semantic_threshold
+        # Identical concurrent model calls share one upstream request
+        self.single_flight = single_flight
+        # Client-side request/token budgets and concurrency limit of the model
+        self.rate_limiter = rate_limiter
+        # Extra client kwargs, e.g. this pipeline's fake model options
+        self.client_options = dict(client_options or {})
+        self.retry_policy = retry_policy
+        self.latency = LatencyTracker()
+        self.batcher: Optional[MicroBatcher] = None
 
-    def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Process the input using the language model."""
-        try:
-            # Render the prompt template with the current context
-            prompt = self.template_renderer.render(
-                self.prompt_template, context)
+    def process(
+        self,
+        context: Dict[str, Any],
+        stream_writer: Optional[Callable[[Dict[str, Any]], None]] = None,
+        partial_json: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Process the input using the language model.
 
-            # Import the appropriate LLM class based on the model name
-            if "gpt" in self.model.lower() or "openai" in self.model.lower():
-                try:
-                    from langchain_openai import ChatOpenAI
-                except ImportError:
-                    raise ImportError(
-                        "langchain_openai is not installed. Please install it with: "
-                        "pip install langchain-openai"
-                    )
-                llm = ChatOpenAI(model=self.model,
-                                 temperature=self.temperature)
-            elif "claude" in self.model.lower() or "anthropic" in self.model.lower():
-                try:
-                    from langchain_anthropic import ChatAnthropic
-                except ImportError:
-                    raise ImportError(
-                        "langchain_anthropic is not installed. Please install it with: "
-                        "pip install langchain-anthropic"
-                    )
-                llm = ChatAnthropic(
-                    model=self.model, temperature=self.temperature)
+        Args:
+            context: Variables available to the prompt template
+            stream_writer: If given, model tokens are streamed to it as events
+            partial_json: Also emit partially parsed json/pydantic outputs
+
+        Returns:
+            Dictionary mapping the node ID to its output
+        """
+        with self._node_errors():
+            prompt, started = self._render(context)
+
+            # Serve repeated (or, semantically, near-duplicate) prompts from the caches
+            content, cache_key = self._cache_lookup(prompt)
+            semantic_key = None
+            if content is None:
+                content, semantic_key = self._semantic_lookup(prompt, context)
+            if content is not None:
+                return self._cached_result(content, stream_writer, started)
+
+            # Invoke the LLM, streaming tokens if a writer is given
+            llm = self._client()
+            if self.output_mode == "structured":
+                result, _ = self._invoke_shared(llm, prompt)
+                content, output = self._structured_output(result, stream_writer, started)
             else:
-                # Fallback to a mock LLM for testing or when specific models aren't available
-                from langchain.llms.fake import FakeListLLM
-                llm = FakeListLLM(
-                    responses=["This is a mock response from the LLM."])
-                print(
-                    f"WARNING: Using mock LLM for model '{self.model}'. Install appropriate packages for real LLM usage.")
+                if stream_writer is not None:
+                    content, usage = self._stream(llm, prompt, stream_writer, partial_json)
+                else:
+                    content, usage = self._message_content(*self._invoke_shared(llm, prompt))
+                output = self._text_output(content, usage, started)
 
-            # Invoke the LLM
-            response = llm.invoke(prompt)
+            # Only cache responses that parsed successfully
+            if cache_key:
+                self.cache.set(cache_key, content, self.cache_ttl)
+            if semantic_key:
+                self.semantic_cache.set(*semantic_key, content)
 
-            # Process the output based on the specified output type
-            if self.output_type == "raw":
-                output = response.content
-            elif self.output_type == "json":
-                import json
-                try:
-                    output = json.loads(response.content)
-                except json.JSONDecodeError:
-                    raise NodeError(
-                        f"LLM response is not valid JSON: {response.content}")
-            elif self.output_type == "pydantic":
-                if not self.output_schema:
-                    raise NodeError(
-                        "Output type is 'pydantic' but no schema specified")
+            return {self.id: output}
 
-                import json
-                try:
-                    # First try to parse as JSON
-                    json_output = json.loads(response.content)
-                    output = self.validate_output(
-                        json_output, self.output_schema)
-                except json.JSONDecodeError:
-                    # If not JSON, try to extract structured data from text
-                    try:
-                        from langchain.output_parsers import PydanticOutputParser
-                    except ImportError:
-                        raise ImportError(
-                            "langchain is not installed. Please install it with: "
-                            "pip install langchain"
-                        )
-                    parser = PydanticOutputParser(
-                        pydantic_object=import_from_string(self.output_schema))
-                    output = parser.parse(response.content)
+    async def aprocess(
+        self,
+        context: Dict[str, Any],
+        stream_writer: Optional[Callable[[Dict[str, Any]], None]] = None,
+        partial_json: bool = False
+    ) -> Dict[str, Any]:
+        """Process the input using the language model without blocking the event loop."""
+        with self._node_errors():
+            prompt, started = self._render(context)
+
+            # Serve repeated (or, semantically, near-duplicate) prompts from the caches
+            content, cache_key = await self._acache_lookup(prompt)
+            semantic_key = None
+            if content is None and self.semantic_cache is not None:
+                # Embedding and searching are CPU-bound: keep them off the event loop
+                content, semantic_key = await asyncio.to_thread(
+                    self._semantic_lookup, prompt, context)
+            if content is not None:
+                return self._cached_result(content, stream_writer, started)
+
+            # Invoke the LLM asynchronously, streaming tokens if a writer is given
+            llm = self._client()
+            if self.output_mode == "structured":
+                result, _ = await self._ainvoke_shared(llm, prompt)
+                content, output = self._structured_output(result, stream_writer, started)
             else:
-                raise NodeError(f"Unsupported output type: {self.output_type}")
+                if stream_writer is not None:
+                    content, usage = await self._astream(
+                        llm, prompt, stream_writer, partial_json)
+                else:
+                    content, usage = self._message_content(*await self._ainvoke_shared(llm, prompt))
+                output = self._text_output(content, usage, started)
+
+            # Only cache responses that parsed successfully
+            if cache_key:
+                await self.cache.aset(cache_key, content, self.cache_ttl)
+            if semantic_key:
+                self.semantic_cache.set(*semantic_key, content)
 
             return {self.id: output}
 
+    @contextmanager
+    def _node_errors(self):
+        """Report failures of a call as NodeError."""
+        try:
+            yield
         except ImportError as e:
             raise NodeError(f"Missing dependency in LLM node {self.id}: {e}")
         except Exception as e:
             raise NodeError(f"Error in LLM node {self.id}: {e}")
 
+    def _render(self, context: Dict[str, Any]):
+        """Render the prompt template with the current context; returns (prompt, time rendered)."""
+        started = time.perf_counter()
+        prompt = self._build_prompt(context)
+        return prompt, self._stage("render", started)
+
+    def _client(self):
+        """Return a warm, pooled client for this node's model."""
+        return get_client_registry().get(self.model, self.temperature, **self.client_options)
+
+    def _cached_result(self, content: str, stream_writer, started: float) -> Dict[str, Any]:
+        """Emit and parse a response served from a cache."""
+        if stream_writer is not None:
+            _TokenEmitter(self.id, stream_writer).emit(content)
+        output = self._parse_output(content)
+        self._stage("parse", started)
+        return {self.id: output}
+
+    @staticmethod
+    def _message_content(message: Any, shared: bool):
+        """Return (content, token usage) of a model response."""
+        # Tokens of a shared call are counted by the caller that made it
+        return message.content, None if shared else getattr(message, "usage_metadata", None)
+
+    def _structured_output(self, result: Any, stream_writer, started: float):
+        """Return (content, output) for a structured-output result, emitting it if streaming."""
+        started = self._stage("model", started)
+        content, output = self._read_structured(result)
+        if stream_writer is not None:
+            _TokenEmitter(self.id, stream_writer).emit(content)
+        self._stage("parse", started)
+        return content, output
+
+    def _text_output(self, content: str, usage: Optional[Dict[str, Any]], started: float) -> Any:
+        """Record a text response's timing and token usage, and parse it."""
+        started = self._stage("model", started)
+        if self.metrics is not None:
+            self.metrics.tokens(usage)
+        output = self._parse_output(content)
+        self._stage("parse", started)
+        return output
+
+    def _build_prompt(self, context: Dict[str, Any]) -> Prompt:
+        """
+        Render the prompt for a call.
+
+        Templates with a system section (see DYNAMIC_MARKER) become a system
+        message followed by a user message, so the stable instructions form
+        a prefix the provider can cache. Anthropic needs an explicit cache
+        breakpoint on that prefix; OpenAI caches long prefixes on its own.
+        """
+        rendered = self.template_renderer.render_sections(self.prompt_template, context)
+        if not isinstance(rendered, PromptSections):
+            return rendered
+
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        system: Any = rendered.system
+        if self.provider == "anthropic":
+            system = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+        return [SystemMessage(content=system), HumanMessage(content=rendered.dynamic)]
+
+    @staticmethod
+    def _prompt_text(prompt: Prompt) -> str:
+        """Flatten a prompt (string or messages) into the text it sends."""
+        if isinstance(prompt, str):
+            return prompt
+        parts = []
+        for message in prompt:
+            content = message.content
+            if not isinstance(content, str):
+                content = "".join(
+                    block.get("text", "") if isinstance(block, dict) else str(block)
+                    for block in content)
+            parts.append(f"{message.type}: {content}")
+        return "\n\n".join(parts)
+
+    def enable_batching(
+        self,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        window: float = DEFAULT_BATCH_WINDOW
+    ) -> None:
+        """Group concurrent model calls of this node into llm.batch/abatch calls."""
+        def batch(prompts):
+            return self._runnable(self._client()).batch(prompts, return_exceptions=True)
+
+        async def abatch(prompts):
+            return await self._runnable(self._client()).abatch(prompts, return_exceptions=True)
+
+        self.batcher = MicroBatcher(
+            batch, abatch, max_batch_size=max_batch_size, window=window)
+
+    def _invoke(self, llm, prompt: Prompt):
+        """Invoke the model, applying the node's batching and retry policy if any."""
+        if self.batcher is not None:
+            def call(): return self.batcher.submit(prompt)
+        else:
+            def call(): return self._runnable(llm).invoke(prompt)
+        call = self._rate_limited(call, prompt, _message_tokens)
+
+        if self.retry_policy is None or not self.retry_policy.enabled:
+            return call()
+        return self.retry_policy.call(call, self.latency, self._on_retry)
+
+    async def _ainvoke(self, llm, prompt: Prompt):
+        """Async variant of _invoke()."""
+        if self.batcher is not None:
+            def acall(): return self.batcher.asubmit(prompt)
+        else:
+            def acall(): return self._runnable(llm).ainvoke(prompt)
+        acall = self._arate_limited(acall, prompt, _message_tokens)
+
+        if self.retry_policy is None or not self.retry_policy.enabled:
+            return await acall()
+        return await self.retry_policy.acall(acall, self.latency, self._on_retry)
+
+    def _invoke_shared(self, llm, prompt: Prompt):
+        """
+        Invoke the model, joining an identical call already in flight if there is one.
+
+        Streamed calls are never shared, since every writer needs its own tokens.
+
+        Returns:
+            (model result, whether it was shared with another caller's call)
+        """
+        if self.single_flight is None:
+            return self._invoke(llm, prompt), False
+        result, shared = self.single_flight.do(
+            self._flight_key(prompt), lambda: self._invoke(llm, prompt))
+        if shared and self.metrics is not None:
+            self.metrics.coalesced()
+        return result, shared
+
+    async def _ainvoke_shared(self, llm, prompt: Prompt):
+        """Async variant of _invoke_shared()."""
+        if self.single_flight is None:
+            return await self._ainvoke(llm, prompt), False
+        result, shared = await self.single_flight.ado(
+            self._flight_key(prompt), lambda: self._ainvoke(llm, prompt))
+        if shared and self.metrics is not None:
+            self.metrics.coalesced()
+        return result, shared
+
+    def _flight_key(self, prompt: Prompt) -> str:
+        """Identify a model call: same model, client options, parameters, prompt and output handling."""
+        key = ResponseCache.make_key(
+            self.model, self.temperature, self._prompt_text(prompt),
+            self.output_type, self.output_schema, self.output_mode)
+        if self.client_options:
+            # Clients built with other options (e.g. fake model settings) answer differently
+            key = f"{key}:{dumps(sorted(self.client_options.items()))}"
+        return key
+
+    def _runnable(self, llm):
+        """Return the runnable to call: the model itself, or its structured-output wrapper."""
+        if self.output_mode != "structured":
+            return llm
+
+        # Rebuilt only if the registry hands out a different client
+        structured = self._structured
+        if structured is None or structured[0] is not llm:
+            if self.output_type == "pydantic":
+                runnable = llm.with_structured_output(
+                    self._compiled_schema().schema_class)
+            else:
+                runnable = llm.with_structured_output(None, method="json_mode")
+            structured = self._structured = (llm, runnable)
+        return structured[1]
+
+    def _read_structured(self, result: Any):
+        """Return (content, output) for a structured-output result."""
+        if self.output_type == "pydantic":
+            output = self._compiled_schema().validate(result)
+            data = output.model_dump() if hasattr(output, "model_dump") else output.dict()
+        else:
+            output = data = result
+        # The serialized form is what gets cached and streamed
+        return dumps(data), output
+
+    def _stream(self, llm, prompt: Prompt, stream_writer, partial_json: bool = False):
+        """
+        Stream the model response to the writer and return (full text, token usage).
+
+        Streams stay on the caller's thread (the stream writer lives in its
+        run context), are never timed out or hedged, and are only retried
+        before their first token has been emitted.
+        """
+        emitter = _TokenEmitter(
+            self.id, stream_writer, partial_json and self.output_type in ("json", "pydantic"))
+
+        def call():
+            emitter.usage = None
+            for chunk in llm.stream(prompt):
+                emitter.emit(chunk.content)
+                emitter.add_usage(chunk)
+            return emitter.text, emitter.usage
+        call = self._rate_limited(call, prompt, _streamed_tokens)
+
+        if self.retry_policy is None or not self.retry_policy.max_retries:
+            return call()
+        return self.retry_policy.call_stream(call, lambda: emitter.started, self._on_retry)
+
+    async def _astream(self, llm, prompt: Prompt, stream_writer, partial_json: bool = False):
+        """Async variant of _stream()."""
+        emitter = _TokenEmitter(
+            self.id, stream_writer, partial_json and self.output_type in ("json", "pydantic"))
+
+        async def acall():
+            emitter.usage = None
+            async for chunk in llm.astream(prompt):
+                emitter.emit(chunk.content)
+                emitter.add_usage(chunk)
+            return emitter.text, emitter.usage
+        acall = self._arate_limited(acall, prompt, _streamed_tokens)
+
+        if self.retry_policy is None or not self.retry_policy.max_retries:
+            return await acall()
+        return await self.retry_policy.acall_stream(acall, lambda: emitter.started, self._on_retry)
+
+    def _stage(self, stage: str, started: float) -> float:
+        """Record the time since started for a stage and return the current time."""
+        now = time.perf_counter()
+        if self.metrics is not None:
+            self.metrics.stage(stage, now - started)
+        return now
+
+    def _cache_lookup(self, prompt: Prompt):
+        """Return (cached content or None, cache key or None) for a prompt."""
+        cache_key = self._cache_key(prompt)
+        if not cache_key:
+            return None, None
+        content = self.cache.get(cache_key)
+        if self.metrics is not None:
+            self.metrics.cache(content is not None)
+        return content, cache_key
+
+    async def _acache_lookup(self, prompt: Prompt):
+        """Async variant of _cache_lookup() that keeps disk reads off the event loop."""
+        cache_key = self._cache_key(prompt)
+        if not cache_key:
+            return None, None
+        content = await self.cache.aget(cache_key)
+        if self.metrics is not None:
+            self.metrics.cache(content is not None)
+        return content, cache_key
+
+    def _semantic_lookup(self, prompt: Prompt, context: Dict[str, Any]):
+        """Return (cached content or None, (embedding, namespace) or None) for a prompt."""
+        if self.semantic_cache is None:
+            return None, None
+
+        # Only the values the template reads are embedded: the template's own
+        # wording is identical across calls and would swamp the similarity.
+        # The template and its static system section are part of the namespace.
+        system = "" if isinstance(prompt, str) else self._prompt_text(prompt[:-1])
+        namespace = self.semantic_cache.namespace(
+            self.model, self.temperature, self.output_type, self.output_schema,
+            self.output_mode, self.prompt_template, system)
+        variables = self.template_renderer.variables(self.prompt_template)
+        if variables is None:
+            text = self._prompt_text(prompt if isinstance(prompt, str) else prompt[-1:])
+        else:
+            text = "\n".join(
+                f"{name}: {self._variable_text(context.get(name))}" for name in sorted(variables))
+        vector = self.semantic_cache.embed(text)
+
+        content = self.semantic_cache.get(vector, namespace, self.semantic_threshold)
+        if self.metrics is not None:
+            self.metrics.cache(content is not None, layer="semantic")
+        return content, (vector, namespace)
+
+    @staticmethod
+    def _variable_text(value: Any) -> str:
+        return value if isinstance(value, str) else dumps(value)
+
+    def _rate_limited(self, call: Callable[[], Any], prompt: Prompt, usage_of: Callable[[Any], Optional[int]]):
+        """Wrap a model call so it waits for the node's rate limiter, if any."""
+        if self.rate_limiter is None:
+            return call
+        limiter, tokens = self.rate_limiter, self._estimate_tokens(prompt)
+        return lambda: limiter.call(call, tokens, usage_of, self._on_throttle)
+
+    def _arate_limited(self, acall: Callable[[], Any], prompt: Prompt, usage_of: Callable[[Any], Optional[int]]):
+        """Async variant of _rate_limited()."""
+        if self.rate_limiter is None:
+            return acall
+        limiter, tokens = self.rate_limiter, self._estimate_tokens(prompt)
+        return lambda: limiter.acall(acall, tokens, usage_of, self._on_throttle)
+
+    def _estimate_tokens(self, prompt: Prompt) -> int:
+        """Tokens to reserve for a call: about 4 characters per prompt token plus the response."""
+        return len(self._prompt_text(prompt)) // 4 + self.rate_limiter.output_tokens
+
+    def _on_throttle(self, seconds: float) -> None:
+        """Record time spent waiting for the rate limiter."""
+        if self.metrics is not None:
+            self.metrics.stage("throttle", seconds)
+
+    def _on_retry(self, attempt: int, error: BaseException) -> None:
+        """Count retried model calls."""
+        if self.metrics is not None:
+            self.metrics.retry(attempt, error)
+
+    def _cache_key(self, prompt: Prompt) -> Optional[str]:
+        """Return the response cache key for a prompt, or None if caching is off."""
+        if self.cache is None:
+            return None
+        return ResponseCache.make_key(
+            self.model, self.temperature, self._prompt_text(prompt),
+            self.output_type, self.output_schema, self.output_mode)
+
+    def _parse_output(self, content: str) -> Any:
+        """Convert the raw model response into the configured output type."""
+        # Process the output based on the specified output type
+        if self.output_type == "raw":
+            output = content
+        elif self.output_type == "json":
+            try:
+                # Tolerates fenced code blocks and surrounding prose
+                output = extract_json(content)
+            except JSONDecodeError:
+                raise NodeError(
+                    f"LLM response is not valid JSON: {content}")
+        elif self.output_type == "pydantic":
+            if not self.output_schema:
+                raise NodeError(
+                    "Output type is 'pydantic' but no schema specified")
+
+            schema = self._compiled_schema()
+            try:
+                # Parse and validate the JSON in a single pass
+                output = schema.validate_json(content)
+            except Exception as e:
+                if not schema.is_json_error(e):
+                    raise SchemaError(
+                        f"Error validating output with schema {self.output_schema}: {e}")
+                # If not bare JSON, extract it from fences or surrounding prose
+                try:
+                    json_output = extract_json(content)
+                except JSONDecodeError:
+                    raise NodeError(
+                        f"LLM response is not valid JSON: {content}")
+                output = self.validate_output(json_output, self.output_schema)
+        else:
+            raise NodeError(f"Unsupported output type: {self.output_type}")
+
+        return output
+
+
+def _message_tokens(message: Any) -> Optional[int]:
+    """Total tokens a model response reports (None for structured results)."""
+    usage = getattr(message, "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+
+def _streamed_tokens(result: Any) -> Optional[int]:
+    """Total tokens of a streamed (text, usage) result."""
+    usage = result[1]
+    return usage.get("total_tokens") if usage else None
+
+
+class _TokenEmitter:
+    """Turns streamed model chunks into token (and partial JSON) events."""
+
+    # Characters after which a partial JSON parse may yield something new
+    _JSON_BOUNDARIES = set('",:}]')
+
+    def __init__(self, node_id: str, stream_writer, partial_json: bool = False):
+        self.node_id = node_id
+        self.stream_writer = stream_writer
+        self.partial_json = partial_json
+        self._pieces = []
+        self._last_partial = None
+        self.usage: Optional[Dict[str, Any]] = None
+
+    @property
+    def text(self) -> str:
+        """The full text streamed so far."""
+        return "".join(self._pieces)
+
+    @property
+    def started(self) -> bool:
+        """Whether any token has been emitted."""
+        return bool(self._pieces)
+
+    def add_usage(self, chunk: Any) -> None:
+        """Accumulate the token usage some providers attach to streamed chunks."""
+        usage = getattr(chunk, "usage_metadata", None)
+        if not usage:
+            return
+        if self.usage is None:
+            self.usage = dict(usage)
+        else:
+            from langchain_core.messages.ai import add_usage
+
+            # Also sums the nested cached-token details
+            self.usage = dict(add_usage(self.usage, usage))
+
+    def emit(self, content: Any) -> None:
+        """Emit the text of one chunk to the writer."""
+        # Some providers stream lists of content blocks instead of plain strings
+        if not isinstance(content, str):
+            content = "".join(
+                block.get("text", "") if isinstance(block, dict) else str(block)
+                for block in content or [])
+        if not content:
+            return
+
+        self._pieces.append(content)
+        self.stream_writer(
+            {"type": "token", "node": self.node_id, "token": content})
+
+        # Re-parse only when the chunk could have completed a JSON value
+        if self.partial_json and not self._JSON_BOUNDARIES.isdisjoint(content):
+            from langchain_core.utils.json import parse_partial_json
+
+            try:
+                partial = parse_partial_json(self.text)
+            except Exception:
+                return
+            if partial is not None and partial != self._last_partial:
+                self._last_partial = partial
+                self.stream_writer(
+                    {"type": "partial", "node": self.node_id, "value": partial})
+
 
 class ToolNode(Node):
     """Node that executes a tool function."""
@@ -155,28 +650,87 @@ class ToolNode(Node):
         role: str,
         tool_path: str,
         output_type: str = "raw",
-        output_schema: Optional[str] = None
+        output_schema: Optional[str] = None,
+        compiled_schema: Optional[CompiledSchema] = None,
+        executor: str = "inline",
+        pool: Optional[ToolPool] = None
     ):
         super().__init__(id, role)
         self.tool_path = tool_path
         self.output_type = output_type
         self.output_schema = output_schema
+        self.compiled_schema = compiled_schema
+        self.executor = executor
+        # Shared thread/process pool for the "thread" and "process" executors
+        if executor != "inline" and pool is None:
+            pool = get_tool_pools().get(executor)
+        self.pool = pool if executor != "inline" else None
 
         # Import the tool function
         try:
             self.tool_function = import_from_string(tool_path)
         except ImportError:
             raise NodeError(f"Could not import tool: {tool_path}")
+        self.is_async = asyncio.iscoroutinefunction(self.tool_function)
 
     def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the tool function with the current context."""
         try:
-            # Execute the tool function
-            result = self.tool_function(context)
+            # Execute the tool function, inline or on the node's shared pool
+            if self.pool is not None:
+                result = self.pool.run(self.tool_path, self.tool_function, context)
+            else:
+                result = self.tool_function(context)
+                if self.is_async:
+                    result = self._run_coroutine(result)
+
+            # Process the output based on the specified output type
+            if self.output_type == "pydantic" and self.output_schema:
+                result = self._validate_result(result)
+
+            return {self.id: result}
+
+        except Exception as e:
+            raise NodeError(f"Error in tool node {self.id}: {e}")
+
+    @staticmethod
+    def _run_coroutine(coroutine) -> Any:
+        """Run an async tool to completion from the sync path."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        # asyncio.run can't nest inside the caller's running loop
+        with ThreadPoolExecutor(max_workers=1) as worker:
+            return worker.submit(asyncio.run, coroutine).result()
+
+    def _validate_result(self, result: Any) -> Any:
+        """Validate the tool result against the precompiled output schema."""
+        try:
+            return self._compiled_schema().validate(result)
+        except SchemaError:
+            raise
+        except Exception as e:
+            raise SchemaError(
+                f"Error validating output with schema {self.output_schema}: {e}")
+
+    async def aprocess(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute the tool function, offloading sync tools to a worker thread."""
+        try:
+            # Use the node's pool if it has one; otherwise await async tools
+            # directly and run sync tools in the default thread pool
+            if self.pool is not None:
+                result = await self.pool.arun(self.tool_path, self.tool_function, context)
+            elif self.is_async:
+                result = await self.tool_function(context)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    None, self.tool_function, context)
 
             # Process the output based on the specified output type
             if self.output_type == "pydantic" and self.output_schema:
-                result = self.validate_output(result, self.output_schema)
+                result = self._validate_result(result)
 
             return {self.id: result}
 
@@ -0,0 +1,501 @@
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .clients import resolve_provider
+from .errors import ConfigError, NodeError
+
+logger = logging.getLogger(__name__)
+
+# Default seconds a call waits in the queue before it fails
+DEFAULT_MAX_WAIT = 60.0
+
+# Default tokens reserved for a response until the provider reports real usage
+DEFAULT_OUTPUT_TOKENS = 256
+
+# Default concurrency limits of the adaptive controller
+DEFAULT_INITIAL_CONCURRENCY = 4
+DEFAULT_MAX_CONCURRENCY = 64
+
+# Seconds new calls are held back after a rate-limit response without Retry-After
+DEFAULT_RATE_LIMIT_PAUSE = 1.0
+
+# Exceptions (matched by class name anywhere in the MRO) and HTTP statuses meaning "slow down"
+RATE_LIMIT_ERRORS = ("RateLimitError", "OverloadedError")
+RATE_LIMIT_STATUSES = (429, 529)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Return True if a provider error asks the client to slow down."""
+    names = {klass.__name__ for klass in type(error).__mro__}
+    if any(name in names for name in RATE_LIMIT_ERRORS):
+        return True
+    return getattr(error, "status_code", None) in RATE_LIMIT_STATUSES
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Return the Retry-After delay (seconds) of a provider error's response, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Per-minute budget that refills continuously.
+
+    Not thread-safe on its own; RateLimiter uses it under its lock. The
+    level may go negative when a call turns out to use more than it
+    reserved, which delays later calls until the debt is refilled.
+    """
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        if per_minute <= 0:
+            raise ConfigError(f"Rate limit must be positive, got {per_minute}")
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst or per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (0 if it can be taken now)."""
+        self._refill(now)
+        # A single call larger than the bucket only waits for a full bucket
+        needed = min(amount, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= amount
+
+
+class AIMDController:
+    """Additive-increase/multiplicative-decrease concurrency limit.
+
+    Every successful call raises the limit by ``increase / limit`` (about
+    ``increase`` per limit's worth of calls). A rate-limit response, or a
+    short-term latency average rising above ``latency_tolerance`` times the
+    long-term one, multiplies it by ``decrease``, at most once per
+    ``cooldown`` seconds so one burst of errors doesn't collapse the limit.
+    """
+
+    def __init__(
+        self,
+        initial: float = DEFAULT_INITIAL_CONCURRENCY,
+        min_limit: float = 1,
+        max_limit: float = DEFAULT_MAX_CONCURRENCY,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+        cooldown: float = 1.0,
+        min_samples: int = 10
+    ):
+        if not 0 < decrease < 1:
+            raise ConfigError(f"AIMD decrease factor must be between 0 and 1, got {decrease}")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._fast: Optional[float] = None
+        self._slow: Optional[float] = None
+        self._samples = 0
+        self._last_decrease = float("-inf")
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self._limit))
+
+    def on_success(self, latency: float, now: float) -> None:
+        """Record a successful call and its latency."""
+        self._samples += 1
+        if self._fast is None:
+            self._fast = self._slow = latency
+        else:
+            self._fast += 0.3 * (latency - self._fast)
+            self._slow += 0.02 * (latency - self._slow)
+
+        if (self._samples >= self.min_samples
+                and self._fast > self.latency_tolerance * self._slow):
+            self._decrease(now)
+        else:
+            self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+
+    def on_overload(self, now: float) -> None:
+        """Record a rate-limit or overload response."""
+        self._decrease(now)
+
+    def _decrease(self, now: float) -> None:
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._limit = max(self.min_limit, self._limit * self.decrease)
+        self._last_decrease = now
+        logger.debug(f"Concurrency limit lowered to {self.limit}")
+
+
+class _Waiter:
+    """A call waiting for admission."""
+
+    __slots__ = ("tokens", "wake", "granted")
+
+    def __init__(self, tokens: float, wake: Callable[[], None]):
+        self.tokens = tokens
+        self.wake = wake
+        self.granted = False
+
+
+class RateLimiter:
+    """Client-side limits for the calls to one model or provider.
+
+    Calls are admitted in arrival order (FIFO) once a requests-per-minute
+    bucket, a tokens-per-minute bucket and a concurrency limit (fixed, or
+    adjusted by an AIMD controller) all allow it. Each call reserves its
+    estimated tokens up front; the difference to the usage the provider
+    reports is settled when it finishes. After a rate-limit response, new
+    calls are held back for the response's Retry-After delay. Callers that
+    wait longer than ``max_wait`` seconds fail with NodeError. Sync callers
+    (any thread) and async callers (any event loop) share one queue.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        adaptive: bool = False,
+        initial_concurrency: Optional[int] = None,
+        min_concurrency: int = 1,
+        latency_tolerance: float = 2.0,
+        max_wait: Optional[float] = DEFAULT_MAX_WAIT,
+        output_tokens: int = DEFAULT_OUTPUT_TOKENS,
+        burst: Optional[float] = None
+    ):
+        self.name = name
+        self.requests = TokenBucket(rpm, burst) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_concurrency = max_concurrency
+        self.controller = None
+        if adaptive:
+            max_limit = max_concurrency or DEFAULT_MAX_CONCURRENCY
+            self.controller = AIMDController(
+                initial=initial_concurrency or min(DEFAULT_INITIAL_CONCURRENCY, max_limit),
+                min_limit=min_concurrency,
+                max_limit=max_limit,
+                latency_tolerance=latency_tolerance)
+        self.max_wait = max_wait
+        self.output_tokens = output_tokens
+
+        self._queue: "deque[_Waiter]" = deque()
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.in_flight = 0
+        self.admitted = 0
+        self.timeouts = 0
+        self.rate_limited = 0
+
+    @property
+    def limit(self) -> Optional[int]:
+        """Current concurrency limit (None if unbounded)."""
+        if self.controller is not None:
+            return self.controller.limit
+        return self.max_concurrency
+
+    def _delay(self, waiter: _Waiter, now: float) -> float:
+        """Seconds until the budgets allow a waiter in (ignoring concurrency)."""
+        delay = max(0.0, self._paused_until - now)
+        if self.requests is not None:
+            delay = max(delay, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.wait_time(waiter.tokens, now))
+        return delay
+
+    def _dispatch(self) -> None:
+        """Admit waiters from the head of the queue while the limits allow it."""
+        now = time.monotonic()
+        while self._queue:
+            limit = self.limit
+            if limit is not None and self.in_flight >= limit:
+                return
+            head = self._queue[0]
+            if self._delay(head, now) > 0:
+                # Let the head (re)arm its timer for when the budgets have refilled
+                head.wake()
+                return
+            if self.requests is not None:
+                self.requests.take(1, now)
+            if self.tokens is not None:
+                self.tokens.take(head.tokens, now)
+            self._queue.popleft()
+            self.in_flight += 1
+            self.admitted += 1
+            head.granted = True
+            head.wake()
+
+    def _next_wait(self, waiter: _Waiter, deadline: Optional[float]) -> Optional[float]:
+        """
+        How long a waiting caller should sleep before checking again.
+
+        Only the head of the queue needs a timer (for its budgets to refill);
+        everyone else is woken when admitted. Raises NodeError past the deadline.
+        """
+        now = time.monotonic()
+        if deadline is not None and now >= deadline:
+            self.timeouts += 1
+            self._abandon(waiter)
+            raise NodeError(
+                f"Timed out after {self.max_wait}s waiting for the rate limit of {self.name}")
+        timeout = self._delay(waiter, now) if self._queue[0] is waiter else None
+        if deadline is not None:
+            timeout = deadline - now if timeout is None else min(timeout, deadline - now)
+        return timeout
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Give up a waiter's place (or its admission, if it was admitted meanwhile)."""
+        if waiter.granted:
+            self.in_flight -= 1
+        elif waiter in self._queue:
+            self._queue.remove(waiter)
+        self._dispatch()
+
+    def _deadline(self) -> Optional[float]:
+        return time.monotonic() + self.max_wait if self.max_wait is not None else None
+
+    def acquire(self, tokens: float = 0) -> float:
+        """
+        Block until a call is admitted.
+
+        Args:
+            tokens: Estimated tokens of the call
+
+        Returns:
+            Seconds spent waiting
+        """
+        started = time.monotonic()
+        deadline = self._deadline()
+        event = threading.Event()
+        waiter = _Waiter(tokens, event.set)
+        try:
+            with self._lock:
+                self._queue.append(waiter)
+            while True:
+                with self._lock:
+                    self._dispatch()
+                    if waiter.granted:
+                        return time.monotonic() - started
+                    timeout = self._next_wait(waiter, deadline)
+                    event.clear()
+                event.wait(timeout)
+        except BaseException:
+            with self._lock:
+                if waiter.granted or waiter in self._queue:
+                    self._abandon(waiter)
+            raise
+
+    async def aacquire(self, tokens: float = 0) -> float:
+        """Async variant of acquire()."""
+        started = time.monotonic()
+        deadline = self._deadline()
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+
+        def wake():
+            # Admissions can happen on any thread
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass
+
+        waiter = _Waiter(tokens, wake)
+        try:
+            with self._lock:
+                self._queue.append(waiter)
+            while True:
+                with self._lock:
+                    self._dispatch()
+                    if waiter.granted:
+                        return time.monotonic() - started
+                    timeout = self._next_wait(waiter, deadline)
+                    event.clear()
+                try:
+                    await asyncio.wait_for(event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._lock:
+                if waiter.granted or waiter in self._queue:
+                    self._abandon(waiter)
+            raise
+
+    def release(
+        self,
+        reserved: float,
+        latency: float,
+        error: Optional[BaseException] = None,
+        used: Optional[float] = None
+    ) -> None:
+        """
+        Finish an admitted call.
+
+        Args:
+            reserved: Tokens reserved when the call was admitted
+            latency: Seconds the call took
+            error: The exception the call raised, if any
+            used: Tokens the provider reported for the call, if known
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.in_flight -= 1
+            if self.tokens is not None and used is not None:
+                self.tokens.take(used - reserved, now)
+            if error is not None and is_rate_limit_error(error):
+                self.rate_limited += 1
+                pause = _retry_after(error) or DEFAULT_RATE_LIMIT_PAUSE
+                self._paused_until = max(self._paused_until, now + pause)
+                if self.controller is not None:
+                    self.controller.on_overload(now)
+                logger.warning(f"Rate limited by {self.name}; holding new calls for {pause:.1f}s")
+            elif error is None and self.controller is not None:
+                self.controller.on_success(latency, now)
+            self._dispatch()
+
+    def call(
+        self,
+        func: Callable[[], Any],
+        tokens: float = 0,
+        usage_of: Optional[Callable[[Any], Optional[float]]] = None,
+        on_wait: Optional[Callable[[float], None]] = None
+    ) -> Any:
+        """
+        Call func once admitted, then release its slot.
+
+        Args:
+            func: The call to make
+            tokens: Estimated tokens of the call
+            usage_of: Returns the tokens a result actually used (or None)
+            on_wait: Receives the seconds spent waiting for admission
+        """
+        waited = self.acquire(tokens)
+        if on_wait:
+            on_wait(waited)
+        started = time.monotonic()
+        try:
+            result = func()
+        except BaseException as e:
+            self.release(tokens, time.monotonic() - started, error=e)
+            raise
+        self.release(tokens, time.monotonic() - started,
+                     used=usage_of(result) if usage_of else None)
+        return result
+
+    async def acall(
+        self,
+        afunc: Callable[[], Awaitable[Any]],
+        tokens: float = 0,
+        usage_of: Optional[Callable[[Any], Optional[float]]] = None,
+        on_wait: Optional[Callable[[float], None]] = None
+    ) -> Any:
+        """Async variant of call() for coroutine functions."""
+        waited = await self.aacquire(tokens)
+        if on_wait:
+            on_wait(waited)
+        started = time.monotonic()
+        try:
+            result = await afunc()
+        except BaseException as e:
+            self.release(tokens, time.monotonic() - started, error=e)
+            raise
+        self.release(tokens, time.monotonic() - started,
+                     used=usage_of(result) if usage_of else None)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current limit, queue length and call counters."""
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "queued": len(self._queue),
+                "admitted": self.admitted,
+                "timeouts": self.timeouts,
+                "rate_limited": self.rate_limited,
+            }
+
+
+class RateLimiterRegistry:
+    """Process-wide rate limiters, shared by every node calling the same model or provider."""
+
+    def __init__(self):
+        self.options: Dict[str, Dict[str, Any]] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, options: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Set limits by model name, provider name or "default", e.g.
+        ``{"gpt-4o": {"rpm": 500, "tpm": 30000}, "anthropic": {"adaptive": True}}``.
+
+        Limiters are shared by every pipeline in the process, so limits that
+        differ from those already set for a key raise ConfigError rather than
+        silently replacing them.
+        """
+        with self._lock:
+            updates = {}
+            for key, limits in options.items():
+                if not isinstance(limits, dict):
+                    raise ConfigError(f"Rate limits for {key} must be a mapping")
+                current = self.options.get(key)
+                if current is not None and current != limits:
+                    raise ConfigError(
+                        f"Conflicting rate limits for {key}: {limits} (already {current})")
+                updates[key] = dict(limits)
+            self.options.update(updates)
+
+    def _key(self, model: str) -> Optional[str]:
+        """The most specific configured key for a model: its name, its provider, or "default"."""
+        for key in (model, resolve_provider(model), "default"):
+            if key in self.options:
+                return key
+        return None
+
+    def get(self, model: str) -> Optional[RateLimiter]:
+        """Return the limiter that applies to a model, or None if it is not limited."""
+        key = self._key(model)
+        if key is None:
+            return None
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(key)
+                if limiter is None:
+                    try:
+                        limiter = RateLimiter(key, **self.options[key])
+                    except TypeError as e:
+                        raise ConfigError(f"Invalid rate limits for {key}: {e}")
+                    self._limiters[key] = limiter
+        return limiter
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {key: limiter.stats() for key, limiter in list(self._limiters.items())}
+
+
+_limiters = RateLimiterRegistry()
+
+
+def get_rate_limiters() -> RateLimiterRegistry:
+    """Return the process-wide rate limiter registry."""
+    return _limiters
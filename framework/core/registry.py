@@ -0,0 +1,122 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+from .config import ConfigLoader, PipelineConfig
+from .engine import PipelineEngine
+
+logger = logging.getLogger(__name__)
+
+ConfigSource = Union[PipelineConfig, Dict[str, Any], str]
+
+# Source fingerprints remembered per registry (request dicts, edited files)
+DEFAULT_MAX_ALIASES = 1024
+
+
+def config_hash(config: PipelineConfig) -> str:
+    """Return a stable content hash of a pipeline configuration."""
+    data = config.model_dump() if hasattr(config, "model_dump") else config.dict()
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PipelineRegistry:
+    """Process-level cache of ready-to-run pipeline engines.
+
+    Engines are keyed by the content hash of their configuration, built and
+    compiled once, and shared by every caller; a compiled graph can serve
+    concurrent runs from many threads or tasks.
+    """
+
+    def __init__(self, max_aliases: int = DEFAULT_MAX_ALIASES):
+        self._engines: Dict[str, PipelineEngine] = {}
+        # Cheap source fingerprints (raw dict hash, file path + mtime) -> config hash,
+        # least recently used first and bounded so varied sources can't grow it forever
+        self._aliases: "OrderedDict[Any, str]" = OrderedDict()
+        self.max_aliases = max_aliases
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _fingerprint(source: ConfigSource) -> Optional[Any]:
+        """Return a cheap key for a raw config source, skipping validation on repeat calls."""
+        if isinstance(source, dict):
+            payload = json.dumps(source, sort_keys=True, default=str)
+            return ("dict", hashlib.sha256(payload.encode("utf-8")).hexdigest())
+        if isinstance(source, str):
+            path = os.path.abspath(source)
+            try:
+                return ("file", path, os.stat(path).st_mtime_ns)
+            except OSError:
+                return None
+        return None
+
+    @staticmethod
+    def _resolve_config(source: ConfigSource) -> PipelineConfig:
+        """Turn a config object, dictionary or file path into a PipelineConfig."""
+        if isinstance(source, PipelineConfig):
+            return source
+        if isinstance(source, dict):
+            return ConfigLoader.load_config_dict(source)
+        return ConfigLoader.load_config(source)
+
+    def get_engine(self, source: ConfigSource) -> PipelineEngine:
+        """
+        Return a compiled engine for a configuration, building it on first use.
+
+        Args:
+            source: A PipelineConfig, a configuration dictionary, or a path to
+                a YAML/JSON configuration file
+
+        Returns:
+            A shared PipelineEngine with its graph already compiled
+        """
+        fingerprint = self._fingerprint(source)
+        if fingerprint:
+            with self._lock:
+                key = self._aliases.get(fingerprint)
+                engine = self._engines.get(key) if key else None
+                if engine is not None:
+                    self._aliases.move_to_end(fingerprint)
+                    return engine
+
+        config = self._resolve_config(source)
+        key = config_hash(config)
+
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                engine = PipelineEngine(config)
+                engine.build_graph()
+                self._engines[key] = engine
+                logger.info(
+                    f"Compiled pipeline '{config.name}' ({key[:12]})")
+            if fingerprint:
+                self._aliases[fingerprint] = key
+                self._aliases.move_to_end(fingerprint)
+                while len(self._aliases) > self.max_aliases:
+                    self._aliases.popitem(last=False)
+            return engine
+
+    def warm_up(self, *sources: ConfigSource) -> List[PipelineEngine]:
+        """Build and compile engines ahead of time so first requests skip setup."""
+        return [self.get_engine(source) for source in sources]
+
+    def clear(self) -> None:
+        """Drop every cached engine."""
+        with self._lock:
+            self._engines.clear()
+            self._aliases.clear()
+
+    def __len__(self) -> int:
+        return len(self._engines)
+
+
+_registry = PipelineRegistry()
+
+
+def get_pipeline_registry() -> PipelineRegistry:
+    """Return the process-wide pipeline registry."""
+    return _registry
@@ -0,0 +1,380 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from ..utils.import_helper import import_from_string
+from .errors import ConfigError
+
+logger = logging.getLogger(__name__)
+
+# Exceptions (matched by class name anywhere in the MRO) that are retried by default
+DEFAULT_RETRYABLE_ERRORS = [
+    "TimeoutError",
+    "ConnectionError",
+    "APITimeoutError",
+    "APIConnectionError",
+    "RateLimitError",
+    "InternalServerError",
+    "ServiceUnavailableError",
+    "OverloadedError",
+]
+
+
+class LatencyTracker:
+    """Keeps a window of recent call latencies to estimate percentiles."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Record the latency of a successful call."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the q-th quantile of recent latencies, or None without samples."""
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class RetryPolicy:
+    """Retry policy with exponential backoff, per-attempt timeouts and hedging.
+
+    A call is attempted up to ``max_retries + 1`` times. Retryable failures
+    wait ``backoff_base * 2 ** attempt`` seconds (capped at ``backoff_max``,
+    randomized by ``jitter``) before the next attempt. With hedging enabled,
+    a duplicate call is fired once an attempt runs past ``hedge_after``
+    seconds (or the tracked ``hedge_quantile`` latency) and whichever
+    finishes first wins.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 0,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        jitter: float = 0.5,
+        timeout: Optional[float] = None,
+        retry_on: Optional[List[str]] = None,
+        hedge: bool = False,
+        hedge_after: Optional[float] = None,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.timeout = timeout
+        self.retry_on = list(retry_on) if retry_on is not None else list(
+            DEFAULT_RETRYABLE_ERRORS)
+        self.hedge = hedge or hedge_after is not None
+        self.hedge_after = hedge_after
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self._retry_classes = self._resolve_error_classes(self.retry_on)
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Optional[Dict[str, Any]] = None,
+        overrides: Optional[Dict[str, Any]] = None
+    ) -> "RetryPolicy":
+        """
+        Build a policy from pipeline settings and optional per-node overrides.
+
+        Args:
+            settings: Pipeline settings (``max_retries`` and a ``retry`` block)
+            overrides: Per-node ``retry`` block, taking precedence over settings
+
+        Returns:
+            The resulting retry policy
+        """
+        settings = settings or {}
+        options = dict(settings.get("retry") or {})
+        if "max_retries" in settings:
+            options.setdefault("max_retries", settings["max_retries"])
+        options.update(overrides or {})
+        try:
+            return cls(**options)
+        except TypeError as e:
+            raise ConfigError(f"Invalid retry settings: {e}")
+
+    @staticmethod
+    def _resolve_error_classes(names: List[str]) -> tuple:
+        """Import the retryable errors given as dotted paths."""
+        classes = []
+        for name in names:
+            if "." in name:
+                try:
+                    classes.append(import_from_string(name))
+                except ImportError:
+                    logger.warning(f"Could not import retryable error: {name}")
+        return tuple(classes)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the policy does anything beyond a single plain call."""
+        return bool(self.max_retries or self.timeout or self.hedge)
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Return True if the error should trigger another attempt."""
+        if self._retry_classes and isinstance(error, self._retry_classes):
+            return True
+        names = {klass.__name__ for klass in type(error).__mro__}
+        return any(name in names for name in self.retry_on)
+
+    def backoff(self, attempt: int) -> float:
+        """Return the delay before the given retry attempt (0-based)."""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * (1 - self.jitter * random.random())
+
+    def _hedge_delay(self, tracker: Optional[LatencyTracker]) -> Optional[float]:
+        """Return how long to wait before firing a hedged duplicate call."""
+        if not self.hedge:
+            return None
+        if self.hedge_after is not None:
+            return self.hedge_after
+        if tracker is None or len(tracker) < self.hedge_min_samples:
+            return None
+        return tracker.quantile(self.hedge_quantile)
+
+    def call(
+        self,
+        func: Callable[[], Any],
+        tracker: Optional[LatencyTracker] = None,
+        on_retry: Optional[Callable[[int, BaseException], None]] = None
+    ) -> Any:
+        """Call func according to the policy, blocking until it succeeds or gives up."""
+        attempt = 0
+        while True:
+            try:
+                return self._attempt(func, tracker)
+            except Exception as e:
+                if attempt >= self.max_retries or not self.is_retryable(e):
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(
+                    f"Attempt {attempt + 1} failed ({type(e).__name__}: {e}); "
+                    f"retrying in {delay:.2f}s")
+                if on_retry:
+                    on_retry(attempt + 1, e)
+                time.sleep(delay)
+                attempt += 1
+
+    async def acall(
+        self,
+        afunc: Callable[[], Awaitable[Any]],
+        tracker: Optional[LatencyTracker] = None,
+        on_retry: Optional[Callable[[int, BaseException], None]] = None
+    ) -> Any:
+        """Async variant of call() for coroutine functions."""
+        attempt = 0
+        while True:
+            try:
+                return await self._aattempt(afunc, tracker)
+            except Exception as e:
+                if attempt >= self.max_retries or not self.is_retryable(e):
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(
+                    f"Attempt {attempt + 1} failed ({type(e).__name__}: {e}); "
+                    f"retrying in {delay:.2f}s")
+                if on_retry:
+                    on_retry(attempt + 1, e)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def call_stream(
+        self,
+        func: Callable[[], Any],
+        started: Callable[[], bool],
+        on_retry: Optional[Callable[[int, BaseException], None]] = None
+    ) -> Any:
+        """
+        Call a function that streams output to the caller as it runs.
+
+        Streams run on the calling thread, without the per-attempt timeout or
+        hedging: their output goes out as it is produced, so a duplicate or
+        abandoned attempt would emit it twice. For the same reason a failed
+        stream is only retried if ``started()`` reports no output yet.
+        """
+        attempt = 0
+        while True:
+            try:
+                return func()
+            except Exception as e:
+                if started() or attempt >= self.max_retries or not self.is_retryable(e):
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(
+                    f"Stream attempt {attempt + 1} failed before any output "
+                    f"({type(e).__name__}: {e}); retrying in {delay:.2f}s")
+                if on_retry:
+                    on_retry(attempt + 1, e)
+                time.sleep(delay)
+                attempt += 1
+
+    async def acall_stream(
+        self,
+        afunc: Callable[[], Awaitable[Any]],
+        started: Callable[[], bool],
+        on_retry: Optional[Callable[[int, BaseException], None]] = None
+    ) -> Any:
+        """Async variant of call_stream() for coroutine functions."""
+        attempt = 0
+        while True:
+            try:
+                return await afunc()
+            except Exception as e:
+                if started() or attempt >= self.max_retries or not self.is_retryable(e):
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(
+                    f"Stream attempt {attempt + 1} failed before any output "
+                    f"({type(e).__name__}: {e}); retrying in {delay:.2f}s")
+                if on_retry:
+                    on_retry(attempt + 1, e)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def _attempt(self, func: Callable[[], Any], tracker: Optional[LatencyTracker]) -> Any:
+        """
+        Run a single (possibly hedged) attempt with the per-attempt timeout.
+
+        Supervised calls run on their own threads, in a copy of the caller's
+        context so callbacks and tracing still see the run. A thread cannot
+        be interrupted: an attempt that times out (or loses a hedge race)
+        keeps running in the background until the provider answers, holding
+        its rate-limit slot, while the next attempt starts. Use the model
+        client's own request timeout to bound that.
+        """
+        start = time.monotonic()
+        hedge_delay = self._hedge_delay(tracker)
+
+        # Nothing to supervise, call inline on the current thread
+        if self.timeout is None and hedge_delay is None:
+            result = func()
+            if tracker is not None:
+                tracker.record(time.monotonic() - start)
+            return result
+
+        deadline = start + self.timeout if self.timeout is not None else None
+        pending = {_start_thread(func)}
+        hedged = hedge_delay is None
+        error = None
+
+        while pending:
+            now = time.monotonic()
+            timeout = deadline - now if deadline is not None else None
+            if not hedged:
+                hedge_at = start + hedge_delay - now
+                timeout = hedge_at if timeout is None else min(timeout, hedge_at)
+
+            done, pending = wait(pending, timeout=max(timeout, 0) if timeout is not None else None,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if tracker is not None:
+                        tracker.record(time.monotonic() - start)
+                    return future.result()
+                error = future.exception()
+
+            if deadline is not None and time.monotonic() >= deadline and pending:
+                break
+            if not hedged and pending:
+                # First attempt is slower than usual, fire a duplicate
+                logger.debug(
+                    f"Hedging call after {time.monotonic() - start:.2f}s")
+                pending.add(_start_thread(func))
+                hedged = True
+
+        if pending:
+            for future in pending:
+                future.cancel()
+            raise TimeoutError(
+                f"Call timed out after {self.timeout}s")
+        raise error
+
+    async def _aattempt(self, afunc: Callable[[], Awaitable[Any]], tracker: Optional[LatencyTracker]) -> Any:
+        """Async variant of _attempt() using tasks instead of worker threads."""
+        start = time.monotonic()
+        hedge_delay = self._hedge_delay(tracker)
+
+        if self.timeout is None and hedge_delay is None:
+            result = await afunc()
+            if tracker is not None:
+                tracker.record(time.monotonic() - start)
+            return result
+
+        deadline = start + self.timeout if self.timeout is not None else None
+        pending = {asyncio.ensure_future(afunc())}
+        hedged = hedge_delay is None
+        error = None
+
+        try:
+            while pending:
+                now = time.monotonic()
+                timeout = deadline - now if deadline is not None else None
+                if not hedged:
+                    hedge_at = start + hedge_delay - now
+                    timeout = hedge_at if timeout is None else min(timeout, hedge_at)
+
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(timeout, 0) if timeout is not None else None,
+                    return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if tracker is not None:
+                            tracker.record(time.monotonic() - start)
+                        return task.result()
+                    error = task.exception()
+
+                if deadline is not None and time.monotonic() >= deadline and pending:
+                    raise TimeoutError(
+                        f"Call timed out after {self.timeout}s")
+                if not hedged and pending:
+                    # First attempt is slower than usual, fire a duplicate
+                    logger.debug(
+                        f"Hedging call after {time.monotonic() - start:.2f}s")
+                    pending.add(asyncio.ensure_future(afunc()))
+                    hedged = True
+        finally:
+            # Cancel whichever calls lost the race
+            for task in pending:
+                task.cancel()
+
+        raise error
+
+
+def _start_thread(func: Callable[[], Any]) -> Future:
+    """Run func on a new daemon thread, in a copy of the caller's context."""
+    future: Future = Future()
+    context = contextvars.copy_context()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = context.run(func)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    # A thread per attempt: no shared pool to cap concurrency or queue attempts
+    threading.Thread(target=run, name="framework-retry-attempt", daemon=True).start()
+    return future
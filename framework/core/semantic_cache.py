@@ -0,0 +1,358 @@
+import os
+import re
+import zlib
+import atexit
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.json_utils import dumps, loads
+from .errors import ConfigError
+
+logger = logging.getLogger(__name__)
+
+# Default number of responses kept in the index
+DEFAULT_MAX_ENTRIES = 10000
+
+# Default cosine similarity a cached prompt needs to count as a hit
+DEFAULT_THRESHOLD = 0.9
+
+# Rows allocated by the first insertion; the index then grows by doubling
+INITIAL_CAPACITY = 64
+
+# Default embedding size of the hashing embedder
+DEFAULT_DIM = 512
+
+# Default number of insertions between automatic saves
+DEFAULT_SAVE_EVERY = 100
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class Embedder(ABC):
+    """Turns texts into L2-normalized float32 vectors of a fixed size."""
+
+    dim: int
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Return an array of shape (len(texts), dim)."""
+        pass
+
+    @property
+    def signature(self) -> str:
+        """Identifies the embedding space; persisted indexes from another space are discarded."""
+        return f"{type(self).__module__}.{type(self).__qualname__}:{self.dim}"
+
+
+class HashingEmbedder(Embedder):
+    """Character n-gram feature hashing.
+
+    Needs no model or network access and is deterministic across
+    processes, so it suits offline use and tests. Prompts that share most
+    of their wording (paraphrases, reordered or re-cased words) get high
+    cosine similarity.
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM, ngram_range: Tuple[int, int] = (3, 5)):
+        self.dim = dim
+        self.ngram_range = tuple(ngram_range)
+
+    @property
+    def signature(self) -> str:
+        return f"{super().signature}:{self.ngram_range[0]}-{self.ngram_range[1]}"
+
+    def _features(self, text: str) -> Tuple[List[int], List[float]]:
+        text = f" {_WHITESPACE.sub(' ', text.lower()).strip()} "
+        indices, signs = [], []
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(text) - n + 1):
+                # crc32 is stable across processes, unlike hash()
+                h = zlib.crc32(text[i:i + n].encode("utf-8"))
+                indices.append(h % self.dim)
+                signs.append(1.0 if h & 0x80000000 else -1.0)
+        return indices, signs
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            indices, signs = self._features(text)
+            if indices:
+                np.add.at(vectors[row], indices, signs)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SemanticIndex:
+    """Bounded vector index of cached responses with LRU eviction.
+
+    Vectors live in one matrix, grown by doubling up to ``max_entries``
+    rows, and a lookup is a single matrix-vector product, restricted to
+    entries of the same namespace (one per model/prompt configuration).
+    When the index is full, the least recently used entry is overwritten.
+    """
+
+    def __init__(self, dim: int, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.dim = dim
+        self.max_entries = max_entries
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.namespaces = np.zeros(0, dtype=np.int64)
+        self.last_used = np.zeros(0, dtype=np.int64)
+        self.values: List[Optional[str]] = []
+        self.size = 0
+        self._clock = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.vectors)
+
+    def _reserve(self, size: int) -> None:
+        """Grow the arrays to hold at least size entries."""
+        if size <= self.capacity:
+            return
+        capacity = min(self.max_entries, max(size, self.capacity * 2, INITIAL_CAPACITY))
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:self.size] = self.vectors[:self.size]
+        namespaces = np.zeros(capacity, dtype=np.int64)
+        namespaces[:self.size] = self.namespaces[:self.size]
+        last_used = np.zeros(capacity, dtype=np.int64)
+        last_used[:self.size] = self.last_used[:self.size]
+        self.vectors, self.namespaces, self.last_used = vectors, namespaces, last_used
+        self.values.extend([None] * (capacity - len(self.values)))
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def search(self, vector: np.ndarray, namespace: int, threshold: float) -> Optional[Tuple[str, float]]:
+        """Return (value, similarity) of the closest entry at or above threshold."""
+        if not self.size:
+            return None
+        scores = self.vectors[:self.size] @ vector
+        scores[self.namespaces[:self.size] != namespace] = -np.inf
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+        if score < threshold:
+            return None
+        self.last_used[best] = self._tick()
+        return self.values[best], score
+
+    def add(self, vector: np.ndarray, namespace: int, value: str) -> None:
+        """Insert an entry, evicting the least recently used one if full."""
+        if self.size < self.max_entries:
+            self._reserve(self.size + 1)
+            slot = self.size
+            self.size += 1
+        else:
+            slot = int(np.argmin(self.last_used))
+        self.vectors[slot] = vector
+        self.namespaces[slot] = namespace
+        self.values[slot] = value
+        self.last_used[slot] = self._tick()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy the entries, for writing them while the index keeps changing."""
+        return {
+            "vectors": self.vectors[:self.size].copy(),
+            "namespaces": self.namespaces[:self.size].copy(),
+            "last_used": self.last_used[:self.size].copy(),
+            "values": self.values[:self.size],
+        }
+
+    @staticmethod
+    def write(path: str, snapshot: Dict[str, Any], signature: str) -> None:
+        """Write a snapshot to an .npz file, atomically replacing any previous one."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                vectors=snapshot["vectors"],
+                namespaces=snapshot["namespaces"],
+                last_used=snapshot["last_used"],
+                values=np.array(dumps(snapshot["values"])),
+                signature=np.array(signature))
+        os.replace(tmp_path, path)
+
+    def save(self, path: str, signature: str) -> None:
+        """Write the index to an .npz file."""
+        self.write(path, self.snapshot(), signature)
+
+    def load(self, path: str, signature: str) -> bool:
+        """Load entries saved by save(). Returns False if the file is missing or incompatible."""
+        if not os.path.exists(path):
+            return False
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["signature"]) != signature:
+                    logger.warning(
+                        f"Ignoring semantic cache {path}: it was built with another embedder")
+                    return False
+                vectors = data["vectors"]
+                namespaces = data["namespaces"]
+                last_used = data["last_used"]
+                values = loads(str(data["values"]))
+        except Exception as e:
+            logger.warning(f"Could not load semantic cache {path}: {e}")
+            return False
+
+        # Keep the most recently used entries if the file holds more than fit
+        keep = np.argsort(last_used)[-self.max_entries:]
+        self._reserve(len(keep))
+        self.size = len(keep)
+        self.vectors[:self.size] = vectors[keep]
+        self.namespaces[:self.size] = namespaces[keep]
+        self.last_used[:self.size] = last_used[keep]
+        for slot, index in enumerate(keep):
+            self.values[slot] = values[int(index)]
+        self._clock = int(last_used.max()) if len(last_used) else 0
+        return True
+
+
+class SemanticCache:
+    """Near-duplicate LLM response cache.
+
+    Prompts are embedded and matched against earlier prompts of the same
+    namespace by cosine similarity; a close enough match returns the
+    stored response. Thread-safe; optionally persisted to an .npz file.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        threshold: float = DEFAULT_THRESHOLD,
+        path: Optional[str] = None,
+        save_every: int = DEFAULT_SAVE_EVERY
+    ):
+        self.embedder = embedder or HashingEmbedder()
+        self.threshold = threshold
+        self.path = path
+        self.save_every = save_every
+        self.index = SemanticIndex(self.embedder.dim, max_entries)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._saving = False
+        self._unsaved = 0
+        self.hits = 0
+        self.misses = 0
+
+        if path:
+            self.index.load(path, self.embedder.signature)
+
+    @staticmethod
+    def namespace(*parts: Any) -> int:
+        """Return the namespace ID for a model/prompt configuration."""
+        digest = hashlib.blake2b(dumps(parts).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embedder.embed([text])[0]
+
+    def get(self, vector: np.ndarray, namespace: int, threshold: Optional[float] = None) -> Optional[str]:
+        """Return the response cached for the closest similar prompt, or None."""
+        threshold = self.threshold if threshold is None else threshold
+        with self._lock:
+            match = self.index.search(vector, namespace, threshold)
+            if match is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        value, score = match
+        logger.debug(f"Semantic cache hit (similarity {score:.3f})")
+        return value
+
+    def set(self, vector: np.ndarray, namespace: int, value: str) -> None:
+        """Store a response for a prompt embedding."""
+        with self._lock:
+            self.index.add(vector, namespace, value)
+            self._unsaved += 1
+            if not self.path or self._unsaved < self.save_every or self._saving:
+                return
+            self._saving = True
+        # Callers are often on an event loop; write the file from a thread
+        threading.Thread(
+            target=self._save_in_background, name="semantic-cache-save", daemon=True).start()
+
+    def _save_in_background(self) -> None:
+        try:
+            self.save()
+        finally:
+            with self._lock:
+                self._saving = False
+
+    def save(self) -> None:
+        """Persist the index now (no-op without a path or unsaved entries)."""
+        if not self.path:
+            return
+        # One writer at a time, each writing the latest entries
+        with self._save_lock:
+            with self._lock:
+                if not self._unsaved:
+                    return
+                snapshot = self.index.snapshot()
+                unsaved, self._unsaved = self._unsaved, 0
+            try:
+                self.index.write(self.path, snapshot, self.embedder.signature)
+            except OSError as e:
+                logger.warning(f"Could not save semantic cache {self.path}: {e}")
+                with self._lock:
+                    self._unsaved += unsaved
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "entries": self.index.size, "path": self.path}
+
+
+_caches: Dict[Optional[str], SemanticCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_semantic_cache(
+    path: Optional[str] = None,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    threshold: float = DEFAULT_THRESHOLD,
+    embedder: Optional[Embedder] = None
+) -> SemanticCache:
+    """
+    Return the process-wide semantic cache for a storage path (None = memory only).
+
+    The cache is shared by every pipeline using the path, so options that
+    differ from those it was opened with raise ConfigError.
+    """
+    key = os.path.abspath(path) if path else None
+    embedder = embedder or HashingEmbedder()
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = SemanticCache(
+                embedder=embedder, max_entries=max_entries, threshold=threshold, path=key)
+            _caches[key] = cache
+            return cache
+
+        current = (cache.index.max_entries, cache.threshold, cache.embedder.signature)
+        requested = (max_entries, threshold, embedder.signature)
+        if requested != current:
+            raise ConfigError(
+                f"Semantic cache {key or '(memory)'} is already open with "
+                f"max_entries={current[0]}, threshold={current[1]}, embedder {current[2]}; "
+                f"got max_entries={requested[0]}, threshold={requested[1]}, embedder {requested[2]}")
+        return cache
+
+
+def save_semantic_caches() -> None:
+    """Persist every semantic cache that has a storage path."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.save()
+
+
+atexit.register(save_semantic_caches)
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls into one.
+
+    The first caller for a key runs the call; callers arriving with the same
+    key while it is in flight wait for it and share its result (or its
+    exception). Keys are forgotten as soon as the call finishes, so nothing
+    is cached. Sync callers (any thread) and async callers (any event loop)
+    share the same in-flight calls.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Return the in-flight future for a key and whether the caller leads it."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.calls += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def do(self, key: str, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run func, or wait for the identical call already in flight.
+
+        Returns:
+            (result, shared), where shared is True if the result came from
+            another caller's call
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._finish(key, future)
+
+    async def ado(self, key: str, afunc: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async variant of do()."""
+        future, leader = self._join(key)
+        if leader:
+            # Run the call as its own task, so cancelling the caller that
+            # started it doesn't fail everyone waiting on it
+            task = asyncio.ensure_future(afunc())
+            task.add_done_callback(lambda done: self._settle(key, future, done))
+
+        # shield() keeps a cancelled waiter from cancelling the shared future
+        result = await asyncio.shield(asyncio.wrap_future(future))
+        return result, not leader
+
+    def _settle(self, key: str, future: Future, task: "asyncio.Task") -> None:
+        """Pass a finished leader task's outcome to the shared future."""
+        self._finish(key, future)
+        if task.cancelled():
+            future.set_exception(asyncio.CancelledError())
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return upstream calls made, calls that shared one, and calls in flight."""
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced,
+                    "in_flight": len(self._calls)}
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide single-flight group for model calls."""
+    return _single_flight
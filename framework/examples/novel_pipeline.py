@@ -1,7 +1,5 @@
 import os
-import yaml
-from typing import Dict, Any
-from framework.integrations.langfuse_integration import LangfuseTracer
+from typing import Dict, Any, Optional
 
 # Get the absolute path to the framework directory
 FRAMEWORK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -38,6 +36,9 @@ novel_pipeline_config = {
             "model": "gpt-4o-mini",
             "temperature": 0.8,
             "prompt_template": os.path.join(FRAMEWORK_DIR, "prompts", "novel_creator_prompt.txt"),
+            "input_mapping": {
+                "novel_topics": "topic_generator"
+            },
             "output": {
                 "type": "json"
             }
@@ -49,6 +50,9 @@ novel_pipeline_config = {
             "model": "gpt-4o-mini",
             "temperature": 0.7,
             "prompt_template": os.path.join(FRAMEWORK_DIR, "prompts", "novel_combiner_prompt.txt"),
+            "input_mapping": {
+                "novel_outlines": "novel_creator"
+            },
             "output": {
                 "type": "pydantic",
                 "schema": "framework.schemas.novel.CombinedNovel"
@@ -70,31 +74,35 @@ def save_config():
     config_dir = os.path.join(FRAMEWORK_DIR, "examples", "configs")
     os.makedirs(config_dir, exist_ok=True)
 
+    import yaml
+
     config_path = os.path.join(config_dir, "novel_pipeline.yaml")
     with open(config_path, 'w') as f:
         yaml.dump(novel_pipeline_config, f, default_flow_style=False)
 
     return config_path
 
-# Function to run the novel pipeline
+# Function to get the compiled novel pipeline engine
 
 
-def run_novel_pipeline(thread_id: str = "default"):
-    from framework.core.config import ConfigLoader
-    from framework.core.engine import PipelineEngine
+def get_novel_engine():
+    """Return the shared, compiled engine for the novel pipeline."""
+    from framework.core.registry import get_pipeline_registry
 
-    # Save the config to a file
-    config_path = save_config()
+    return get_pipeline_registry().get_engine(novel_pipeline_config)
+
+# Function to run the novel pipeline
 
-    # Load the configuration
-    config = ConfigLoader.load_config(config_path)
 
-    # Create the pipeline engine
-    engine = PipelineEngine(config)
+def run_novel_pipeline(thread_id: Optional[str] = None):
+    # Get the shared engine (config loaded and graph compiled once per process)
+    engine = get_novel_engine()
 
-    # Initialize Langfuse tracer
-    tracer = LangfuseTracer(session_id="novel_pipeline",
-                            user_id=f"user_{thread_id}")
+    # Get the shared Langfuse tracer (events are queued and uploaded in the background)
+    from framework.integrations.langfuse_integration import get_langfuse_tracer
+
+    tracer = get_langfuse_tracer(session_id="novel_pipeline",
+                                 user_id=f"user_{thread_id}" if thread_id else None)
     langfuse_handler = tracer.get_callback_handler()
 
     # Run the pipeline with Langfuse tracing
@@ -109,22 +117,15 @@ def run_novel_pipeline(thread_id: str = "default"):
 # Function to stream the novel pipeline execution
 
 
-def stream_novel_pipeline(thread_id: str = "default"):
-    from framework.core.config import ConfigLoader
-    from framework.core.engine import PipelineEngine
-
-    # Save the config to a file
-    config_path = save_config()
-
-    # Load the configuration
-    config = ConfigLoader.load_config(config_path)
+def stream_novel_pipeline(thread_id: Optional[str] = None):
+    # Get the shared engine (config loaded and graph compiled once per process)
+    engine = get_novel_engine()
 
-    # Create the pipeline engine
-    engine = PipelineEngine(config)
+    # Get the shared Langfuse tracer (events are queued and uploaded in the background)
+    from framework.integrations.langfuse_integration import get_langfuse_tracer
 
-    # Initialize Langfuse tracer
-    tracer = LangfuseTracer(session_id="novel_pipeline",
-                            user_id=f"user_{thread_id}")
+    tracer = get_langfuse_tracer(session_id="novel_pipeline",
+                                 user_id=f"user_{thread_id}" if thread_id else None)
     langfuse_handler = tracer.get_callback_handler()
 
     # Stream the pipeline execution with Langfuse tracing
@@ -1,6 +1,202 @@
 import os
-from typing import Dict, Any, Optional
-from langfuse.callback import CallbackHandler
+import threading
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .trace_queue import (
+    DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_INTERVAL, DEFAULT_MAX_QUEUE_SIZE,
+    NDJSONTraceSink, TraceQueue, TraceSink, register_queue, should_sample
+)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_langfuse_client():
+    """Return the process-wide Langfuse client, created on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                try:
+                    from langfuse import Langfuse
+                except ImportError:
+                    raise ImportError(
+                        "langfuse is not installed. Please install it with: "
+                        "pip install langfuse"
+                    )
+                _client = Langfuse()
+    return _client
+
+
+class LangfuseTraceSink(TraceSink):
+    """Forwards batches of trace events to Langfuse through the shared client."""
+
+    def __init__(self, client=None):
+        self.client = client or get_langfuse_client()
+
+    def export(self, events: List[Dict[str, Any]]) -> None:
+        for event in events:
+            fields = {k: v for k, v in event.items() if k != "type" and v is not None}
+            kind = event["type"]
+            if kind == "trace":
+                self.client.trace(**fields)
+            elif kind == "span":
+                self.client.span(**fields)
+            elif kind == "generation":
+                self.client.generation(**fields)
+            elif kind == "score":
+                self.client.score(**fields)
+
+    def flush(self) -> None:
+        self.client.flush()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class TraceCallbackHandler(BaseCallbackHandler):
+    """LangChain callback handler that turns runs into queued trace events.
+
+    Callbacks only record timestamps and enqueue finished observations; all
+    network I/O happens on the queue's background flusher. The sampling
+    decision is made once per trace, when its root run starts.
+    """
+
+    # Callbacks are cheap and non-blocking, so async runs call them inline
+    run_inline = True
+
+    def __init__(
+        self,
+        trace_queue: TraceQueue,
+        sample_rate: float = 1.0,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None
+    ):
+        self.queue = trace_queue
+        self.sample_rate = sample_rate
+        self.session_id = session_id
+        self.user_id = user_id
+        # run ID -> (trace ID, parent run ID, start info) for sampled, unfinished runs
+        self._runs: Dict[UUID, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, kind: str, run_id: UUID, parent_run_id: Optional[UUID], name: str, inputs: Any, **extra) -> None:
+        with self._lock:
+            if parent_run_id is None:
+                if not should_sample(str(run_id), self.sample_rate):
+                    return
+                trace_id = str(run_id)
+            else:
+                parent = self._runs.get(parent_run_id)
+                if parent is None:
+                    # Parent trace was not sampled
+                    return
+                trace_id = parent["trace_id"]
+            self._runs[run_id] = {
+                "type": kind,
+                "trace_id": trace_id,
+                "parent_run_id": parent_run_id,
+                "name": name,
+                "input": inputs,
+                "start_time": _now(),
+                **extra
+            }
+
+    def _end(self, run_id: UUID, output: Any = None, error: Optional[BaseException] = None, **extra) -> None:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+
+        observation = {
+            "type": run["type"],
+            "id": str(run_id),
+            "trace_id": run["trace_id"],
+            "name": run["name"],
+            "start_time": run["start_time"],
+            "end_time": _now(),
+            "input": run["input"],
+            "output": output,
+            "parent_observation_id": str(run["parent_run_id"]) if run["parent_run_id"] else None,
+            "level": "ERROR" if error is not None else None,
+            "status_message": str(error) if error is not None else None,
+            "model": run.get("model"),
+            **extra
+        }
+        if run["parent_run_id"] is None:
+            # The root run also describes the trace itself
+            self.queue.put({
+                "type": "trace",
+                "id": run["trace_id"],
+                "name": run["name"],
+                "session_id": self.session_id,
+                "user_id": self.user_id,
+                "input": run["input"],
+                "output": output,
+            })
+        self.queue.put(observation)
+
+    @staticmethod
+    def _name(serialized: Optional[Dict[str, Any]], kwargs: Dict[str, Any], default: str) -> str:
+        if kwargs.get("name"):
+            return kwargs["name"]
+        if serialized:
+            return serialized.get("name") or (serialized.get("id") or [default])[-1]
+        return default
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        self._start("span", run_id, parent_run_id, self._name(serialized, kwargs, "chain"), inputs)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id, outputs)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        self._start("span", run_id, parent_run_id, self._name(serialized, kwargs, "tool"), input_str)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id, output)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._start("generation", run_id, parent_run_id, self._name(serialized, kwargs, "llm"),
+                    prompts, model=self._model(kwargs))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        inputs = [[{"role": m.type, "content": m.content} for m in batch] for batch in messages]
+        self._start("generation", run_id, parent_run_id, self._name(serialized, kwargs, "chat_model"),
+                    inputs, model=self._model(kwargs))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        generations = [g.text for batch in response.generations for g in batch]
+        usage = None
+        for batch in response.generations:
+            for generation in batch:
+                message = getattr(generation, "message", None)
+                if getattr(message, "usage_metadata", None):
+                    metadata = message.usage_metadata
+                    usage = {"input": metadata.get("input_tokens"),
+                             "output": metadata.get("output_tokens")}
+        self._end(run_id, generations[0] if len(generations) == 1 else generations, usage=usage)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+    @staticmethod
+    def _model(kwargs: Dict[str, Any]) -> Optional[str]:
+        params = kwargs.get("invocation_params") or {}
+        metadata = kwargs.get("metadata") or {}
+        return params.get("model") or params.get("model_name") or metadata.get("ls_model_name")
 
 
 class LangfuseTracer:
@@ -12,7 +208,12 @@ class LangfuseTracer:
         secret_key: Optional[str] = None,
         host: Optional[str] = None,
         session_id: Optional[str] = None,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        sink: Optional[TraceSink] = None,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL
     ):
         """Initialize the Langfuse tracer.
 
@@ -22,27 +223,43 @@ class LangfuseTracer:
             host: Langfuse host. Defaults to LANGFUSE_HOST env var or https://cloud.langfuse.com.
             session_id: Optional session ID for grouping related traces.
             user_id: Optional user ID for attributing traces to specific users.
+            sample_rate: Fraction of traces to keep. Defaults to LANGFUSE_SAMPLE_RATE env var or 1.0.
+            sink: Where events go. Defaults to an NDJSON file if LANGFUSE_TRACE_FILE
+                is set, otherwise the shared Langfuse client.
+            max_queue_size: Events buffered before new ones are dropped.
+            batch_size: Events exported per batch.
+            flush_interval: Seconds between flushes of a partial batch.
         """
         # Use provided keys or get from environment
         self.public_key = public_key or os.getenv("LANGFUSE_PUBLIC_KEY")
         self.secret_key = secret_key or os.getenv("LANGFUSE_SECRET_KEY")
         self.host = host or os.getenv(
             "LANGFUSE_HOST", "https://cloud.langfuse.com")
+        self.session_id = session_id
+        self.user_id = user_id
+        self.sample_rate = float(sample_rate if sample_rate is not None
+                                 else os.getenv("LANGFUSE_SAMPLE_RATE", 1.0))
 
-        # Validate keys
-        if not self.public_key or not self.secret_key:
+        trace_file = os.getenv("LANGFUSE_TRACE_FILE") if sink is None else None
+
+        # Validate keys (a custom sink or trace file does not need them)
+        if sink is None and not trace_file and (not self.public_key or not self.secret_key):
             print("Warning: Langfuse keys not provided. Tracing will be disabled.")
             self.enabled = False
         else:
             self.enabled = True
 
-        # Create callback handler
-        self.handler = CallbackHandler(
-            session_id=session_id,
-            user_id=user_id
-        ) if self.enabled else None
+        self.queue = None
+        self.handler = None
+        if self.enabled:
+            self.queue = _get_trace_queue(
+                sink, trace_file, max_queue_size, batch_size, flush_interval,
+                self.public_key, self.secret_key, self.host)
+            # Create callback handler
+            self.handler = TraceCallbackHandler(
+                self.queue, self.sample_rate, session_id=session_id, user_id=user_id)
 
-    def get_callback_handler(self) -> Optional[CallbackHandler]:
+    def get_callback_handler(self) -> Optional[TraceCallbackHandler]:
         """Get the Langfuse callback handler for LangChain."""
         return self.handler
 
@@ -59,12 +276,61 @@ class LangfuseTracer:
             print("Warning: Langfuse tracing is disabled. Score not added.")
             return
 
-        from langfuse import Langfuse
+        if not should_sample(trace_id, self.sample_rate):
+            return
+        self.queue.put({
+            "type": "score",
+            "trace_id": trace_id,
+            "name": name,
+            "value": value,
+            "comment": comment
+        })
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """Block until queued events are exported."""
+        return self.queue.flush(timeout) if self.queue else True
+
+
+_trace_queues: Dict[Any, TraceQueue] = {}
+_trace_queues_lock = threading.Lock()
+
+
+def _get_trace_queue(
+    sink: Optional[TraceSink],
+    trace_file: Optional[str],
+    max_queue_size: int,
+    batch_size: int,
+    flush_interval: float,
+    public_key: Optional[str],
+    secret_key: Optional[str],
+    host: Optional[str]
+) -> TraceQueue:
+    """Return the shared queue for a sink, creating it (and its flusher) once."""
+    if sink is not None:
+        key = ("sink", id(sink))
+    elif trace_file:
+        key = ("file", os.path.abspath(trace_file))
+    else:
+        key = ("langfuse", public_key, host)
+
+    with _trace_queues_lock:
+        trace_queue = _trace_queues.get(key)
+        if trace_queue is None:
+            if sink is None and trace_file:
+                sink = NDJSONTraceSink(trace_file)
+            elif sink is None:
+                # Langfuse() reads its credentials from the environment
+                os.environ.setdefault("LANGFUSE_PUBLIC_KEY", public_key)
+                os.environ.setdefault("LANGFUSE_SECRET_KEY", secret_key)
+                os.environ.setdefault("LANGFUSE_HOST", host)
+                sink = LangfuseTraceSink()
+            trace_queue = _trace_queues[key] = register_queue(TraceQueue(
+                sink, max_queue_size=max_queue_size, batch_size=batch_size,
+                flush_interval=flush_interval))
+        return trace_queue
+
 
-        langfuse = Langfuse()
-        langfuse.score(
-            trace_id=trace_id,
-            name=name,
-            value=value,
-            comment=comment
-        )
+@lru_cache(maxsize=128)
+def get_langfuse_tracer(session_id: Optional[str] = None, user_id: Optional[str] = None) -> LangfuseTracer:
+    """Return a shared tracer for a session/user pair, configured from the environment."""
+    return LangfuseTracer(session_id=session_id, user_id=user_id)
@@ -0,0 +1,240 @@
+import os
+import queue
+import atexit
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from ..utils.json_utils import dumps
+
+logger = logging.getLogger(__name__)
+
+# Default number of events buffered before new ones are dropped
+DEFAULT_MAX_QUEUE_SIZE = 10000
+
+# Default number of events exported per batch
+DEFAULT_BATCH_SIZE = 100
+
+# Default seconds between flushes of a partially filled batch
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# Queued by flush() to wake a flusher waiting for events; never exported
+_WAKE = object()
+
+
+def should_sample(trace_id: str, sample_rate: float) -> bool:
+    """
+    Head-based sampling decision for a trace.
+
+    The decision is a pure function of the trace ID, so every process (and
+    every event of the trace) agrees on it.
+    """
+    if sample_rate >= 1:
+        return True
+    if sample_rate <= 0:
+        return False
+    digest = hashlib.blake2b(str(trace_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64 < sample_rate
+
+
+class TraceSink(ABC):
+    """Destination for batches of trace events."""
+
+    @abstractmethod
+    def export(self, events: List[Dict[str, Any]]) -> None:
+        """Deliver a batch of events. Called from the background flusher only."""
+        pass
+
+    def flush(self) -> None:
+        """Push out anything the sink buffers itself."""
+        pass
+
+    def close(self) -> None:
+        """Flush and release resources."""
+        self.flush()
+
+
+class NDJSONTraceSink(TraceSink):
+    """Writes trace events to a local file, one JSON object per line.
+
+    Useful as a stand-in for the tracing service in tests and offline runs.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, events: List[Dict[str, Any]]) -> None:
+        payload = "".join(dumps(event) + "\n" for event in events)
+        with self._lock:
+            self._file.write(payload)
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class TraceQueue:
+    """Bounded, non-blocking event queue drained by a background flusher.
+
+    ``put()`` never blocks: when the queue is full the event is dropped and
+    counted, so tracing cannot slow down or stall a pipeline run. The
+    flusher thread exports events to the sink in batches of up to
+    ``batch_size``, at least every ``flush_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        sink: TraceSink,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._flush_requested = threading.Event()
+        self._flushed = threading.Condition()
+        self._closed = False
+        self.enqueued = 0
+        self.dropped = 0
+        self.exported = 0
+        self.failed = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name="framework-trace-flusher", daemon=True)
+        self._thread.start()
+
+    def put(self, event: Dict[str, Any]) -> bool:
+        """Queue an event without blocking. Returns False if it was dropped."""
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        """Wait for the first event (up to the flush interval), then drain a batch."""
+        batch = []
+        try:
+            event = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return batch
+        while True:
+            if event is not _WAKE:
+                batch.append(event)
+                if len(batch) >= self.batch_size:
+                    break
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if batch:
+                self._export(batch)
+            if self._queue.empty():
+                if self._flush_requested.is_set():
+                    self._flush_requested.clear()
+                    self._sink_flush()
+                    with self._flushed:
+                        self._flushed.notify_all()
+                if self._closed:
+                    return
+
+    def _export(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            self.sink.export(batch)
+            self.exported += len(batch)
+        except Exception as e:
+            # Tracing failures must never surface in pipeline runs
+            self.failed += len(batch)
+            logger.warning(f"Failed to export {len(batch)} trace events: {e}")
+
+    def _sink_flush(self) -> None:
+        try:
+            self.sink.flush()
+        except Exception as e:
+            logger.warning(f"Failed to flush trace sink: {e}")
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """Block until queued events are exported. Returns False on timeout."""
+        if not self._thread.is_alive():
+            return self._queue.empty()
+        with self._flushed:
+            self._flush_requested.set()
+            self._wake()
+            return self._flushed.wait(timeout)
+
+    def _wake(self) -> None:
+        """Stop the flusher waiting out the flush interval on an empty queue."""
+        try:
+            self._queue.put_nowait(_WAKE)
+        except queue.Full:
+            # A full queue means the flusher isn't idle
+            pass
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Export what is queued, stop the flusher and close the sink."""
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        self._wake()
+        self._thread.join(timeout=max(self.flush_interval * 2, 1.0))
+        try:
+            self.sink.close()
+        except Exception as e:
+            logger.warning(f"Failed to close trace sink: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Return event counters and the current queue depth."""
+        return {
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "exported": self.exported,
+            "failed": self.failed,
+            "queued": self._queue.qsize(),
+        }
+
+
+_queues: List[TraceQueue] = []
+_queues_lock = threading.Lock()
+
+
+def register_queue(trace_queue: TraceQueue) -> TraceQueue:
+    """Track a queue so it is flushed and closed at interpreter exit."""
+    with _queues_lock:
+        _queues.append(trace_queue)
+    return trace_queue
+
+
+def shutdown_trace_queues() -> None:
+    """Flush and close every registered trace queue."""
+    with _queues_lock:
+        queues = list(_queues)
+        _queues.clear()
+    for trace_queue in queues:
+        trace_queue.close()
+
+
+atexit.register(shutdown_trace_queues)
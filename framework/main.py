@@ -1,11 +1,12 @@
 import os
+import sys
 import argparse
 import json
-import yaml
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, List, Optional
 
-from framework.core.config import ConfigLoader
-from framework.core.engine import PipelineEngine
+# Heavy dependencies (LangGraph, LangChain, Jinja2, Langfuse) are imported by
+# the commands that need them, so `--help` and argument errors return at once
 
 
 def main():
@@ -23,7 +24,8 @@ def main():
     run_parser.add_argument(
         "--input", "-i", help="JSON string or path to JSON file with input data")
     run_parser.add_argument(
-        "--thread-id", "-t", default="default", help="Thread ID for conversation state")
+        "--thread-id", "-t", default=None,
+        help="Thread ID for conversation state (a fresh thread if omitted)")
 
     # Stream command
     stream_parser = subparsers.add_parser(
@@ -33,7 +35,14 @@ def main():
     stream_parser.add_argument(
         "--input", "-i", help="JSON string or path to JSON file with input data")
     stream_parser.add_argument(
-        "--thread-id", "-t", default="default", help="Thread ID for conversation state")
+        "--thread-id", "-t", default=None,
+        help="Thread ID for conversation state (a fresh thread if omitted)")
+    stream_parser.add_argument(
+        "--mode", "-m", choices=["values", "updates", "tokens"], default="values",
+        help="Stream full state snapshots, per-node updates, or model tokens")
+    stream_parser.add_argument(
+        "--format", "-f", choices=["pretty", "ndjson"], default="pretty",
+        help="Output format for stream events (ndjson prints one compact JSON object per line)")
 
     # Example command
     example_parser = subparsers.add_parser(
@@ -45,13 +54,87 @@ def main():
     example_parser.add_argument(
         "--stream", "-s", action="store_true", help="Stream the execution")
 
+    # Bench command
+    bench_parser = subparsers.add_parser(
+        "bench", help="Benchmark the framework against an offline fake model")
+    bench_parser.add_argument(
+        "--pipelines", "-p", nargs="+", choices=["joke", "novel", "wide", "deep"],
+        help="Pipelines to benchmark (default: all)")
+    bench_parser.add_argument(
+        "--requests", "-n", type=int, default=50, help="Measured requests per pipeline")
+    bench_parser.add_argument(
+        "--concurrency", "-c", type=int, default=8, help="Maximum requests in flight")
+    bench_parser.add_argument(
+        "--mode", choices=["sync", "async"], default="sync",
+        help="Drive requests from a thread pool (sync) or event loop tasks (async)")
+    bench_parser.add_argument(
+        "--warmup", type=int, default=5, help="Unmeasured requests per pipeline")
+    bench_parser.add_argument(
+        "--overhead-requests", type=int, default=20,
+        help="Zero-latency requests per pipeline used to measure framework overhead")
+    bench_parser.add_argument(
+        "--latency", type=float, default=0.05, help="Simulated model latency in seconds")
+    bench_parser.add_argument(
+        "--latency-jitter", type=float, default=0.0,
+        help="Spread of the latency distribution (seconds, or log-sigma for lognormal)")
+    bench_parser.add_argument(
+        "--distribution", choices=["constant", "uniform", "normal", "lognormal"],
+        default="constant", help="Simulated latency distribution")
+    bench_parser.add_argument(
+        "--token-delay", type=float, default=0.0, help="Simulated delay per token in seconds")
+    bench_parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of model calls that fail")
+    bench_parser.add_argument(
+        "--seed", type=int, default=0, help="Seed for the simulated latencies")
+    bench_parser.add_argument(
+        "--width", type=int, default=8, help="Parallel branches in the wide DAG")
+    bench_parser.add_argument(
+        "--depth", type=int, default=8, help="Chained nodes in the deep DAG")
+    bench_parser.add_argument(
+        "--output", "-o", help="Save the full report as JSON to this path")
+
+    # Serve command
+    serve_parser = subparsers.add_parser(
+        "serve", help="Serve pipelines over HTTP")
+    serve_parser.add_argument(
+        "configs", nargs="+",
+        help="Pipeline configuration files, optionally as name=path (name defaults to the file name)")
+    serve_parser.add_argument(
+        "--host", default="127.0.0.1", help="Interface to bind")
+    serve_parser.add_argument(
+        "--port", type=int, default=8000, help="Port to listen on")
+    serve_parser.add_argument(
+        "--max-concurrency", type=int, default=32, help="Pipeline requests executing at once")
+    serve_parser.add_argument(
+        "--max-queue", type=int, default=128,
+        help="Requests waiting for a slot before new ones are rejected with 503")
+    serve_parser.add_argument(
+        "--queue-timeout", type=float, default=30.0,
+        help="Seconds a queued request waits for a slot before it is rejected")
+    serve_parser.add_argument(
+        "--shutdown-timeout", type=float, default=30.0,
+        help="Seconds shutdown waits for in-flight requests")
+    serve_parser.add_argument(
+        "--max-batch-size", type=int, default=100, help="Largest accepted batch request")
+
     # Add Langfuse configuration options
     parser.add_argument("--langfuse-public-key", help="Langfuse public key")
     parser.add_argument("--langfuse-secret-key", help="Langfuse secret key")
     parser.add_argument("--langfuse-host", help="Langfuse host URL")
 
+    parser.add_argument(
+        "--profile-startup", action="store_true",
+        help="Run the command under -X importtime and report where import time goes")
+
     args = parser.parse_args()
 
+    if args.profile_startup:
+        sys.exit(profile_startup(
+            [arg for arg in sys.argv[1:] if arg != "--profile-startup"]))
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
     # Set Langfuse environment variables if provided
     if args.langfuse_public_key:
         os.environ["LANGFUSE_PUBLIC_KEY"] = args.langfuse_public_key
@@ -64,9 +147,14 @@ def main():
     if args.command == "run":
         run_pipeline(args.config, args.input, args.thread_id)
     elif args.command == "stream":
-        stream_pipeline(args.config, args.input, args.thread_id)
+        stream_pipeline(args.config, args.input,
+                        args.thread_id, args.mode, args.format)
     elif args.command == "example":
         run_example(args.name, args)
+    elif args.command == "bench":
+        run_bench(args)
+    elif args.command == "serve":
+        run_server(args)
     else:
         parser.print_help()
 
@@ -77,6 +165,8 @@ def load_input_data(input_arg: str) -> Dict[str, Any]:
         return {}
 
     if os.path.exists(input_arg):
+        import yaml
+
         with open(input_arg, 'r') as f:
             if input_arg.endswith('.json'):
                 return json.load(f)
@@ -89,8 +179,11 @@ def load_input_data(input_arg: str) -> Dict[str, Any]:
         raise ValueError(f"Invalid JSON input: {input_arg}")
 
 
-def run_pipeline(config_path: str, input_arg: str, thread_id: str):
+def run_pipeline(config_path: str, input_arg: str, thread_id: Optional[str]):
     """Run a pipeline with the given configuration and input."""
+    from framework.core.config import ConfigLoader
+    from framework.core.engine import PipelineEngine
+
     # Load the configuration
     config = ConfigLoader.load_config(config_path)
 
@@ -107,8 +200,17 @@ def run_pipeline(config_path: str, input_arg: str, thread_id: str):
     print(json.dumps(result, indent=2, default=str))
 
 
-def stream_pipeline(config_path: str, input_arg: str, thread_id: str):
+def stream_pipeline(
+    config_path: str,
+    input_arg: str,
+    thread_id: Optional[str],
+    mode: str = "values",
+    output_format: str = "pretty"
+):
     """Stream a pipeline execution with the given configuration and input."""
+    from framework.core.config import ConfigLoader
+    from framework.core.engine import PipelineEngine
+
     # Load the configuration
     config = ConfigLoader.load_config(config_path)
 
@@ -119,11 +221,119 @@ def stream_pipeline(config_path: str, input_arg: str, thread_id: str):
     engine = PipelineEngine(config)
 
     # Stream the pipeline execution
-    for event in engine.stream(inputs, thread_id):
+    for event in engine.stream(inputs, thread_id, mode=mode):
+        if output_format == "ndjson":
+            # One compact JSON object per line, flushed for piping
+            print(json.dumps(event, separators=(",", ":"), default=str), flush=True)
+            continue
+        if mode == "tokens" and event.get("type") == "token":
+            # Print tokens as they arrive
+            print(event["token"], end="", flush=True)
+            continue
+        if mode == "tokens":
+            print()
         print(f"Event: {json.dumps(event, indent=2, default=str)}")
         print("-" * 50)
 
 
+def run_bench(args):
+    """Run the benchmark suite and print (and optionally save) the report."""
+    from framework.bench.harness import format_report, run_benchmarks, save_report
+
+    report = run_benchmarks(
+        pipelines=args.pipelines,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        mode=args.mode,
+        warmup=args.warmup,
+        overhead_requests=args.overhead_requests,
+        width=args.width,
+        depth=args.depth,
+        fake_options={
+            "latency": args.latency,
+            "latency_jitter": args.latency_jitter,
+            "distribution": args.distribution,
+            "token_delay": args.token_delay,
+            "error_rate": args.error_rate,
+            "seed": args.seed,
+        }
+    )
+
+    print(format_report(report))
+    if args.output:
+        save_report(report, args.output)
+        print(f"Saved benchmark report to {args.output}")
+
+
+def run_server(args):
+    """Serve the given pipeline configs over HTTP until interrupted."""
+    from framework.server.app import serve
+
+    serve(
+        args.configs,
+        host=args.host,
+        port=args.port,
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+        queue_timeout=args.queue_timeout,
+        shutdown_timeout=args.shutdown_timeout,
+        max_batch_size=args.max_batch_size
+    )
+
+
+def _parse_importtime(output: str):
+    """Split -X importtime stderr into (module, self µs, cumulative µs) rows and other lines."""
+    rows, other = [], []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            other.append(line)
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Column header
+        rows.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return rows, other
+
+
+def format_startup_report(rows, top: int = 15) -> str:
+    """Summarize import timings by top-level package and by slowest import."""
+    total = sum(self_us for _, self_us, _ in rows)
+    packages: Dict[str, int] = {}
+    for module, self_us, _ in rows:
+        package = module.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+
+    lines = [f"Startup imports: {len(rows)} modules, {total / 1000:.1f} ms", "",
+             "By top-level package (self time):"]
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"  {self_us / 1000:9.1f} ms  {100 * self_us / max(total, 1):5.1f}%  {package}")
+
+    lines += ["", "Slowest imports (cumulative time):"]
+    for module, _, cumulative in sorted(rows, key=lambda row: -row[2])[:top]:
+        lines.append(f"  {cumulative / 1000:9.1f} ms  {module}")
+    return "\n".join(lines)
+
+
+def profile_startup(argv: List[str]) -> int:
+    """Re-run a CLI command under -X importtime and print an import-time report to stderr."""
+    import subprocess
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "framework.main", *argv],
+        stderr=subprocess.PIPE, text=True, env=env)
+
+    rows, other = _parse_importtime(process.stderr)
+    if other:
+        # The command's own stderr output
+        print("\n".join(other), file=sys.stderr)
+    print("-" * 50, file=sys.stderr)
+    print(format_startup_report(rows), file=sys.stderr)
+    return process.returncode
+
+
 def run_example(example_name: str, args):
     """Run an example pipeline."""
     if example_name == "joke":
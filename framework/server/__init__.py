@@ -0,0 +1 @@
+# Server module initialization
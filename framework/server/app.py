@@ -0,0 +1,427 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from ..core.engine import STREAM_MODES, PipelineEngine
+from ..core.errors import ConfigError
+from ..core.metrics import get_metrics
+from ..core.registry import get_pipeline_registry
+from ..utils.json_utils import JSONDecodeError, dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Default number of pipeline requests executing at once
+DEFAULT_MAX_CONCURRENCY = 32
+
+# Default number of requests allowed to wait for a slot before new ones are rejected
+DEFAULT_MAX_QUEUE = 128
+
+# Default seconds a queued request waits for a slot before it is rejected
+DEFAULT_QUEUE_TIMEOUT = 30.0
+
+# Default seconds shutdown waits for in-flight requests
+DEFAULT_SHUTDOWN_TIMEOUT = 30.0
+
+# Default limits for batch requests
+DEFAULT_MAX_BATCH_SIZE = 100
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# Default largest accepted request body, in bytes
+DEFAULT_MAX_BODY_SIZE = 1024 * 1024
+
+
+class HTTPError(Exception):
+    """An error answered with a JSON error body."""
+
+    def __init__(self, status: int, message: str, headers: Optional[List[Tuple[bytes, bytes]]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or []
+
+
+class AdmissionController:
+    """Limits concurrent requests and queues a bounded number of waiters.
+
+    Up to ``max_concurrency`` requests run at once. Up to ``max_queue``
+    more wait, each for at most ``queue_timeout`` seconds; anything beyond
+    that is rejected immediately so clients get back-pressure (HTTP 503)
+    instead of unbounded latency.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        queue_timeout: Optional[float] = DEFAULT_QUEUE_TIMEOUT
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+        self._idle: Optional[asyncio.Event] = None
+
+    def _init(self) -> None:
+        # Created lazily so they bind to the server's event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._idle = asyncio.Event()
+            self._idle.set()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one execution slot for the duration of the block."""
+        self._init()
+        if self._semaphore.locked():
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise HTTPError(503, "Server is at capacity", [(b"retry-after", b"1")])
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise HTTPError(503, "Timed out waiting for capacity", [(b"retry-after", b"1")])
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.active += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+            if self.active == 0:
+                self._idle.set()
+
+    async def wait_idle(self, timeout: Optional[float]) -> bool:
+        """Wait until no request holds a slot. Returns False on timeout."""
+        self._init()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def stats(self) -> Dict[str, int]:
+        return {"active": self.active, "queued": self.queued, "rejected": self.rejected,
+                "max_concurrency": self.max_concurrency, "max_queue": self.max_queue}
+
+
+class PipelineServer:
+    """ASGI application serving pipeline engines over HTTP.
+
+    Routes:
+        GET  /health                   liveness (503 while shutting down)
+        GET  /pipelines                served pipelines
+        POST /pipelines/{name}/run     {"inputs": {...}, "thread_id": ...}
+        POST /pipelines/{name}/stream  same body plus "mode"; Server-Sent Events
+        POST /pipelines/{name}/batch   {"inputs": [{...}, ...], "max_concurrency": ...}
+        GET  /metrics                  Prometheus metrics
+
+    Requests without a thread_id run on a fresh thread so concurrent
+    clients never share checkpointed state.
+    """
+
+    def __init__(
+        self,
+        engines: Dict[str, PipelineEngine],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        queue_timeout: Optional[float] = DEFAULT_QUEUE_TIMEOUT,
+        shutdown_timeout: float = DEFAULT_SHUTDOWN_TIMEOUT,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        batch_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        max_body_size: int = DEFAULT_MAX_BODY_SIZE
+    ):
+        self.engines = engines
+        self.admission = AdmissionController(max_concurrency, max_queue, queue_timeout)
+        self.shutdown_timeout = shutdown_timeout
+        self.max_batch_size = max_batch_size
+        self.batch_concurrency = batch_concurrency
+        self.max_body_size = max_body_size
+        self.draining = False
+
+        registry = get_metrics()
+        self._requests = registry.counter(
+            "framework_server_requests_total",
+            "HTTP requests by endpoint and status code",
+            ["endpoint", "status"])
+        self._latency = registry.histogram(
+            "framework_server_request_seconds",
+            "HTTP request handling time, including time queued for capacity",
+            ["endpoint"])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                logger.info(f"Serving pipelines: {', '.join(sorted(self.engines))}")
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def shutdown(self) -> None:
+        """Stop accepting pipeline requests and wait for in-flight ones to finish."""
+        self.draining = True
+        stats = self.admission.stats()
+        if stats["active"] or stats["queued"]:
+            logger.info(f"Waiting for {stats['active']} in-flight requests to finish")
+        if not await self.admission.wait_idle(self.shutdown_timeout):
+            logger.warning(
+                f"Shutting down with {self.admission.active} requests still running")
+
+    async def _http(self, scope, receive, send) -> None:
+        method = scope["method"]
+        parts = [part for part in scope["path"].split("/") if part]
+        started = time.perf_counter()
+        endpoint = "other"
+        status = 500
+        try:
+            if parts == ["health"] and method == "GET":
+                endpoint = "health"
+                if self.draining:
+                    raise HTTPError(503, "Shutting down")
+                status = await self._send_json(send, 200, {"status": "ok", **self.admission.stats()})
+            elif parts == ["pipelines"] and method == "GET":
+                endpoint = "pipelines"
+                status = await self._send_json(send, 200, {"pipelines": [
+                    {"name": name, "pipeline": engine.config.name,
+                     "description": engine.config.description}
+                    for name, engine in sorted(self.engines.items())]})
+            elif parts == ["metrics"] and method == "GET":
+                endpoint = "metrics"
+                body = get_metrics().render_prometheus().encode("utf-8")
+                status = await self._send(
+                    send, 200, body, b"text/plain; version=0.0.4; charset=utf-8")
+            elif len(parts) == 3 and parts[0] == "pipelines" and parts[2] in ("run", "stream", "batch"):
+                endpoint = parts[2]
+                if method != "POST":
+                    raise HTTPError(405, "Method not allowed", [(b"allow", b"POST")])
+                status = await self._pipeline_request(scope, receive, send, parts[1], parts[2])
+            else:
+                raise HTTPError(404, "Not found")
+        except HTTPError as e:
+            status = await self._send_json(send, e.status, {"error": e.message}, e.headers)
+        except Exception as e:
+            logger.exception(f"Error handling {method} {scope['path']}")
+            status = await self._send_json(send, 500, {"error": str(e)})
+        finally:
+            self._requests.inc(endpoint=endpoint, status=status)
+            self._latency.observe(time.perf_counter() - started, endpoint=endpoint)
+
+    async def _pipeline_request(self, scope, receive, send, name: str, action: str) -> int:
+        engine = self.engines.get(name)
+        if engine is None:
+            raise HTTPError(404, f"Unknown pipeline: {name}")
+        if self.draining:
+            raise HTTPError(503, "Shutting down", [(b"retry-after", b"1")])
+
+        body = await self._read_json(receive)
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        thread_id = body.get("thread_id") or f"http-{uuid.uuid4().hex}"
+        if not isinstance(thread_id, str):
+            raise HTTPError(400, "'thread_id' must be a string")
+
+        async with self.admission.slot():
+            if action == "run":
+                inputs = self._inputs(body.get("inputs"))
+                result = await engine.arun(inputs, thread_id)
+                return await self._send_json(send, 200, {"result": result, "thread_id": thread_id})
+
+            if action == "stream":
+                inputs = self._inputs(body.get("inputs"))
+                mode = body.get("mode") or query.get("mode", ["values"])[0]
+                if not isinstance(mode, str) or mode not in STREAM_MODES:
+                    raise HTTPError(
+                        400, f"Unsupported stream mode: {mode} (expected one of {', '.join(STREAM_MODES)})")
+                events = engine.astream(
+                    inputs, thread_id, mode=mode, partial_json=bool(body.get("partial_json")))
+                return await self._stream(receive, send, events, thread_id)
+
+            inputs_list = body.get("inputs")
+            if not isinstance(inputs_list, list):
+                raise HTTPError(400, "'inputs' must be a list of input objects")
+            if len(inputs_list) > self.max_batch_size:
+                raise HTTPError(413, f"Batch exceeds {self.max_batch_size} items")
+            max_concurrency = body.get("max_concurrency")
+            if max_concurrency is None:
+                max_concurrency = self.batch_concurrency
+            elif type(max_concurrency) is not int or max_concurrency < 1:
+                raise HTTPError(400, "'max_concurrency' must be a positive integer")
+            results = await engine.arun_batch(
+                [self._inputs(inputs) for inputs in inputs_list],
+                max_concurrency=min(max_concurrency, self.batch_concurrency),
+                thread_id_prefix=thread_id)
+            return await self._send_json(send, 200, {"results": [
+                {"error": str(result)} if isinstance(result, Exception) else {"result": result}
+                for result in results]})
+
+    @staticmethod
+    def _inputs(inputs: Any) -> Dict[str, Any]:
+        if inputs is None:
+            return {}
+        if not isinstance(inputs, dict):
+            raise HTTPError(400, "Pipeline inputs must be a JSON object")
+        return inputs
+
+    async def _read_json(self, receive) -> Dict[str, Any]:
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise HTTPError(400, "Client disconnected")
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_size:
+                raise HTTPError(413, f"Request body exceeds {self.max_body_size} bytes")
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                break
+
+        raw = b"".join(chunks)
+        if not raw.strip():
+            return {}
+        try:
+            body = loads(raw)
+        except JSONDecodeError as e:
+            raise HTTPError(400, f"Invalid JSON body: {e}")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return body
+
+    async def _stream(self, receive, send, events, thread_id: str) -> int:
+        """Relay stream events as Server-Sent Events until done or the client disconnects."""
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+                (b"x-thread-id", thread_id.encode("utf-8")),
+            ],
+        })
+
+        async def relay():
+            try:
+                async for event in events:
+                    kind = event.get("type", "values") if isinstance(event, dict) else "values"
+                    await self._send_event(send, kind, event)
+                await self._send_event(send, "end", {"thread_id": thread_id})
+            except Exception as e:
+                # Headers are already sent, so errors travel as an event
+                logger.error(f"Error streaming pipeline: {e}")
+                await self._send_event(send, "error", {"error": str(e)})
+
+        async def watch_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        relay_task = asyncio.ensure_future(relay())
+        watch_task = asyncio.ensure_future(watch_disconnect())
+        await asyncio.wait({relay_task, watch_task}, return_when=asyncio.FIRST_COMPLETED)
+        if not relay_task.done():
+            # Client went away: stop the run instead of computing unused output
+            relay_task.cancel()
+        watch_task.cancel()
+        await asyncio.gather(relay_task, watch_task, return_exceptions=True)
+
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+        return 200
+
+    @staticmethod
+    async def _send_event(send, event: str, data: Any) -> None:
+        payload = f"event: {event}\ndata: {dumps(data)}\n\n".encode("utf-8")
+        await send({"type": "http.response.body", "body": payload, "more_body": True})
+
+    @staticmethod
+    async def _send(send, status: int, body: bytes, content_type: bytes,
+                    headers: Optional[List[Tuple[bytes, bytes]]] = None) -> int:
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                *(headers or []),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+        return status
+
+    async def _send_json(self, send, status: int, data: Any,
+                         headers: Optional[List[Tuple[bytes, bytes]]] = None) -> int:
+        return await self._send(send, status, dumps(data).encode("utf-8"), b"application/json", headers)
+
+
+def _pipeline_name(spec: str) -> Tuple[str, str]:
+    """Split a ``name=path`` spec; the name defaults to the file name without extension."""
+    if "=" in spec:
+        name, path = spec.split("=", 1)
+        return name, path
+    return os.path.splitext(os.path.basename(spec))[0], spec
+
+
+def create_app(config_specs: List[str], **options: Any) -> PipelineServer:
+    """
+    Build the ASGI app for a set of pipeline configs.
+
+    Engines are built and compiled up front through the pipeline registry,
+    so the first request does not pay for it.
+
+    Args:
+        config_specs: Config file paths, optionally as ``name=path``
+        **options: PipelineServer limits (max_concurrency, max_queue, ...)
+
+    Returns:
+        The ASGI application
+    """
+    engines = {}
+    for spec in config_specs:
+        name, path = _pipeline_name(spec)
+        if name in engines:
+            raise ConfigError(f"Duplicate pipeline name: {name}")
+        engines[name] = get_pipeline_registry().get_engine(path)
+    return PipelineServer(engines, **options)
+
+
+def serve(
+    config_specs: List[str],
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    **options: Any
+) -> None:
+    """Serve pipelines with uvicorn until interrupted."""
+    try:
+        import uvicorn
+    except ImportError:
+        raise ImportError(
+            "uvicorn is not installed. Please install it with: "
+            "pip install uvicorn"
+        )
+
+    app = create_app(config_specs, **options)
+    uvicorn.run(
+        app, host=host, port=port, lifespan="on",
+        timeout_graceful_shutdown=app.shutdown_timeout)
@@ -1,50 +1,346 @@
 import os
-import json
+import time
+import uuid
+import queue
+import atexit
 import logging
-from datetime import datetime
-from typing import Dict, Any, Optional
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Tuple
+
+from ..utils.json_utils import dumps
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends stay atomic per process only
+    fcntl = None
 
-# Configure logging
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Default size (bytes) after which the active segment is rotated
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Default seconds covered by one segment (segments are named after their time bucket)
+DEFAULT_ROTATE_INTERVAL = 24 * 60 * 60
+
+# Default seconds a partially filled batch waits before it is written
+DEFAULT_FLUSH_INTERVAL = 0.2
+
+# Default upper bound on records waiting to be written (callers block beyond it)
+DEFAULT_MAX_QUEUE_SIZE = 10000
+
+_COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+class NDJSONLogWriter:
+    """Append-only NDJSON log with background batching and rotation.
+
+    Callers serialize their record and hand it to a queue; a writer thread
+    appends whole batches with a single write to an ``O_APPEND`` descriptor
+    that stays open between batches. Writes and rotations from different
+    processes are serialized with an advisory lock on a sidecar lock file,
+    so any number of processes can share one log directory.
+
+    Segments are named ``<prefix>-<time bucket>.ndjson``, so a new segment
+    starts every ``rotate_interval`` seconds. A segment that grows past
+    ``max_bytes`` is renamed to ``<prefix>-<time bucket>.<n>.ndjson``.
+    Closed segments are optionally compressed with gzip or zstd.
+    """
+
+    def __init__(
+        self,
+        log_dir: str,
+        prefix: str = "log",
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        rotate_interval: Optional[float] = DEFAULT_ROTATE_INTERVAL,
+        compression: Optional[str] = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        batch_size: int = 1000
+    ):
+        if compression not in (None, "gzip", "zstd"):
+            raise ValueError(f"Unsupported compression: {compression}")
+
+        self.log_dir = os.path.abspath(log_dir)
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compression = compression
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._lock_fd = os.open(
+            os.path.join(self.log_dir, f".{prefix}.lock"), os.O_CREAT | os.O_RDWR, 0o644)
+        self._fd: Optional[int] = None
+        self._path: Optional[str] = None
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._closed = False
+        self.records = 0
+        self.errors = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name=f"framework-file-logger-{prefix}", daemon=True)
+        self._thread.start()
+
+    def current_path(self, now: Optional[float] = None) -> str:
+        """Return the path of the segment records are currently appended to."""
+        return os.path.join(self.log_dir, f"{self._segment_base(now)}.ndjson")
+
+    def _segment_base(self, now: Optional[float] = None) -> str:
+        now = time.time() if now is None else now
+        if not self.rotate_interval:
+            return self.prefix
+        bucket = int(now // self.rotate_interval * self.rotate_interval)
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.gmtime(bucket))
+        return f"{self.prefix}-{stamp}"
+
+    def write(self, data: Any) -> str:
+        """
+        Queue one record for appending.
+
+        Args:
+            data: JSON-serializable payload of the record
+
+        Returns:
+            The record's unique ID
+        """
+        if self._closed:
+            raise RuntimeError("Log writer has been closed")
+
+        record_id = uuid.uuid4().hex
+        # Serialize now so later changes to data don't leak into the record
+        line = dumps({
+            "id": record_id,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "data": data
+        }) + "\n"
+        with self._idle:
+            self._pending += 1
+        self._queue.put(line)
+        return record_id
+
+    def _run(self) -> None:
+        while True:
+            try:
+                lines = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                if self._closed:
+                    break
+                continue
+            while len(lines) < self.batch_size:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._append("".join(lines).encode("utf-8"))
+                self.records += len(lines)
+            except Exception as e:
+                self.errors += len(lines)
+                logger.error(f"Error writing {len(lines)} log records: {e}")
+
+            with self._idle:
+                self._pending -= len(lines)
+                if self._pending == 0:
+                    self._idle.notify_all()
+
+        self._close_segment()
+
+    def _append(self, payload: bytes) -> None:
+        """Append a batch under the cross-process lock, rotating first if needed."""
+        finished = []
+        self._lock()
+        try:
+            path = self.current_path()
+            if self._path != path or not self._is_current(path):
+                if self._path and self._path != path:
+                    # Time bucket changed: the previous segment is complete
+                    finished.append(self._claim(self._path, self._path))
+                self._open(path)
+
+            size = os.fstat(self._fd).st_size
+            if self.max_bytes and size and size + len(payload) > self.max_bytes:
+                finished.append(self._claim(path, self._numbered_path(path)))
+                self._open(path)
+
+            os.write(self._fd, payload)
+        finally:
+            self._unlock()
+
+        for claimed in finished:
+            if claimed:
+                self._compress(*claimed)
+
+    def _is_current(self, path: str) -> bool:
+        """Whether our descriptor still refers to the file at path (it may have been rotated)."""
+        try:
+            return os.path.samestat(os.fstat(self._fd), os.stat(path))
+        except (OSError, TypeError):
+            return False
+
+    def _open(self, path: str) -> None:
+        self._close_segment()
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._path = path
+
+    def _close_segment(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    @staticmethod
+    def _numbered_path(path: str) -> str:
+        """First free ``<base>.<n>.ndjson`` name for a segment rotated by size."""
+        base = path[:-len(".ndjson")]
+        index = 1
+        while any(os.path.exists(f"{base}.{index}.ndjson{suffix}")
+                  for suffix in ("", *_COMPRESSION_SUFFIXES.values())):
+            index += 1
+        return f"{base}.{index}.ndjson"
+
+    def _claim(self, path: str, final_path: str) -> Optional[Tuple[str, str]]:
+        """
+        Take ownership of a finished segment so exactly one process compresses it.
+
+        Returns:
+            (file to compress, name of the finished segment), or None if there
+            is nothing left to do
+        """
+        if final_path == path and not self.compression:
+            return None
+        # Renaming is atomic, so when several processes race only one wins
+        source = f"{path}.{os.getpid()}.closing" if self.compression else final_path
+        try:
+            os.rename(path, source)
+        except FileNotFoundError:
+            # Another process already rotated it
+            return None
+        if self.compression:
+            # Reserve the compressed name while still holding the lock
+            open(final_path + _COMPRESSION_SUFFIXES[self.compression], "ab").close()
+        return source, final_path
+
+    def _compress(self, source: str, final_path: str) -> None:
+        """Compress a claimed segment to its final name and remove the original."""
+        if not self.compression:
+            return
+        destination = final_path + _COMPRESSION_SUFFIXES[self.compression]
+        try:
+            if self.compression == "gzip":
+                import gzip
+                import shutil
+
+                with open(source, "rb") as src, gzip.open(destination, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+            else:
+                try:
+                    import zstandard
+                except ImportError:
+                    raise ImportError(
+                        "zstandard is not installed. Please install it with: "
+                        "pip install zstandard"
+                    )
+                with open(source, "rb") as src, open(destination, "wb") as dst:
+                    zstandard.ZstdCompressor().copy_stream(src, dst)
+            os.remove(source)
+        except Exception as e:
+            logger.error(f"Error compressing log segment {final_path}: {e}")
+            # Keep the records, uncompressed, under the segment's final name
+            if os.path.exists(destination):
+                os.remove(destination)
+            os.rename(source, final_path)
+
+    def _lock(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+
+    def _unlock(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued record is written. Returns False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Write what is queued, then stop the writer thread."""
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        self._thread.join(timeout=max(self.flush_interval * 2, 1.0))
+        os.close(self._lock_fd)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"records": self.records, "errors": self.errors,
+                "queued": self._queue.qsize(), "path": self._path}
+
+
+_writers: Dict[str, NDJSONLogWriter] = {}
+_writers_lock = threading.Lock()
+_writer_options: Dict[str, Any] = {}
+
+
+def configure_file_logger(**options: Any) -> None:
+    """
+    Set the options (see NDJSONLogWriter) used for log writers created afterwards.
+
+    Example:
+        configure_file_logger(max_bytes=16 * 1024 * 1024, compression="gzip")
+    """
+    _writer_options.update(options)
+
+
+def get_log_writer(log_dir: Optional[str] = None) -> NDJSONLogWriter:
+    """Return the shared writer for a log directory (defaults to 'logs' in the current directory)."""
+    log_dir = os.path.abspath(log_dir or os.path.join(os.getcwd(), "logs"))
+    writer = _writers.get(log_dir)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(log_dir)
+            if writer is None:
+                writer = _writers[log_dir] = NDJSONLogWriter(log_dir, **_writer_options)
+    return writer
+
+
+def close_log_writers() -> None:
+    """Flush and close every shared log writer."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(close_log_writers)
+
 
 def log_output(context: Dict[str, Any], log_dir: Optional[str] = None) -> Dict[str, Any]:
     """
-    Log the output to a file.
+    Append the output to the NDJSON run log.
 
     Args:
         context: The current context
         log_dir: Directory to save logs (defaults to 'logs' in current directory)
 
     Returns:
-        Dictionary with log status and path
+        Dictionary with log status, the segment the record goes to, and its ID
     """
     try:
-        # Create log directory if it doesn't exist
-        log_dir = log_dir or os.path.join(os.getcwd(), "logs")
-        os.makedirs(log_dir, exist_ok=True)
-
-        # Create a timestamp for the log file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = os.path.join(log_dir, f"log_{timestamp}.json")
-
-        # Extract relevant data from context
-        log_data = {
-            "timestamp": timestamp,
-            "data": context
-        }
-
-        # Write to file
-        with open(log_file, 'w') as f:
-            json.dump(log_data, f, indent=2, default=str)
+        writer = get_log_writer(log_dir)
+        record_id = writer.write(context)
 
-        logger.info(f"Logged output to {log_file}")
+        logger.debug(f"Queued log record {record_id}")
 
         return {
             "status": "success",
-            "log_file": log_file
+            "log_file": writer.current_path(),
+            "record_id": record_id
         }
 
     except Exception as e:
@@ -1,12 +1,17 @@
 import importlib
+from functools import lru_cache
 from typing import Any, Callable, Type
 
 
+@lru_cache(maxsize=512)
 def import_from_string(import_string: str) -> Any:
     """
     Import a dotted module path and return the attribute/class designated by the
     last name in the path.
 
+    Results are memoized per path; failed imports are not cached and raise
+    again on the next call.
+
     Example:
         import_from_string('module.submodule.MyClass')
     """
@@ -0,0 +1,73 @@
+import re
+import json
+from typing import Any
+
+# orjson is an optional, much faster backend; the stdlib json module is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses this, so one except clause covers both backends
+JSONDecodeError = json.JSONDecodeError
+
+# ```json ... ``` (or bare ```) fenced block, as models often wrap their JSON
+_FENCED_BLOCK = re.compile(r"```[ \t]*(?:json|JSON)?[ \t]*\n?(.*?)```", re.DOTALL)
+
+# Characters that can start a JSON object or array embedded in prose
+_JSON_START = re.compile(r"[\[{]")
+
+_decoder = json.JSONDecoder()
+
+
+def loads(text: Any) -> Any:
+    """Parse JSON text (str or bytes) with the fastest available backend."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize an object to a compact JSON string with the fastest available backend."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode("utf-8")
+    return json.dumps(obj, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+def extract_json(text: str) -> Any:
+    """
+    Parse the JSON value in a model response.
+
+    Tries, in order: the whole response, the first fenced code block, and the
+    first object or array embedded in surrounding prose.
+
+    Args:
+        text: Raw model response
+
+    Returns:
+        The parsed JSON value
+
+    Raises:
+        JSONDecodeError: If the response contains no valid JSON
+    """
+    try:
+        return loads(text)
+    except JSONDecodeError:
+        pass
+
+    match = _FENCED_BLOCK.search(text)
+    if match:
+        try:
+            return loads(match.group(1))
+        except JSONDecodeError:
+            pass
+
+    # Decode from each candidate start and ignore whatever trails the value
+    for start in _JSON_START.finditer(text):
+        try:
+            value, _ = _decoder.raw_decode(text, start.start())
+            return value
+        except JSONDecodeError:
+            continue
+
+    raise JSONDecodeError("No JSON value found in response", text, 0)
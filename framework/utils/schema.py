@@ -0,0 +1,58 @@
+from functools import lru_cache
+from typing import Any, Type
+from pydantic import BaseModel, ValidationError
+from .import_helper import import_from_string
+from ..core.errors import SchemaError
+
+# Pydantic error types that mean "not JSON at all" rather than "JSON of the wrong shape"
+_JSON_ERROR_TYPES = {"json_invalid", "value_error.jsondecode"}
+
+
+class CompiledSchema:
+    """A Pydantic output schema resolved once, with its validators bound up front.
+
+    On Pydantic v2, JSON text is parsed and validated in a single pass with
+    ``model_validate_json``; on v1 the equivalent ``parse_raw`` is used.
+    """
+
+    def __init__(self, schema_class: Type[BaseModel], schema_path: str = None):
+        if not (isinstance(schema_class, type) and issubclass(schema_class, BaseModel)):
+            raise SchemaError(
+                f"Schema {schema_path or schema_class} is not a Pydantic model")
+
+        self.schema_class = schema_class
+        self.schema_path = schema_path or f"{schema_class.__module__}.{schema_class.__name__}"
+        if hasattr(schema_class, "model_validate_json"):
+            self._validate = schema_class.model_validate
+            self._validate_json = schema_class.model_validate_json
+        else:
+            self._validate = schema_class.parse_obj
+            self._validate_json = schema_class.parse_raw
+
+    def validate(self, output: Any) -> BaseModel:
+        """Validate a Python object (e.g. a parsed dict) against the schema."""
+        # If output is already an instance of the schema class, return it
+        if isinstance(output, self.schema_class):
+            return output
+        return self._validate(output)
+
+    def validate_json(self, text: str) -> BaseModel:
+        """Parse and validate JSON text in one pass."""
+        return self._validate_json(text)
+
+    @staticmethod
+    def is_json_error(error: Exception) -> bool:
+        """Return True if a validation error was caused by malformed JSON."""
+        if not isinstance(error, ValidationError):
+            return False
+        return any(e.get("type") in _JSON_ERROR_TYPES for e in error.errors())
+
+
+@lru_cache(maxsize=256)
+def compile_schema(schema_path: str) -> CompiledSchema:
+    """Resolve a dotted schema path once and return its compiled validators."""
+    try:
+        schema_class = import_from_string(schema_path)
+    except ImportError:
+        raise SchemaError(f"Could not import schema: {schema_path}")
+    return CompiledSchema(schema_class, schema_path)
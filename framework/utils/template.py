@@ -1,7 +1,225 @@
 import os
-import jinja2
-from typing import Dict, Any
-from ..core.errors import PromptError
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Any, FrozenSet, NamedTuple, Optional, Tuple, Union
+from ..core.errors import ConfigError, PromptError
+
+if TYPE_CHECKING:
+    # Jinja2 is imported on first use, so pipelines without LLM nodes never load it
+    import jinja2
+
+# Default number of compiled templates kept in the shared cache
+DEFAULT_TEMPLATE_CACHE_SIZE = 256
+
+# Separates a template's static system section from its per-request section.
+# It is a Jinja comment, so templates using it still render as one prompt.
+DYNAMIC_MARKER = "{# --- dynamic --- #}"
+
+
+class CompiledTemplate(NamedTuple):
+    """A compiled template together with the variables it references."""
+    template: "jinja2.Template"
+    # Includes variables of included/extended/imported templates; None if a
+    # referenced template can't be resolved statically (callers must then
+    # assume the template may read anything)
+    variables: Optional[FrozenSet[str]]
+    mtime_ns: Optional[int] = None
+    size: Optional[int] = None
+    # (system, dynamic) templates for templates split by DYNAMIC_MARKER
+    sections: Optional[Tuple["jinja2.Template", "jinja2.Template"]] = None
+
+
+class PromptSections(NamedTuple):
+    """A rendered prompt split into its stable system prefix and per-request part."""
+    system: str
+    dynamic: str
+
+
+class TemplateCache:
+    """Bounded, thread-safe LRU cache of compiled Jinja2 templates.
+
+    File-backed entries are keyed by resolved path and revalidated with a
+    single ``os.stat`` per lookup; inline template strings are keyed by a hash
+    of their source.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_TEMPLATE_CACHE_SIZE):
+        self.maxsize = maxsize
+        # Set once a pipeline configures the size (settings.template_cache_size)
+        self._configured = False
+        self._entries: "OrderedDict[Any, CompiledTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Resolved locations of template references, so lookups skip os.path checks
+        self.locations: Dict[Tuple[str, str], Tuple[Optional[str], Optional[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_file(self, env: "jinja2.Environment", path: str, name: Optional[str] = None) -> CompiledTemplate:
+        """Return the compiled template for a file, recompiling it if it changed."""
+        stat = os.stat(path)
+        key = ("file", id(env), path, name)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        with open(path, 'r') as f:
+            source = f.read()
+        entry = _compile(env, source, name, path)._replace(
+            mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        self._store(key, entry)
+        return entry
+
+    def get_source(self, env: "jinja2.Environment", source: str) -> CompiledTemplate:
+        """Return the compiled template for an inline template string."""
+        key = ("source", id(env), hashlib.sha1(source.encode("utf-8")).digest())
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = _compile(env, source)
+        self._store(key, entry)
+        return entry
+
+    def remember_location(
+        self,
+        templates_dir: str,
+        template_path: str,
+        location: Tuple[Optional[str], Optional[str]]
+    ) -> None:
+        """Remember where a template reference resolved to."""
+        with self._lock:
+            if len(self.locations) >= self.maxsize * 4:
+                self.locations.clear()
+            self.locations[(templates_dir, template_path)] = location
+
+    def _store(self, key: Any, entry: CompiledTemplate) -> None:
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        """Change the maximum number of cached templates."""
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def configure(self, maxsize: int) -> None:
+        """
+        Set the size requested by a pipeline's settings.
+
+        The cache is shared by every pipeline in the process, so a size that
+        differs from one already configured raises ConfigError.
+        """
+        with self._lock:
+            if self._configured and maxsize != self.maxsize:
+                raise ConfigError(
+                    f"Conflicting template_cache_size: {maxsize} (already {self.maxsize})")
+            self._configured = True
+        self.resize(maxsize)
+
+    def clear(self) -> None:
+        """Remove all cached templates."""
+        with self._lock:
+            self._entries.clear()
+            self.locations.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _compile(
+    env: "jinja2.Environment",
+    source: str,
+    name: Optional[str] = None,
+    filename: Optional[str] = None
+) -> CompiledTemplate:
+    """Parse and compile a template once, collecting its undeclared variables."""
+    ast = env.parse(source, name, filename)
+    variables = _collect_variables(env, ast)
+    template = _from_ast(env, ast, name, filename)
+
+    sections = None
+    if DYNAMIC_MARKER in source:
+        system, dynamic = source.split(DYNAMIC_MARKER, 1)
+        sections = (
+            _from_ast(env, env.parse(system.rstrip(), name, filename), name, filename),
+            _from_ast(env, env.parse(dynamic.lstrip("\n"), name, filename), name, filename),
+        )
+    return CompiledTemplate(template=template, variables=variables, sections=sections)
+
+
+def _collect_variables(env: "jinja2.Environment", ast, seen: Optional[set] = None) -> Optional[FrozenSet[str]]:
+    """
+    Return the undeclared variables of a template and every template it
+    includes, extends or imports, or None if one of them is dynamic or missing.
+    """
+    from jinja2 import TemplateError, meta
+
+    seen = set() if seen is None else seen
+    variables = set(meta.find_undeclared_variables(ast))
+    for reference in meta.find_referenced_templates(ast):
+        if reference is None:
+            # e.g. {% include some_variable %}
+            return None
+        if reference in seen:
+            continue
+        seen.add(reference)
+        try:
+            source, filename, _ = env.loader.get_source(env, reference)
+            nested = _collect_variables(env, env.parse(source, reference, filename), seen)
+        except TemplateError:
+            return None
+        if nested is None:
+            return None
+        variables |= nested
+    return frozenset(variables)
+
+
+def _from_ast(env: "jinja2.Environment", ast, name: Optional[str], filename: Optional[str]) -> "jinja2.Template":
+    code = env.compile(ast, name, filename)
+    return env.template_class.from_code(env, code, env.make_globals(None))
+
+
+# Shared cache and environments used by every TemplateRenderer
+_template_cache = TemplateCache()
+_environments: Dict[str, "jinja2.Environment"] = {}
+_environments_lock = threading.Lock()
+
+
+def get_template_cache() -> TemplateCache:
+    """Return the process-wide compiled-template cache."""
+    return _template_cache
+
+
+def _get_environment(templates_dir: str) -> "jinja2.Environment":
+    """Return the shared Jinja2 environment for a templates directory."""
+    env = _environments.get(templates_dir)
+    if env is None:
+        with _environments_lock:
+            env = _environments.get(templates_dir)
+            if env is None:
+                import jinja2
+
+                env = jinja2.Environment(
+                    loader=jinja2.FileSystemLoader(templates_dir),
+                    autoescape=jinja2.select_autoescape(
+                        ['html', 'xml'], default_for_string=False)
+                )
+                _environments[templates_dir] = env
+    return env
 
 
 class TemplateRenderer:
@@ -10,10 +228,62 @@ class TemplateRenderer:
     def __init__(self, templates_dir: str = None):
         self.templates_dir = templates_dir or os.path.join(
             os.path.dirname(os.path.dirname(__file__)), "prompts")
-        self.env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(self.templates_dir),
-            autoescape=jinja2.select_autoescape(['html', 'xml'])
-        )
+        self.env = _get_environment(self.templates_dir)
+        self.cache = _template_cache
+
+    def compile(self, template_path: str) -> CompiledTemplate:
+        """
+        Compile a template (or fetch it from the shared cache).
+
+        Args:
+            template_path: Path to the template file, a path relative to
+                templates_dir, or a template string
+
+        Returns:
+            The compiled template and the variables it references
+        """
+        from jinja2 import TemplateError
+
+        try:
+            location = self.cache.locations.get((self.templates_dir, template_path))
+            if location is None:
+                location = self._locate(template_path)
+
+            path, name = location
+            if path is None:
+                return self.cache.get_source(self.env, template_path)
+
+            try:
+                return self.cache.get_file(self.env, path, name=name)
+            except FileNotFoundError:
+                # The file moved since it was located; resolve it again
+                self.cache.locations.pop((self.templates_dir, template_path), None)
+                path, name = self._locate(template_path)
+                if path is None:
+                    return self.cache.get_source(self.env, template_path)
+                return self.cache.get_file(self.env, path, name=name)
+        except TemplateError as e:
+            raise PromptError(f"Error compiling template {template_path}: {e}")
+        except Exception as e:
+            raise PromptError(f"Error loading template {template_path}: {e}")
+
+    def _locate(self, template_path: str) -> Tuple[Optional[str], Optional[str]]:
+        """Resolve a template reference to (file path, loader name) and remember it."""
+        # Check if template_path is a file path or a template string
+        if os.path.isfile(template_path):
+            location = (os.path.abspath(template_path), None)
+        elif os.path.isfile(os.path.join(self.templates_dir, template_path)):
+            location = (os.path.join(self.templates_dir, template_path), template_path)
+        else:
+            # Assume it's a template string
+            location = (None, None)
+
+        self.cache.remember_location(self.templates_dir, template_path, location)
+        return location
+
+    def variables(self, template_path: str) -> Optional[FrozenSet[str]]:
+        """Return the names of the variables a template references (None if unknown)."""
+        return self.compile(template_path).variables
 
     def render(self, template_path: str, context: Dict[str, Any]) -> str:
         """
@@ -26,20 +296,34 @@ class TemplateRenderer:
         Returns:
             Rendered template as a string
         """
+        from jinja2 import TemplateError
+
+        compiled = self.compile(template_path)
+        try:
+            return compiled.template.render(**context)
+        except TemplateError as e:
+            raise PromptError(f"Error rendering template {template_path}: {e}")
+        except Exception as e:
+            raise PromptError(f"Error loading template {template_path}: {e}")
+
+    def render_sections(self, template_path: str, context: Dict[str, Any]) -> Union[str, PromptSections]:
+        """
+        Render a template, keeping its system and dynamic sections apart.
+
+        Templates that contain DYNAMIC_MARKER render to PromptSections; the
+        text before the marker should not depend on per-request variables,
+        so it forms a stable prefix providers can cache. Other templates
+        render to a plain string, exactly like render().
+        """
+        from jinja2 import TemplateError
+
+        compiled = self.compile(template_path)
         try:
-            # Check if template_path is a file path or a template string
-            if os.path.exists(template_path):
-                with open(template_path, 'r') as f:
-                    template_str = f.read()
-                template = jinja2.Template(template_str)
-            elif os.path.exists(os.path.join(self.templates_dir, template_path)):
-                template = self.env.get_template(template_path)
-            else:
-                # Assume it's a template string
-                template = jinja2.Template(template_path)
-
-            return template.render(**context)
-        except jinja2.exceptions.TemplateError as e:
+            if compiled.sections is None:
+                return compiled.template.render(**context)
+            system, dynamic = compiled.sections
+            return PromptSections(system.render(**context), dynamic.render(**context))
+        except TemplateError as e:
             raise PromptError(f"Error rendering template {template_path}: {e}")
         except Exception as e:
             raise PromptError(f"Error loading template {template_path}: {e}")
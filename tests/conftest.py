@@ -0,0 +1,52 @@
+import copy
+
+import pytest
+
+from framework.core.config import ConfigLoader
+from framework.core.engine import PipelineEngine
+
+
+def pipeline_config(template_path: str, settings=None, **node_options):
+    """A one-node pipeline calling the fake model with the given template."""
+    node = {
+        "id": "writer",
+        "role": "Write about a topic",
+        "type": "llm",
+        "model": "fake",
+        "prompt_template": template_path,
+        "output": {"type": "raw"},
+    }
+    node.update(node_options)
+    return {
+        "name": "Test Pipeline",
+        "settings": {"fake_llm": {"payload": "text"}, **(settings or {})},
+        "inputs": [{"name": "topic", "type": "string", "required": True}],
+        "nodes": [node],
+    }
+
+
+@pytest.fixture
+def template_path(tmp_path):
+    path = tmp_path / "prompt.txt"
+    path.write_text("Write a short note about {{ topic }}.")
+    return str(path)
+
+
+@pytest.fixture
+def build_engine(template_path):
+    """Build (and compile) a fake-model engine; options are passed to pipeline_config."""
+    engines = []
+
+    def build(settings=None, **node_options) -> PipelineEngine:
+        config = pipeline_config(template_path, copy.deepcopy(settings), **node_options)
+        engine = PipelineEngine(ConfigLoader.load_config_dict(config))
+        engine.build_graph()
+        engines.append(engine)
+        return engine
+
+    yield build
+
+    for engine in engines:
+        close = getattr(engine.checkpointer, "close", None)
+        if close:
+            close()
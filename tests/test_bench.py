@@ -0,0 +1,22 @@
+import os
+
+from framework.bench.harness import run_benchmarks
+from framework.bench.pipelines import get_benchmark_pipelines
+
+
+def test_benchmark_configs_have_no_tool_nodes():
+    for config, _ in get_benchmark_pipelines(width=2, depth=2).values():
+        assert all(node["type"] == "llm" for node in config["nodes"])
+        ids = {node["id"] for node in config["nodes"]}
+        for node in config["nodes"]:
+            assert set(node.get("depends_on") or []) <= ids
+
+
+def test_bench_run_leaves_the_working_directory_unchanged(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    report = run_benchmarks(
+        pipelines=["joke", "wide"], requests=2, concurrency=2, warmup=0,
+        overhead_requests=1, width=2)
+    assert set(report["pipelines"]) == {"joke", "wide"}
+    assert all(result["errors"] == 0 for result in report["pipelines"].values())
+    assert os.listdir(str(tmp_path)) == []
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+
+import pytest
+
+from framework.core.cache import ResponseCache, get_response_cache
+from framework.core.errors import ConfigError
+
+
+def test_key_depends_on_output_mode():
+    text = ResponseCache.make_key("fake", 0.5, "prompt", "json", None, "text")
+    structured = ResponseCache.make_key("fake", 0.5, "prompt", "json", None, "structured")
+    assert text != structured
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path=path)
+    cache.set("k", "v")
+    cache.close()
+
+    reopened = ResponseCache(path=path)
+    assert reopened.get("k") == "v"
+    assert reopened.stats()["disk_hits"] == 1
+    # Promoted to the memory tier
+    assert reopened.get("k") == "v"
+    assert reopened.stats()["memory_hits"] == 1
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"))
+    cache.set("k", "v", ttl=-1)
+    assert cache.get("k") is None
+
+
+def test_async_disk_io_runs_off_the_event_loop(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"))
+    threads = []
+    for name in ("_get_disk", "_set_disk"):
+        method = getattr(cache, name)
+
+        def record(*args, _method=method):
+            threads.append(threading.get_ident())
+            return _method(*args)
+        setattr(cache, name, record)
+
+    async def main():
+        await cache.aset("k", "v")
+        cache._memory.clear()
+        return await cache.aget("k"), threading.get_ident()
+
+    value, loop_thread = asyncio.run(main())
+    assert value == "v"
+    assert len(threads) == 2
+    assert loop_thread not in threads
+
+
+def test_conflicting_options_are_rejected(tmp_path):
+    path = str(tmp_path / "shared.sqlite")
+    first = get_response_cache(path=path, max_entries=10)
+    assert get_response_cache(path=path, max_entries=10) is first
+    with pytest.raises(ConfigError):
+        get_response_cache(path=path, max_entries=20)
+    with pytest.raises(ConfigError):
+        get_response_cache(path=path, max_entries=10, default_ttl=60)
@@ -0,0 +1,34 @@
+import asyncio
+
+from framework.core.checkpoint_sqlite import BatchedSqliteSaver
+
+
+def test_arun_with_sqlite_checkpointer(build_engine, tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    engine = build_engine({"checkpointer": {"type": "sqlite", "path": path}})
+    assert isinstance(engine.checkpointer, BatchedSqliteSaver)
+
+    result = asyncio.run(engine.arun({"topic": "owls"}, thread_id="t1"))
+    assert result["writer"]
+
+    # The async run's checkpoint is visible through both APIs
+    config = {"configurable": {"thread_id": "t1"}}
+    assert engine.checkpointer.get_tuple(config) is not None
+    assert asyncio.run(engine.checkpointer.aget_tuple(config)) is not None
+
+
+def test_async_stream_and_batch_with_sqlite_checkpointer(build_engine, tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    engine = build_engine({"checkpointer": {"type": "sqlite", "path": path}})
+
+    async def main():
+        events = [event async for event in engine.astream({"topic": "owls"}, thread_id="s1")]
+        results = await engine.arun_batch([{"topic": "cats"}, {"topic": "dogs"}])
+        listed = [item async for item in engine.checkpointer.alist(
+            {"configurable": {"thread_id": "s1"}})]
+        return events, results, listed
+
+    events, results, listed = asyncio.run(main())
+    assert events[-1]["writer"]
+    assert all(result["writer"] for result in results)
+    assert listed
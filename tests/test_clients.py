@@ -0,0 +1,48 @@
+import pytest
+
+from framework.core.clients import ModelClientRegistry
+from framework.core.errors import ConfigError
+
+
+@pytest.fixture
+def registry():
+    registry = ModelClientRegistry()
+    yield registry
+    registry.close()
+
+
+def test_clients_are_reused(registry):
+    client = registry.get("fake", 0.2)
+    assert registry.get("fake", 0.2) is client
+    assert registry.get("fake", 0.7) is not client
+
+
+def test_pool_size_conflicts_are_rejected(registry):
+    registry.configure(pool_size=10)
+    registry.configure(pool_size=10)
+    with pytest.raises(ConfigError):
+        registry.configure(pool_size=50)
+    assert registry.pool_size == 10
+
+
+def test_existing_pools_keep_their_size(registry):
+    registry._get_http_clients("openai")
+    with pytest.raises(ConfigError):
+        registry.configure(pool_size=registry.pool_size + 1)
+    registry.configure(pool_size=registry.pool_size)
+
+
+def test_fake_model_options_are_per_pipeline(build_engine):
+    short = build_engine({"fake_llm": {"payload": "text", "words": 3}})
+    long = build_engine({"fake_llm": {"payload": "text", "words": 5}})
+    # Building the second pipeline doesn't change the first one's model
+    assert len(short.run({"topic": "owls"})["writer"].split()) == 3
+    assert len(long.run({"topic": "owls"})["writer"].split()) == 5
+
+
+def test_unknown_models_fall_back_to_a_mock_with_a_logged_warning(registry, caplog, capsys):
+    with caplog.at_level("WARNING", logger="framework.core.clients"):
+        client = registry.get("some-local-model")
+    assert client.invoke("hi").content == "This is a mock response from the LLM."
+    assert "Using mock LLM for model 'some-local-model'" in caplog.text
+    assert capsys.readouterr().out == ""
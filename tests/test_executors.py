@@ -0,0 +1,123 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from framework.core.errors import ConfigError, ToolError
+from framework.core.executors import ToolPool, ToolPoolRegistry
+from framework.core.node import ToolNode
+from tests import tools
+
+
+@pytest.fixture
+def thread_pool():
+    pool = ToolPool("thread", max_workers=2, max_pending=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_unknown_kind():
+    with pytest.raises(ConfigError):
+        ToolPool("fiber")
+
+
+def test_thread_pool_runs_sync_and_async_tools(thread_pool):
+    assert thread_pool.run("tests.tools.echo", tools.echo, {"value": 1})["value"] == 1
+    assert thread_pool.run("tests.tools.async_echo", tools.async_echo, {"value": 2}) == {"value": 2}
+    assert asyncio.run(thread_pool.arun("tests.tools.echo", tools.echo, {"value": 3}))["value"] == 3
+
+
+def test_inline_async_tool_runs_from_sync_path_inside_a_loop():
+    node = ToolNode("echo", "Echo", "tests.tools.async_echo")
+    assert node.process({"value": 1}) == {"echo": {"value": 1}}
+
+    async def main():
+        # A sync caller on a thread that already runs an event loop
+        return node.process({"value": 2})
+
+    assert asyncio.run(main()) == {"echo": {"value": 2}}
+
+
+def test_back_pressure_times_out():
+    pool = ToolPool("thread", max_workers=1, max_pending=1, queue_timeout=0.05)
+    try:
+        blocker = threading.Thread(
+            target=pool.run, args=("tests.tools.sleep", tools.sleep, {"seconds": 0.3}))
+        blocker.start()
+        time.sleep(0.05)
+        with pytest.raises(ToolError):
+            pool.run("tests.tools.echo", tools.echo, {})
+        blocker.join()
+        assert pool.stats()["rejected"] == 1
+        # The slot is free again once the running call finishes
+        assert pool.run("tests.tools.echo", tools.echo, {"value": 1})["value"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_cancelled_async_waiter_does_not_leak_a_slot(thread_pool):
+    async def main():
+        # Fill both slots, then cancel a caller waiting for one
+        running = [asyncio.ensure_future(
+            thread_pool.arun("tests.tools.sleep", tools.sleep, {"seconds": 0.2})) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        waiting = asyncio.ensure_future(thread_pool.arun("tests.tools.echo", tools.echo, {}))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        await asyncio.gather(*running)
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    stats = thread_pool.stats()
+    assert stats["in_flight"] == 0
+    # Every slot can be taken again
+    assert all(thread_pool._slots.acquire(blocking=False) for _ in range(thread_pool.max_pending))
+
+
+def test_process_pool_runs_in_worker_processes():
+    import os
+
+    pool = ToolPool("process", max_workers=2)
+    try:
+        pool.prewarm(["tests.tools.echo"])
+        result = pool.run("tests.tools.echo", tools.echo, {"value": "x"})
+        assert result["value"] == "x"
+        assert result["pid"] != os.getpid()
+        assert asyncio.run(pool.arun("tests.tools.echo", tools.echo, {"value": "y"}))["value"] == "y"
+    finally:
+        pool.shutdown()
+
+
+def test_process_pool_rejects_unpicklable_context():
+    pool = ToolPool("process", max_workers=1)
+    try:
+        with pytest.raises(ToolError):
+            pool.run("tests.tools.echo", tools.echo, {"value": lambda: None})
+        # The slot taken by the failed call was returned
+        assert pool.stats()["in_flight"] == 0
+        assert pool.run("tests.tools.echo", tools.echo, {"value": 1})["value"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_registry_rejects_conflicting_options():
+    registry = ToolPoolRegistry()
+    try:
+        registry.configure({"thread": {"max_workers": 2}})
+        # The same options again (another pipeline with the same settings) are fine
+        registry.configure({"thread": {"max_workers": 2}})
+        with pytest.raises(ConfigError):
+            registry.configure({"thread": {"max_workers": 4}})
+        assert registry.get("thread").max_workers == 2
+
+        # A pool already created with defaults can't be resized either
+        registry.get("process")
+        with pytest.raises(ConfigError):
+            registry.configure({"process": {"max_workers": 1}})
+        with pytest.raises(ConfigError):
+            registry.configure({"fiber": {}})
+    finally:
+        registry.shutdown()
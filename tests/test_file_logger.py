@@ -0,0 +1,107 @@
+import os
+import gzip
+import glob
+import multiprocessing
+
+import pytest
+
+from framework.tools.file_logger import NDJSONLogWriter
+from framework.utils.json_utils import loads
+
+
+class ClockedWriter(NDJSONLogWriter):
+    """Writer whose segment clock the test controls."""
+
+    now = 0.0
+
+    def current_path(self, now=None):
+        return super().current_path(self.now if now is None else now)
+
+
+def _read(path):
+    if path.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            text = f.read()
+    elif path.endswith(".zst"):
+        import zstandard
+
+        with open(path, "rb") as f:
+            text = zstandard.ZstdDecompressor().stream_reader(f).read().decode("utf-8")
+    else:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+    return [loads(line) for line in text.splitlines()]
+
+
+def _records(log_dir):
+    segments = sorted(glob.glob(os.path.join(log_dir, "*.ndjson*")))
+    return segments, [record for path in segments for record in _read(path)]
+
+
+def test_appends_records_in_order(tmp_path):
+    writer = NDJSONLogWriter(str(tmp_path), rotate_interval=None)
+    ids = [writer.write({"n": n}) for n in range(50)]
+    writer.close()
+    segments, records = _records(str(tmp_path))
+    assert segments == [os.path.join(str(tmp_path), "log.ndjson")]
+    assert [record["id"] for record in records] == ids
+    assert [record["data"]["n"] for record in records] == list(range(50))
+
+
+def test_rotates_by_size(tmp_path):
+    writer = NDJSONLogWriter(str(tmp_path), rotate_interval=None, max_bytes=400, batch_size=1)
+    for n in range(20):
+        writer.write({"n": n})
+    writer.close()
+    segments, records = _records(str(tmp_path))
+    assert len(segments) > 1
+    assert all(os.path.getsize(path) <= 400 for path in segments)
+    assert sorted(record["data"]["n"] for record in records) == list(range(20))
+
+
+def test_rotates_by_time_bucket(tmp_path):
+    writer = ClockedWriter(str(tmp_path), rotate_interval=60)
+    writer.write({"n": 0})
+    writer.flush()
+    writer.now = 61.0
+    writer.write({"n": 1})
+    writer.close()
+    assert sorted(os.listdir(str(tmp_path))) == [
+        ".log.lock", "log-19700101_000000.ndjson", "log-19700101_000100.ndjson"]
+
+
+@pytest.mark.parametrize("compression, suffix", [("gzip", ".gz"), ("zstd", ".zst")])
+def test_compresses_finished_segments(tmp_path, compression, suffix):
+    writer = ClockedWriter(str(tmp_path), rotate_interval=60, compression=compression)
+    writer.write({"n": 0})
+    writer.flush()
+    writer.now = 61.0
+    writer.write({"n": 1})
+    writer.close()
+    finished = os.path.join(str(tmp_path), "log-19700101_000000.ndjson" + suffix)
+    assert [record["data"] for record in _read(finished)] == [{"n": 0}]
+    assert not glob.glob(os.path.join(str(tmp_path), "*.closing"))
+
+
+def _write_records(log_dir, worker, count):
+    writer = NDJSONLogWriter(log_dir, rotate_interval=None, max_bytes=300, batch_size=1)
+    for n in range(count):
+        writer.write({"worker": worker, "n": n})
+    writer.close()
+
+
+def test_processes_share_a_log_directory(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_write_records, args=(str(tmp_path), worker, 300))
+                 for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    # Every record arrives exactly once and whole, despite concurrent rotations
+    segments, records = _records(str(tmp_path))
+    assert len(segments) > 1
+    assert sorted((r["data"]["worker"], r["data"]["n"]) for r in records) == [
+        (worker, n) for worker in range(4) for n in range(300)]
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from framework.core.cache import ResponseCache
+from framework.core.errors import NodeError
+from framework.core.node import LLMNode
+
+
+def _node(template_path, response, **options):
+    return LLMNode(
+        id="writer", role="Write", model="fake", prompt_template=template_path,
+        client_options={"responses": [response]}, single_flight=None, **options)
+
+
+def _both(node, context, **kwargs):
+    """Run a node through process() and aprocess()."""
+    return node.process(context, **kwargs), asyncio.run(node.aprocess(context, **kwargs))
+
+
+@pytest.mark.parametrize("options, expected", [
+    ({"output_type": "raw"}, '{"title": "Owls"}'),
+    ({"output_type": "json"}, {"title": "Owls"}),
+    ({"output_type": "json", "output_mode": "structured"}, {"title": "Owls"}),
+])
+def test_sync_and_async_agree(template_path, options, expected):
+    node = _node(template_path, '{"title": "Owls"}', **options)
+    assert _both(node, {"topic": "owls"}) == ({"writer": expected}, {"writer": expected})
+
+
+def test_cached_responses_are_streamed_and_parsed(template_path):
+    node = _node(template_path, '{"title": "Owls"}', output_type="json", cache=ResponseCache())
+    node.process({"topic": "owls"})
+    # Served from the cache from now on, whatever the model would answer
+    node.client_options = {"responses": ["not json"]}
+    for method in ("sync", "async"):
+        events = []
+        if method == "sync":
+            result = node.process({"topic": "owls"}, stream_writer=events.append)
+        else:
+            result = asyncio.run(node.aprocess({"topic": "owls"}, stream_writer=events.append))
+        assert result == {"writer": {"title": "Owls"}}
+        assert "".join(e["token"] for e in events if e["type"] == "token") == '{"title": "Owls"}'
+
+
+def test_failures_are_reported_as_node_errors(template_path):
+    node = _node(template_path, "not json", output_type="json")
+    with pytest.raises(NodeError, match="Error in LLM node writer"):
+        node.process({"topic": "owls"})
+    with pytest.raises(NodeError, match="Error in LLM node writer"):
+        asyncio.run(node.aprocess({"topic": "owls"}))
@@ -0,0 +1,157 @@
+import urllib.request
+
+import pytest
+
+from framework.core.metrics import (
+    MetricsRegistry, MetricsSink, NodeMetrics, PipelineMetrics, get_metrics, start_metrics_server)
+
+
+def test_metrics_server_binds_to_localhost_by_default():
+    registry = MetricsRegistry()
+    registry.counter("test_requests_total", "Requests", ["status"]).inc(status="ok")
+    server = start_metrics_server(port=0, registry=registry)
+    try:
+        host, port = server.server_address[:2]
+        assert host == "127.0.0.1"
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            body = response.read().decode("utf-8")
+        assert 'test_requests_total{status="ok"} 1' in body
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_counters_render_in_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("test_requests_total", "Requests", ["status", "path"])
+    requests.inc(status="ok", path="/a")
+    requests.inc(2, status="ok", path="/a")
+    requests.inc(status="error", path='say "hi"\n')
+
+    assert requests.value(status="ok", path="/a") == 3
+    assert registry.render_prometheus() == (
+        "# HELP test_requests_total Requests\n"
+        "# TYPE test_requests_total counter\n"
+        'test_requests_total{status="error",path="say \\"hi\\"\\n"} 1\n'
+        'test_requests_total{status="ok",path="/a"} 3\n'
+    )
+
+
+def test_histograms_expose_cumulative_buckets_sum_and_count():
+    registry = MetricsRegistry()
+    latency = registry.histogram("test_seconds", "Latency", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, route="x")
+
+    lines = registry.render_prometheus().splitlines()
+    assert lines[1] == "# TYPE test_seconds histogram"
+    assert lines[2:] == [
+        'test_seconds_bucket{route="x",le="0.1"} 2',
+        'test_seconds_bucket{route="x",le="1.0"} 3',
+        'test_seconds_bucket{route="x",le="+Inf"} 4',
+        'test_seconds_sum{route="x"} 3.65',
+        'test_seconds_count{route="x"} 4',
+    ]
+    assert registry.snapshot()["test_seconds"] == [
+        {"labels": {"route": "x"}, "sum": 3.65, "count": 4}]
+
+
+def test_metric_names_keep_their_kind():
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Total")
+    assert registry.counter("test_total", "Total") is counter
+    with pytest.raises(ValueError):
+        registry.histogram("test_total", "Total")
+
+
+def test_sinks_receive_every_observation():
+    class Collect(MetricsSink):
+        def __init__(self):
+            self.samples = []
+            self.closed = False
+
+        def record(self, sample):
+            self.samples.append(sample)
+
+        def close(self):
+            self.closed = True
+
+    registry = MetricsRegistry()
+    sink = Collect()
+    registry.add_sink(sink)
+    registry.counter("test_total", "Total", ["kind"]).inc(kind="a")
+    registry.histogram("test_seconds", "Latency").observe(0.2)
+    registry.remove_sink(sink)
+    registry.counter("test_total", "Total", ["kind"]).inc(kind="b")
+
+    assert [(s.kind, s.name, s.labels, s.value) for s in sink.samples] == [
+        ("counter", "test_total", {"kind": "a"}, 1),
+        ("histogram", "test_seconds", {}, 0.2),
+    ]
+    assert sink.closed
+
+
+def test_node_metrics_record_stages_cache_retries_and_tokens():
+    registry = MetricsRegistry()
+    metrics = NodeMetrics(registry, "notes", "writer", "gpt-test")
+    metrics.stage("model", 0.3)
+    metrics.duration(0.4)
+    metrics.cache(hit=False)
+    metrics.cache(hit=True, layer="semantic")
+    metrics.retry(1, TimeoutError())
+    metrics.coalesced()
+    metrics.tokens({"input_tokens": 12, "output_tokens": 5,
+                    "input_token_details": {"cache_read": 8}})
+    try:
+        try:
+            raise KeyError("topic")
+        except KeyError as e:
+            raise RuntimeError("node failed") from e
+    except RuntimeError as e:
+        metrics.error(e)
+
+    node = {"pipeline": "notes", "node": "writer"}
+    snapshot = registry.snapshot()
+    assert snapshot["framework_node_stage_seconds"] == [
+        {"labels": {**node, "stage": "model"}, "sum": 0.3, "count": 1}]
+    assert snapshot["framework_node_duration_seconds"][0]["sum"] == 0.4
+    assert registry.counter("framework_llm_cache_requests_total", "").snapshot() == [
+        {"labels": {**node, "result": "miss"}, "value": 1},
+        {"labels": {**node, "result": "semantic_hit"}, "value": 1},
+    ]
+    assert snapshot["framework_llm_retries_total"][0]["value"] == 1
+    assert snapshot["framework_llm_coalesced_calls_total"][0]["value"] == 1
+    tokens = {entry["labels"]["kind"]: entry["value"]
+              for entry in snapshot["framework_llm_tokens_total"]}
+    assert tokens == {"input": 12, "output": 5, "cache_read": 8}
+    # Errors are labelled with the underlying cause, not the wrapper
+    assert snapshot["framework_node_errors_total"] == [
+        {"labels": {**node, "error": "KeyError"}, "value": 1}]
+
+
+def test_pipeline_metrics_record_runs_by_outcome():
+    registry = MetricsRegistry()
+    metrics = PipelineMetrics(registry, "notes")
+    metrics.run("run", 0.5)
+    metrics.run("arun", 0.25, ok=False)
+
+    snapshot = registry.snapshot()
+    assert snapshot["framework_pipeline_runs_total"] == [
+        {"labels": {"pipeline": "notes", "method": "arun", "status": "error"}, "value": 1},
+        {"labels": {"pipeline": "notes", "method": "run", "status": "ok"}, "value": 1},
+    ]
+    assert [entry["sum"] for entry in snapshot["framework_pipeline_duration_seconds"]] == [0.25, 0.5]
+
+
+def test_engine_records_metrics_only_when_enabled(build_engine):
+    registry = get_metrics()
+    registry.reset()
+    build_engine().run({"topic": "owls"})
+    assert not any(registry.snapshot().values())
+
+    build_engine({"metrics": True}).run({"topic": "owls"})
+    snapshot = registry.snapshot()
+    assert snapshot["framework_pipeline_runs_total"] == [
+        {"labels": {"pipeline": "Test Pipeline", "method": "run", "status": "ok"}, "value": 1}]
+    assert snapshot["framework_node_duration_seconds"][0]["count"] == 1
+    registry.reset()
@@ -0,0 +1,190 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from framework.core.errors import ConfigError, NodeError
+from framework.core.ratelimit import AIMDController, RateLimiter, RateLimiterRegistry
+
+
+class RateLimitError(Exception):
+    """Stand-in for a provider's 429 error."""
+
+    def __init__(self, retry_after):
+        super().__init__("rate limited")
+        self.response = type("Response", (), {"headers": {"retry-after": str(retry_after)}})()
+
+
+def test_concurrency_limit_admits_in_arrival_order():
+    limiter = RateLimiter("test", max_concurrency=1)
+    order = []
+
+    async def call(index):
+        await limiter.aacquire()
+        order.append(index)
+        await asyncio.sleep(0.01)
+        limiter.release(0, 0.01)
+
+    async def main():
+        tasks = []
+        for index in range(5):
+            tasks.append(asyncio.ensure_future(call(index)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order == [0, 1, 2, 3, 4]
+    assert limiter.stats()["admitted"] == 5
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_request_bucket_spaces_calls():
+    # 600 rpm with a burst of one: one call every 0.1s
+    limiter = RateLimiter("test", rpm=600, burst=1)
+    assert limiter.acquire() < 0.05
+    limiter.release(0, 0)
+    assert limiter.acquire() >= 0.08
+    limiter.release(0, 0)
+
+
+def test_large_call_is_not_overtaken_by_small_ones():
+    # 6000 tpm refills 100 tokens per second
+    limiter = RateLimiter("test", tpm=6000)
+    limiter.acquire(6000)
+    limiter.release(6000, 0)
+    order = []
+
+    async def call(name, tokens):
+        await limiter.aacquire(tokens)
+        order.append(name)
+        limiter.release(tokens, 0)
+
+    async def main():
+        large = asyncio.ensure_future(call("large", 30))
+        await asyncio.sleep(0)
+        small = asyncio.ensure_future(call("small", 1))
+        await asyncio.gather(large, small)
+
+    asyncio.run(main())
+    assert order == ["large", "small"]
+
+
+def test_reported_usage_settles_the_reservation():
+    # 600 tpm refills 10 tokens per second
+    limiter = RateLimiter("test", tpm=600)
+    limiter.acquire(100)
+    limiter.release(100, 0, used=700)
+    # The bucket is 100 tokens in debt, so the next call waits for 101
+    assert limiter.tokens.wait_time(1, time.monotonic()) == pytest.approx(10.1, abs=0.1)
+
+
+def test_wait_past_max_wait_fails_and_frees_the_place():
+    limiter = RateLimiter("test", max_concurrency=1, max_wait=0.05)
+    limiter.acquire()
+    with pytest.raises(NodeError):
+        limiter.acquire()
+    assert limiter.stats()["timeouts"] == 1
+    assert limiter.stats()["queued"] == 0
+    limiter.release(0, 0)
+    assert limiter.acquire() < 0.05
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    limiter = RateLimiter("test", max_concurrency=1)
+    limiter.acquire()
+
+    async def main():
+        waiter = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0.01)
+        assert limiter.stats()["queued"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(main())
+    assert limiter.stats()["queued"] == 0
+    limiter.release(0, 0)
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_sync_and_async_callers_share_the_limit():
+    limiter = RateLimiter("test", max_concurrency=1)
+    limiter.acquire()
+    admitted = []
+
+    async def main():
+        await limiter.aacquire()
+        admitted.append("async")
+        limiter.release(0, 0)
+
+    thread = threading.Thread(target=asyncio.run, args=(main(),))
+    thread.start()
+    time.sleep(0.05)
+    assert admitted == []
+    limiter.release(0, 0)
+    thread.join(1)
+    assert admitted == ["async"]
+
+
+def test_rate_limit_response_holds_new_calls_for_retry_after():
+    limiter = RateLimiter("test")
+    limiter.acquire()
+    limiter.release(0, 0, error=RateLimitError(retry_after=0.2))
+    assert limiter.stats()["rate_limited"] == 1
+    assert limiter.acquire() >= 0.15
+    limiter.release(0, 0)
+
+
+def test_aimd_increases_additively_and_decreases_multiplicatively():
+    controller = AIMDController(initial=4, max_limit=8, cooldown=1.0)
+    # Each success adds 1/limit: about one per limit's worth of calls
+    for _ in range(5):
+        controller.on_success(0.1, now=0)
+    assert controller.limit == 5
+
+    controller.on_overload(now=10)
+    assert controller.limit == 2
+    # A burst of errors within the cooldown only counts once
+    controller.on_overload(now=10.5)
+    assert controller.limit == 2
+    controller.on_overload(now=12)
+    assert controller.limit == 1
+
+
+def test_aimd_backs_off_when_latency_rises():
+    controller = AIMDController(initial=10, max_limit=10, min_samples=5)
+    for _ in range(20):
+        controller.on_success(0.1, now=0)
+    assert controller.limit == 10
+    for _ in range(5):
+        controller.on_success(1.0, now=5)
+    assert controller.limit == 5
+
+
+def test_adaptive_limiter_lowers_concurrency_on_rate_limits():
+    limiter = RateLimiter("test", adaptive=True, initial_concurrency=8)
+    limiter.acquire()
+    limiter.release(0, 0, error=RateLimitError(retry_after=0))
+    assert limiter.limit == 4
+
+
+def test_registry_resolves_model_then_provider_then_default():
+    registry = RateLimiterRegistry()
+    registry.configure({"gpt-4o": {"rpm": 100}, "openai": {"rpm": 200}, "default": {"rpm": 300}})
+    assert registry.get("gpt-4o").name == "gpt-4o"
+    assert registry.get("gpt-4o-mini").name == "openai"
+    assert registry.get("claude-3-haiku").name == "default"
+    assert registry.get("gpt-4o") is registry.get("gpt-4o")
+    assert RateLimiterRegistry().get("gpt-4o") is None
+
+
+def test_registry_rejects_conflicting_limits():
+    registry = RateLimiterRegistry()
+    registry.configure({"openai": {"rpm": 100}})
+    registry.configure({"openai": {"rpm": 100}})
+    with pytest.raises(ConfigError):
+        registry.configure({"openai": {"rpm": 500}})
+    assert registry.get("gpt-4o").requests.rate == pytest.approx(100 / 60)
+    with pytest.raises(ConfigError):
+        registry.configure({"anthropic": 10})
@@ -0,0 +1,79 @@
+import time
+import threading
+import contextvars
+
+import pytest
+from langchain_core.callbacks import BaseCallbackHandler
+
+from framework.core.retry import RetryPolicy
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class _ChatModelCounter(BaseCallbackHandler):
+    def __init__(self):
+        self.starts = 0
+
+    def on_chat_model_start(self, *args, **kwargs):
+        self.starts += 1
+
+
+def test_supervised_attempt_sees_caller_context():
+    request_id.set("r1")
+    policy = RetryPolicy(timeout=5)
+    assert policy.call(request_id.get) == "r1"
+
+
+def test_hedged_attempts_see_caller_context():
+    request_id.set("r2")
+    policy = RetryPolicy(hedge_after=0.01)
+
+    def slow():
+        time.sleep(0.05)
+        return request_id.get()
+
+    assert policy.call(slow) == "r2"
+
+
+@pytest.mark.parametrize("retry", [{}, {"timeout": 5}])
+def test_callbacks_reach_model_with_timeout(build_engine, retry):
+    engine = build_engine({"retry": retry, "cache_enabled": False})
+    counter = _ChatModelCounter()
+    engine.run({"topic": "owls"}, callbacks=[counter])
+    assert counter.starts == 1
+
+
+def test_supervised_attempts_are_not_capped_by_a_pool():
+    policy = RetryPolicy(timeout=0.5)
+    errors = []
+
+    def call():
+        try:
+            policy.call(lambda: time.sleep(0.3))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(64)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # All 64 attempts ran at once; none waited for a worker or timed out
+    assert not errors
+    assert time.monotonic() - started < 1.0
+
+
+def test_timeout_raises_and_retries():
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.5)
+        return "ok"
+
+    policy = RetryPolicy(timeout=0.1, max_retries=1, backoff_base=0)
+    assert policy.call(call) == "ok"
+    assert len(calls) == 2
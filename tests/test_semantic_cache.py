@@ -0,0 +1,117 @@
+import time
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from framework.core.errors import ConfigError
+from framework.core.semantic_cache import (
+    INITIAL_CAPACITY, HashingEmbedder, SemanticCache, SemanticIndex, get_semantic_cache
+)
+
+
+def _vector(dim, index):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[index] = 1.0
+    return vector
+
+
+def test_index_grows_on_demand_and_evicts_least_recently_used():
+    index = SemanticIndex(dim=8, max_entries=INITIAL_CAPACITY + 10)
+    assert index.capacity == 0
+    index.add(_vector(8, 0), 1, "first")
+    assert index.capacity == INITIAL_CAPACITY
+
+    for i in range(1, INITIAL_CAPACITY + 10):
+        index.add(_vector(8, i % 8), 1, f"value-{i}")
+    assert index.capacity == index.max_entries == index.size
+
+    # "first" was used again, so the next insertion evicts the oldest other entry
+    assert index.search(_vector(8, 0), 1, 0.99) == ("first", 1.0)
+    index.add(_vector(8, 1), 2, "new")
+    assert "first" in index.values and "value-1" not in index.values
+    assert index.search(_vector(8, 1), 2, 0.99) == ("new", 1.0)
+
+
+def test_lookups_are_limited_to_the_namespace():
+    cache = SemanticCache()
+    vector = cache.embed("name: owls")
+    cache.set(vector, 1, "about owls")
+    assert cache.get(cache.embed("name: Owls"), 1) == "about owls"
+    assert cache.get(vector, 2) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_saves_and_loads_the_most_recently_used_entries(tmp_path):
+    path = str(tmp_path / "semantic.npz")
+    cache = SemanticCache(path=path)
+    topics = ["owls", "oak trees", "rivers", "foxes", "dogs"]
+    for topic in topics:
+        cache.set(cache.embed(f"name: {topic}"), 1, f"about {topic}")
+    # Using the oldest entry makes it the most recently used one
+    assert cache.get(cache.embed("name: owls"), 1) == "about owls"
+    cache.save()
+
+    loaded = SemanticCache(path=path, max_entries=3)
+    assert loaded.stats()["entries"] == 3
+    assert sorted(loaded.index.values[:loaded.index.size]) == [
+        "about dogs", "about foxes", "about owls"]
+    assert loaded.get(loaded.embed("name: owls"), 1) == "about owls"
+    assert loaded.get(loaded.embed("name: rivers"), 1) is None
+
+
+def test_periodic_save_runs_in_the_background(tmp_path, monkeypatch):
+    path = str(tmp_path / "semantic.npz")
+    cache = SemanticCache(path=path, save_every=2)
+    release = threading.Event()
+    write = SemanticIndex.write
+
+    def slow_write(path, snapshot, signature):
+        release.wait(5)
+        write(path, snapshot, signature)
+
+    monkeypatch.setattr(SemanticIndex, "write", staticmethod(slow_write))
+
+    started = time.monotonic()
+    cache.set(cache.embed("name: owls"), 1, "about owls")
+    cache.set(cache.embed("name: oak trees"), 1, "about oak trees")
+    # Neither the insert that triggered the save nor lookups wait for the disk
+    cache.set(cache.embed("name: rivers"), 1, "about rivers")
+    assert cache.get(cache.embed("name: owls"), 1) == "about owls"
+    assert time.monotonic() - started < 1
+
+    release.set()
+    cache.save()
+    loaded = SemanticCache(path=path)
+    assert loaded.stats()["entries"] == 3
+
+
+def test_shared_cache_rejects_conflicting_options(tmp_path):
+    path = str(tmp_path / "shared.npz")
+    cache = get_semantic_cache(path=path, threshold=0.9)
+    assert get_semantic_cache(path=path, threshold=0.9) is cache
+    with pytest.raises(ConfigError):
+        get_semantic_cache(path=path, threshold=0.8)
+    with pytest.raises(ConfigError):
+        get_semantic_cache(path=path, max_entries=10)
+    with pytest.raises(ConfigError):
+        get_semantic_cache(path=path, embedder=HashingEmbedder(dim=64))
+
+
+def test_async_lookup_runs_off_the_event_loop(template_path):
+    from framework.core.node import LLMNode
+
+    node = LLMNode(
+        id="writer", role="Write", model="fake", prompt_template=template_path,
+        client_options={"responses": ["about owls"]}, semantic_cache=SemanticCache())
+    lookup = node._semantic_lookup
+    threads = []
+
+    def record(*args):
+        threads.append(threading.current_thread())
+        return lookup(*args)
+
+    node._semantic_lookup = record
+    assert asyncio.run(node.aprocess({"topic": "owls"})) == {"writer": "about owls"}
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,174 @@
+import asyncio
+
+import httpx
+import pytest
+
+from framework.server.app import PipelineServer
+from framework.utils.json_utils import loads
+
+
+def _client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def _events(body):
+    """Parse a Server-Sent Events body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def server(build_engine):
+    def create(latency=0.0, **options):
+        engine = build_engine({"fake_llm": {"payload": "text", "words": 4, "latency": latency}})
+        return PipelineServer({"notes": engine}, **options)
+    return create
+
+
+def test_health_and_pipelines(server):
+    async def main():
+        async with _client(server()) as client:
+            health = await client.get("/health")
+            pipelines = await client.get("/pipelines")
+            return health, pipelines
+
+    health, pipelines = asyncio.run(main())
+    assert health.status_code == 200 and health.json()["status"] == "ok"
+    assert [p["name"] for p in pipelines.json()["pipelines"]] == ["notes"]
+
+
+def test_run_and_batch(server):
+    async def main():
+        async with _client(server()) as client:
+            run = await client.post("/pipelines/notes/run", json={"inputs": {"topic": "owls"}})
+            named = await client.post(
+                "/pipelines/notes/run", json={"inputs": {"topic": "owls"}, "thread_id": "t-1"})
+            batch = await client.post(
+                "/pipelines/notes/batch", json={"inputs": [{"topic": "owls"}, {"topic": "rivers"}]})
+            return run, named, batch
+
+    run, named, batch = asyncio.run(main())
+    assert run.status_code == 200
+    assert len(run.json()["result"]["writer"].split()) == 4
+    # Requests without a thread_id never share checkpointed state
+    assert run.json()["thread_id"].startswith("http-")
+    assert named.json()["thread_id"] == "t-1"
+    results = batch.json()["results"]
+    assert len(results) == 2 and all(len(r["result"]["writer"].split()) == 4 for r in results)
+
+
+@pytest.mark.parametrize("mode, kinds", [
+    ("tokens", ["token", "token", "token", "token", "node", "end"]),
+    ("updates", ["node", "end"]),
+])
+def test_stream_modes(server, mode, kinds):
+    async def main():
+        async with _client(server()) as client:
+            return await client.post(
+                "/pipelines/notes/stream", json={"inputs": {"topic": "owls"}, "mode": mode})
+
+    response = asyncio.run(main())
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/event-stream"
+    events = _events(response.text)
+    assert [event for event, _ in events] == kinds
+    output = events[-2][1]["output"]["writer"]
+    if mode == "tokens":
+        assert "".join(data["token"] for event, data in events if event == "token") == output
+    assert events[-1][1] == {"thread_id": response.headers["x-thread-id"]}
+
+
+@pytest.mark.parametrize("method, path, body, status", [
+    ("POST", "/pipelines/missing/run", {}, 404),
+    ("GET", "/pipelines/notes/run", None, 405),
+    ("POST", "/pipelines/notes/run", b"{bad", 400),
+    ("POST", "/pipelines/notes/run", {"inputs": ["owls"]}, 400),
+    ("POST", "/pipelines/notes/run", {"inputs": {"topic": "owls"}, "thread_id": ["t"]}, 400),
+    ("POST", "/pipelines/notes/stream", {"inputs": {"topic": "owls"}, "mode": "nope"}, 400),
+    ("POST", "/pipelines/notes/stream", {"inputs": {"topic": "owls"}, "mode": ["tokens"]}, 400),
+    ("POST", "/pipelines/notes/batch", {"inputs": {"topic": "owls"}}, 400),
+    ("POST", "/pipelines/notes/batch", {"inputs": [{"topic": "owls"}] * 3}, 413),
+    ("POST", "/pipelines/notes/batch", {"inputs": [{"topic": "owls"}], "max_concurrency": "abc"}, 400),
+    ("POST", "/pipelines/notes/batch", {"inputs": [{"topic": "owls"}], "max_concurrency": []}, 400),
+    ("POST", "/pipelines/notes/batch", {"inputs": [{"topic": "owls"}], "max_concurrency": 0}, 400),
+])
+def test_bad_requests(server, method, path, body, status):
+    async def main():
+        async with _client(server(max_batch_size=2)) as client:
+            if isinstance(body, bytes):
+                return await client.request(method, path, content=body)
+            return await client.request(method, path, json=body)
+
+    response = asyncio.run(main())
+    assert response.status_code == status
+    assert "error" in response.json()
+
+
+def test_pipeline_errors_are_server_errors(server):
+    app = server()
+
+    async def broken(inputs, thread_id=None):
+        raise ValueError("bug inside a node")
+
+    app.engines["notes"].arun = broken
+
+    async def main():
+        async with _client(app) as client:
+            return await client.post("/pipelines/notes/run", json={"inputs": {"topic": "owls"}})
+
+    response = asyncio.run(main())
+    assert response.status_code == 500
+    assert response.json() == {"error": "bug inside a node"}
+
+
+def test_rejects_requests_beyond_the_queue(server):
+    app = server(latency=0.3, max_concurrency=1, max_queue=1, queue_timeout=5)
+
+    async def main():
+        async with _client(app) as client:
+            return await asyncio.gather(*[
+                client.post("/pipelines/notes/run", json={"inputs": {"topic": str(i)}})
+                for i in range(3)])
+
+    responses = asyncio.run(main())
+    assert sorted(r.status_code for r in responses) == [200, 200, 503]
+    rejected = next(r for r in responses if r.status_code == 503)
+    assert rejected.headers["retry-after"] == "1"
+    assert app.admission.stats()["rejected"] == 1
+
+
+def test_queued_requests_time_out(server):
+    app = server(latency=0.3, max_concurrency=1, max_queue=1, queue_timeout=0.05)
+
+    async def main():
+        async with _client(app) as client:
+            return await asyncio.gather(*[
+                client.post("/pipelines/notes/run", json={"inputs": {"topic": str(i)}})
+                for i in range(2)])
+
+    statuses = sorted(r.status_code for r in asyncio.run(main()))
+    assert statuses == [200, 503]
+
+
+def test_shutdown_drains_in_flight_requests(server):
+    app = server(latency=0.2)
+
+    async def main():
+        async with _client(app) as client:
+            in_flight = asyncio.ensure_future(
+                client.post("/pipelines/notes/run", json={"inputs": {"topic": "owls"}}))
+            await asyncio.sleep(0.05)
+            await app.shutdown()
+            # shutdown() returned only after the running request finished
+            assert in_flight.done()
+            late = await client.post("/pipelines/notes/run", json={"inputs": {"topic": "owls"}})
+            health = await client.get("/health")
+            return await in_flight, late, health
+
+    finished, late, health = asyncio.run(main())
+    assert finished.status_code == 200
+    assert late.status_code == 503
+    assert health.status_code == 503
@@ -0,0 +1,138 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from framework.core.singleflight import SingleFlight
+
+
+def test_concurrent_sync_calls_share_one_result():
+    group = SingleFlight()
+    calls = []
+    results = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return "value"
+
+    threads = [threading.Thread(target=lambda: results.append(group.do("key", fetch)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(results, key=lambda r: r[1]) == [("value", False)] + [("value", True)] * 3
+    assert group.stats() == {"calls": 1, "coalesced": 3, "in_flight": 0}
+
+
+def test_keys_are_forgotten_once_the_call_finishes():
+    group = SingleFlight()
+    assert group.do("key", lambda: 1) == (1, False)
+    assert group.do("key", lambda: 2) == (2, False)
+    assert group.do("other", lambda: 3) == (3, False)
+
+
+def test_errors_are_shared_with_waiters():
+    group = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise ConnectionError("provider down")
+
+    async def main():
+        return await asyncio.gather(
+            group.ado("key", fail), group.ado("key", fail), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert group.in_flight() == 0
+
+
+def test_async_calls_share_one_result():
+    group = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*[group.ado("key", fetch) for _ in range(3)])
+
+    assert asyncio.run(main()) == [("value", False), ("value", True), ("value", True)]
+    assert len(calls) == 1
+
+
+def test_cancelling_the_leader_does_not_fail_waiters():
+    group = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.1)
+        return "value"
+
+    async def main():
+        leader = asyncio.ensure_future(group.ado("key", fetch))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(group.ado("key", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(main()) == ("value", True)
+
+
+def test_sync_callers_join_async_calls():
+    group = SingleFlight()
+    started = threading.Event()
+    results = []
+
+    async def fetch():
+        started.set()
+        await asyncio.sleep(0.1)
+        return "value"
+
+    def join():
+        started.wait(1)
+        results.append(group.do("key", lambda: "own call"))
+
+    thread = threading.Thread(target=join)
+    thread.start()
+    results.append(asyncio.run(group.ado("key", fetch)))
+    thread.join()
+    assert sorted(results, key=lambda r: r[1]) == [("value", False), ("value", True)]
+
+
+def test_identical_pipeline_runs_share_the_model_call(build_engine):
+    engine = build_engine({"fake_llm": {"payload": "text", "latency": 0.1}, "coalesce_requests": True})
+    before = engine.coalescing_stats()["coalesced"]
+
+    async def main():
+        return await asyncio.gather(*[engine.arun({"topic": "owls"}) for _ in range(3)])
+
+    outputs = {result["writer"] for result in asyncio.run(main())}
+    assert len(outputs) == 1
+    assert engine.coalescing_stats()["coalesced"] - before == 2
+
+
+def test_coalescing_is_opt_in(build_engine):
+    assert build_engine().coalescing_stats() == {}
+
+
+def test_pipelines_with_other_client_options_do_not_share_calls(build_engine):
+    short = build_engine({"fake_llm": {"payload": "text", "words": 3, "latency": 0.1},
+                          "coalesce_requests": True})
+    long = build_engine({"fake_llm": {"payload": "text", "words": 5, "latency": 0.1},
+                         "coalesce_requests": True})
+
+    async def main():
+        return await asyncio.gather(short.arun({"topic": "owls"}), long.arun({"topic": "owls"}))
+
+    results = asyncio.run(main())
+    assert [len(result["writer"].split()) for result in results] == [3, 5]
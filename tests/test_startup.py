@@ -0,0 +1,35 @@
+import os
+import sys
+import subprocess
+
+from framework.main import _parse_importtime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Packages the CLI must not import until a command actually needs them
+HEAVY_PACKAGES = {"langgraph", "langchain", "langchain_core", "langfuse", "jinja2"}
+
+# Cumulative import time allowed for framework.main (generous, to absorb slow CI machines)
+IMPORT_BUDGET_MS = 150
+
+
+def _import_main():
+    """Import framework.main in a fresh interpreter; return (-X importtime rows, loaded modules)."""
+    code = "import sys, framework.main; print('\\n'.join(sys.modules))"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True)
+    rows, _ = _parse_importtime(completed.stderr)
+    return rows, set(completed.stdout.split())
+
+
+def test_cli_import_leaves_heavy_dependencies_unloaded():
+    _, modules = _import_main()
+    loaded = {name.split(".")[0] for name in modules} & HEAVY_PACKAGES
+    assert not loaded, f"framework.main imports {sorted(loaded)} at startup"
+
+
+def test_cli_import_stays_within_budget():
+    rows, _ = _import_main()
+    cumulative = {module: cumulative_us for module, _, cumulative_us in rows}
+    assert cumulative["framework.main"] / 1000 < IMPORT_BUDGET_MS
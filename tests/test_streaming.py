@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from framework.core.errors import NodeError
+from framework.core.node import LLMNode
+from framework.core.retry import RetryPolicy
+
+
+class _Chunk:
+    def __init__(self, content):
+        self.content = content
+        self.usage_metadata = None
+
+
+class _FlakyStream:
+    """Streams the given tokens, failing after `fail_after` tokens for the first `failures` calls."""
+
+    def __init__(self, tokens, fail_after, failures=1):
+        self.tokens = tokens
+        self.fail_after = fail_after
+        self.failures = failures
+        self.calls = 0
+
+    def _tokens(self):
+        self.calls += 1
+        for i, token in enumerate(self.tokens):
+            if i == self.fail_after and self.calls <= self.failures:
+                raise ConnectionError("dropped")
+            yield _Chunk(token)
+
+    def stream(self, prompt):
+        yield from self._tokens()
+
+    async def astream(self, prompt):
+        for chunk in self._tokens():
+            yield chunk
+
+
+def _node(**retry):
+    return LLMNode("writer", "Write", "fake", "unused.txt",
+                   retry_policy=RetryPolicy(backoff_base=0, **retry))
+
+
+def _tokens(events):
+    return [event["token"] for event in events if event["type"] == "token"]
+
+
+@pytest.mark.parametrize("settings", [
+    {"retry": {"timeout": 5}},
+    {"retry": {"hedge_after": 0.001}},
+])
+def test_sync_token_stream_with_timeout_or_hedging(build_engine, settings):
+    engine = build_engine(dict(settings, fake_llm={"payload": "text", "token_delay": 0.002}))
+    reference = build_engine({"fake_llm": {"payload": "text"}}).run({"topic": "owls"})["writer"]
+    events = list(engine.stream({"topic": "owls"}, mode="tokens"))
+    assert "".join(_tokens(events)) == reference
+
+
+def test_async_hedged_stream_does_not_interleave(build_engine):
+    engine = build_engine({
+        "retry": {"hedge_after": 0.001},
+        "fake_llm": {"payload": "text", "token_delay": 0.002},
+    })
+    reference = build_engine({"fake_llm": {"payload": "text"}}).run({"topic": "owls"})["writer"]
+
+    async def main():
+        return [event async for event in engine.astream({"topic": "owls"}, mode="tokens")]
+
+    assert "".join(_tokens(asyncio.run(main()))) == reference
+
+
+def test_stream_retried_before_first_token():
+    node, events = _node(max_retries=2), []
+    llm = _FlakyStream(["a ", "b ", "c"], fail_after=0)
+    text, _ = node._stream(llm, "prompt", events.append)
+    assert text == "a b c"
+    assert _tokens(events) == ["a ", "b ", "c"]
+    assert llm.calls == 2
+
+
+def test_stream_not_retried_after_first_token():
+    node, events = _node(max_retries=2), []
+    llm = _FlakyStream(["a ", "b ", "c"], fail_after=2)
+    with pytest.raises(ConnectionError):
+        node._stream(llm, "prompt", events.append)
+    assert _tokens(events) == ["a ", "b "]
+    assert llm.calls == 1
+
+
+def test_async_stream_not_retried_after_first_token():
+    node, events = _node(max_retries=2), []
+    llm = _FlakyStream(["a ", "b ", "c"], fail_after=1)
+    with pytest.raises(ConnectionError):
+        asyncio.run(node._astream(llm, "prompt", events.append))
+    assert _tokens(events) == ["a "]
+    assert llm.calls == 1
@@ -0,0 +1,50 @@
+import pytest
+
+from framework.core.context import plan_inputs
+from framework.core.errors import ConfigError
+from framework.utils.template import TemplateCache, TemplateRenderer
+
+
+def _renderer(tmp_path, **templates):
+    for name, source in templates.items():
+        (tmp_path / name).write_text(source)
+    return TemplateRenderer(templates_dir=str(tmp_path))
+
+
+def test_variables_of_included_and_extended_templates(tmp_path):
+    renderer = _renderer(
+        tmp_path,
+        **{
+            "base.txt": "Audience: {{ audience }}\n{% block body %}{% endblock %}",
+            "style.txt": "Style: {{ style }}",
+            "main.txt": '{% extends "base.txt" %}{% block body %}'
+                        '{% include "style.txt" %} {{ topic }}{% endblock %}',
+        })
+    assert renderer.variables("main.txt") == {"audience", "style", "topic"}
+
+
+def test_dynamic_include_needs_full_context(tmp_path):
+    renderer = _renderer(tmp_path, **{"main.txt": "{% include template_name %} {{ topic }}"})
+    assert renderer.variables("main.txt") is None
+    assert plan_inputs("writer", ["writer"], None).all_inputs
+
+
+def test_included_variables_reach_the_node(tmp_path):
+    (tmp_path / "style.txt").write_text("Style: {{ style }}.")
+    (tmp_path / "main.txt").write_text('{% include "style.txt" %} About {{ topic }}.')
+    renderer = TemplateRenderer(templates_dir=str(tmp_path))
+    prompt = renderer.render("main.txt", {"style": "terse", "topic": "owls"})
+    assert prompt == "Style: terse. About owls."
+
+    plan = plan_inputs("writer", ["writer"], renderer.variables("main.txt"))
+    context = plan.build({"inputs": {"style": "terse", "topic": "owls", "unused": 1}})
+    assert dict(context) == {"style": "terse", "topic": "owls"}
+
+
+def test_cache_size_conflicts_are_rejected():
+    cache = TemplateCache(maxsize=8)
+    cache.configure(16)
+    cache.configure(16)
+    with pytest.raises(ConfigError):
+        cache.configure(32)
+    assert cache.maxsize == 16
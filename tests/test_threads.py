@@ -0,0 +1,49 @@
+from framework.core.registry import PipelineRegistry
+
+from .conftest import pipeline_config
+
+
+def _human_messages(engine, thread_id):
+    state = engine.graph.get_state({"configurable": {"thread_id": thread_id}})
+    return [m for m in state.values.get("messages", []) if m.type == "human"]
+
+
+def _threads(engine):
+    return {item.config["configurable"]["thread_id"] for item in engine.checkpointer.list(None)}
+
+
+def test_runs_without_thread_id_do_not_share_state(build_engine):
+    engine = build_engine()
+    for topic in ("cats", "dogs", "owls"):
+        engine.run({"topic": topic, "user_input": topic})
+
+    threads = _threads(engine)
+    assert len(threads) == 3
+    for thread_id in threads:
+        assert len(_human_messages(engine, thread_id)) == 1
+
+
+def test_registry_engines_do_not_share_state(template_path):
+    registry = PipelineRegistry()
+    config = pipeline_config(template_path)
+    for topic in ("cats", "dogs"):
+        registry.get_engine(config).run({"topic": topic, "user_input": topic})
+    assert len(_threads(registry.get_engine(config))) == 2
+
+
+def test_registry_bounds_source_fingerprints(template_path):
+    registry = PipelineRegistry(max_aliases=2)
+    configs = [dict(pipeline_config(template_path), name=f"Pipeline {i}") for i in range(4)]
+    engines = [registry.get_engine(config) for config in configs]
+
+    assert len(registry._aliases) == 2
+    # Forgotten fingerprints only cost a revalidation; the engine is still shared
+    assert registry.get_engine(configs[0]) is engines[0]
+    assert registry.get_engine(configs[3]) is engines[3]
+
+
+def test_explicit_thread_id_keeps_conversation(build_engine):
+    engine = build_engine()
+    for topic in ("cats", "dogs"):
+        engine.run({"topic": topic, "user_input": topic}, thread_id="chat")
+    assert len(_human_messages(engine, "chat")) == 2
@@ -0,0 +1,174 @@
+import time
+import threading
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from framework.core.fake_llm import FakeChatModel
+from framework.integrations.langfuse_integration import (
+    LangfuseTraceSink, LangfuseTracer, TraceCallbackHandler
+)
+from framework.integrations.trace_queue import (
+    TraceQueue, TraceSink, register_queue, should_sample, shutdown_trace_queues
+)
+
+
+class ListSink(TraceSink):
+    """Collects exported events; export blocks while ``gate`` is cleared."""
+
+    def __init__(self):
+        self.events = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.closed = False
+
+    def export(self, events):
+        self.gate.wait(5)
+        self.events.extend(events)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def sink():
+    return ListSink()
+
+
+@pytest.fixture
+def trace_queue(sink):
+    trace_queue = TraceQueue(sink, flush_interval=0.05)
+    yield trace_queue
+    trace_queue.close()
+
+
+def _by_name(events):
+    return {event["name"]: event for event in events if event["type"] != "trace"}
+
+
+def test_runs_map_to_a_trace_with_spans_and_generations(sink, trace_queue):
+    handler = TraceCallbackHandler(trace_queue, session_id="session-1")
+    model = FakeChatModel(payload="text", words=3)
+    chain = RunnableLambda(lambda topic: f"Write about {topic}", name="prompt") | model
+    chain.invoke("owls", config={"callbacks": [handler], "run_name": "pipeline"})
+    assert trace_queue.flush(5)
+
+    traces = [event for event in sink.events if event["type"] == "trace"]
+    assert len(traces) == 1
+    assert traces[0]["name"] == "pipeline" and traces[0]["session_id"] == "session-1"
+
+    events = _by_name(sink.events)
+    root, prompt, generation = events["pipeline"], events["prompt"], events["FakeChatModel"]
+    assert root["type"] == prompt["type"] == "span"
+    assert root["parent_observation_id"] is None
+    assert prompt["parent_observation_id"] == generation["parent_observation_id"] == root["id"]
+    assert {event["trace_id"] for event in events.values()} == {traces[0]["id"]}
+
+    assert generation["type"] == "generation"
+    assert generation["input"] == [[{"role": "human", "content": "Write about owls"}]]
+    assert len(generation["output"].split()) == 3
+    assert generation["usage"]["output"] == 3
+    assert generation["end_time"] >= generation["start_time"]
+
+
+def test_errors_are_recorded_on_the_observation(sink, trace_queue):
+    handler = TraceCallbackHandler(trace_queue)
+
+    def fail(_):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        RunnableLambda(fail, name="failing").invoke("x", config={"callbacks": [handler]})
+    trace_queue.flush(5)
+    failing = _by_name(sink.events)["failing"]
+    assert failing["level"] == "ERROR" and failing["status_message"] == "boom"
+
+
+def test_unsampled_traces_record_nothing(sink, trace_queue):
+    handler = TraceCallbackHandler(trace_queue, sample_rate=0.0)
+    (RunnableLambda(lambda x: x) | RunnableLambda(lambda x: x)).invoke(
+        1, config={"callbacks": [handler]})
+    trace_queue.flush(5)
+    assert sink.events == []
+    assert handler._runs == {}
+
+
+def test_sampling_is_deterministic_per_trace():
+    decisions = [should_sample(f"trace-{i}", 0.5) for i in range(200)]
+    assert decisions == [should_sample(f"trace-{i}", 0.5) for i in range(200)]
+    assert 60 < sum(decisions) < 140
+
+
+def test_full_queue_drops_events_without_blocking(sink):
+    sink.gate.clear()
+    trace_queue = TraceQueue(sink, max_queue_size=2, batch_size=1, flush_interval=0.05)
+    try:
+        # The flusher takes the first event and blocks exporting it
+        trace_queue.put({"type": "span", "n": 0})
+        while trace_queue.stats()["queued"]:
+            pass
+        results = [trace_queue.put({"type": "span", "n": n}) for n in range(1, 6)]
+        assert results == [True, True, False, False, False]
+        assert trace_queue.stats()["dropped"] == 3
+    finally:
+        sink.gate.set()
+        trace_queue.close()
+    assert [event["n"] for event in sink.events] == [0, 1, 2]
+
+
+def test_export_failures_are_counted_not_raised():
+    class FailingSink(TraceSink):
+        def export(self, events):
+            raise ConnectionError("tracing service unavailable")
+
+    trace_queue = TraceQueue(FailingSink(), flush_interval=0.05)
+    try:
+        assert trace_queue.put({"type": "span"})
+        assert trace_queue.flush(5)
+        assert trace_queue.stats()["failed"] == 1
+    finally:
+        trace_queue.close()
+
+
+def test_shutdown_exports_queued_events_and_closes_sinks(sink):
+    trace_queue = register_queue(TraceQueue(sink, batch_size=2, flush_interval=10))
+    for n in range(5):
+        trace_queue.put({"type": "span", "n": n})
+    started = time.monotonic()
+    shutdown_trace_queues()
+    # Shutdown doesn't wait out the flush interval
+    assert time.monotonic() - started < 2
+    assert [event["n"] for event in sink.events] == [0, 1, 2, 3, 4]
+    assert sink.closed
+    assert not trace_queue.put({"type": "span"})
+
+
+def test_langfuse_sink_forwards_events_by_type():
+    class Client:
+        def __init__(self):
+            self.calls = []
+
+        def __getattr__(self, name):
+            return lambda **fields: self.calls.append((name, fields))
+
+    client = Client()
+    LangfuseTraceSink(client).export([
+        {"type": "trace", "id": "t", "name": "pipeline", "user_id": None},
+        {"type": "span", "id": "s", "trace_id": "t"},
+        {"type": "generation", "id": "g", "trace_id": "t", "model": "fake"},
+        {"type": "score", "trace_id": "t", "name": "quality", "value": 1.0},
+    ])
+    assert client.calls == [
+        ("trace", {"id": "t", "name": "pipeline"}),
+        ("span", {"id": "s", "trace_id": "t"}),
+        ("generation", {"id": "g", "trace_id": "t", "model": "fake"}),
+        ("score", {"trace_id": "t", "name": "quality", "value": 1.0}),
+    ]
+
+
+def test_tracer_scores_go_through_the_queue(sink):
+    tracer = LangfuseTracer(sink=sink, flush_interval=0.05)
+    tracer.add_score("trace-1", "quality", 0.5)
+    assert tracer.flush(5)
+    assert sink.events == [{"type": "score", "trace_id": "trace-1", "name": "quality",
+                            "value": 0.5, "comment": None}]
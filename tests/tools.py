@@ -0,0 +1,20 @@
+import os
+import time
+
+
+def echo(context):
+    """Return the context's value and the PID of the process that ran it."""
+    return {"value": context.get("value"), "pid": os.getpid()}
+
+
+def sleep(context):
+    time.sleep(context.get("seconds", 0.1))
+    return {"slept": context.get("seconds", 0.1)}
+
+
+async def async_echo(context):
+    return {"value": context.get("value")}
+
+
+def unpicklable(context):
+    return {"value": lambda: None}